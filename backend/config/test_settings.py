@@ -8,6 +8,15 @@ DATABASES = {
     }
 }
 
+# Tests run in one process, where a local cache is as good as a shared one
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+LICENSE_ALLOW_LOCAL_CACHE = True
+STATIONS_ALLOW_LOCAL_CACHE = True
+
 # Use a test license secret so HS256 tokens can be verified in tests
 LICENSE_TOKEN_ALGORITHM = 'HS256'
 LICENSE_PUBLIC_KEY = '''-----BEGIN PUBLIC KEY-----
@@ -25,3 +34,7 @@ REST_FRAMEWORK['DEFAULT_AUTHENTICATION_CLASSES'] = (
     'rest_framework.authentication.SessionAuthentication',
     'rest_framework_simplejwt.authentication.JWTAuthentication',
 )
+
+# Keep uploaded files from tests out of the source tree
+import tempfile
+MEDIA_ROOT = tempfile.mkdtemp(prefix='media-planner-test-media-')
@@ -5,3 +5,6 @@ class LicensesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'licenses'
     verbose_name = 'Licenses'
+
+    def ready(self):
+        from . import signals  # noqa: F401 -- registers the cache invalidation receivers
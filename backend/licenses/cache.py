@@ -0,0 +1,81 @@
+"""Per-tenant license status cache used by ``LicenseEnforceMiddleware``.
+
+A snapshot of a tenant's License row (or the fact that there is none) is
+kept in the Django cache for ``LICENSE_STATUS_CACHE_TTL`` seconds, so the
+middleware does not query the database on every request. An entry never
+outlives the license's ``valid_until``, and ``post_save``/``post_delete``
+on ``License`` drop the tenant's entry (see ``signals``).
+
+That invalidation only reaches every web and Celery process through a
+shared cache (redis, see ``CACHES``). With a process-local backend
+(LocMem, dummy) ``shared_cache`` returns ``None`` and the snapshot is read
+from the database on every request, unless ``LICENSE_ALLOW_LOCAL_CACHE``
+declares the deployment single-process.
+"""
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.utils import timezone
+
+from .models import License
+
+
+CACHE_TTL = 60
+KEY_PREFIX = 'licenses:status:'
+# cached value for tenants without a License row
+MISSING = 'missing'
+
+
+def shared_cache():
+    """The default cache if every process sees the same one, else ``None``."""
+    cache = caches['default']
+    if isinstance(cache, (LocMemCache, DummyCache)) and not getattr(settings, 'LICENSE_ALLOW_LOCAL_CACHE', False):
+        return None
+    return cache
+
+
+def cache_key(tenant_id):
+    return f'{KEY_PREFIX}{tenant_id}'
+
+
+def _ttl(valid_until):
+    ttl = getattr(settings, 'LICENSE_STATUS_CACHE_TTL', CACHE_TTL)
+    if valid_until:
+        remaining = (valid_until - timezone.now()).total_seconds()
+        # expire with the license so the next request sees it as expired
+        ttl = min(ttl, max(int(remaining), 0))
+    return ttl
+
+
+def get_license_snapshot(tenant_id):
+    """Return the tenant's license as a dict, or ``None`` if it has none.
+
+    The dict holds ``status``, ``valid_until`` (aware datetime or ``None``),
+    ``features`` and ``machine_hash``. Raises
+    ``License.MultipleObjectsReturned`` like the uncached lookup did.
+    """
+    cache = shared_cache()
+    key = cache_key(tenant_id)
+    cached = cache.get(key) if cache is not None else None
+    if cached is not None:
+        return None if cached == MISSING else cached
+
+    try:
+        status, valid_until, features, machine_hash = (
+            License.objects.values_list('status', 'valid_until', 'features', 'machine_hash').get(tenant_id=tenant_id))
+    except License.DoesNotExist:
+        if cache is not None:
+            cache.set(key, MISSING, _ttl(None))
+        return None
+    snapshot = {'status': status, 'valid_until': valid_until, 'features': features, 'machine_hash': machine_hash}
+    ttl = _ttl(valid_until)
+    if cache is not None and ttl > 0:
+        cache.set(key, snapshot, ttl)
+    return snapshot
+
+
+def invalidate(tenant_id):
+    cache = shared_cache()
+    if cache is not None:
+        cache.delete(cache_key(tenant_id))
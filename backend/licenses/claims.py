@@ -0,0 +1,108 @@
+"""Signed license claims that the middleware can verify without the database.
+
+A claim is a compact, HMAC-signed (``django.core.signing``, keyed by
+``SECRET_KEY``) snapshot of a tenant's active license: tenant id, features,
+``valid_until``, machine hash and issue time. ``LicenseViewSet.activate``
+returns one and sets it as the ``LICENSE_CLAIM_COOKIE`` cookie; clients
+that do not keep cookies send it back in the ``X-License-Claim`` header.
+
+``verify_claim`` only checks the signature, the tenant, the expiry and the
+machine hash in memory, plus a per-tenant revocation marker in the cache.
+``post_save``/``post_delete`` on ``License`` set that marker, so claims
+issued before a license change are rejected and the middleware falls back
+to the (cached) database lookup, which issues a fresh claim.
+
+The marker must be visible to every process, so claims are only issued and
+honoured while the default cache is shared (``cache.shared_cache``); with a
+process-local cache ``enabled`` is false and every request falls back to
+the database.
+"""
+import time
+
+from django.conf import settings
+from django.core import signing
+
+from .cache import shared_cache
+from .lib import get_machine_hash
+
+
+SALT = 'licenses.claim'
+COOKIE_NAME = 'license_claim'
+HEADER_NAME = 'X-License-Claim'
+# claims are re-issued at least this often, bounding how long a claim
+# survives a lost revocation marker
+MAX_AGE = 60 * 60
+REVOKED_KEY_PREFIX = 'licenses:claim-revoked:'
+
+
+def cookie_name():
+    return getattr(settings, 'LICENSE_CLAIM_COOKIE', COOKIE_NAME)
+
+
+def max_age():
+    return getattr(settings, 'LICENSE_CLAIM_MAX_AGE', MAX_AGE)
+
+
+def enabled():
+    """Whether revocation markers reach every process, i.e. claims can be trusted."""
+    return shared_cache() is not None
+
+
+def issue_claim(tenant_id, features=None, valid_until=None, machine_hash=None, issued_at=None):
+    """Return a signed claim string for an active license.
+
+    ``issued_at`` (epoch seconds, default now) must not be later than the
+    moment the license state was read, so a revocation landing in between
+    still rejects the claim.
+    """
+    payload = {
+        't': str(tenant_id),
+        'f': features or {},
+        'u': valid_until.timestamp() if valid_until else None,
+        'm': machine_hash,
+        'i': time.time() if issued_at is None else issued_at,
+    }
+    return signing.dumps(payload, salt=SALT, compress=True)
+
+
+def revoke_claims(tenant_id):
+    """Reject every claim issued for ``tenant_id`` until now."""
+    cache = shared_cache()
+    # without a shared cache no claim is honoured in the first place
+    if cache is not None:
+        cache.set(f'{REVOKED_KEY_PREFIX}{tenant_id}', time.time(), max_age())
+
+
+def verify_claim(value, tenant_id):
+    """Return the claim payload if ``value`` authorizes ``tenant_id`` right now, else ``None``."""
+    cache = shared_cache()
+    if not value or cache is None:
+        return None
+    try:
+        payload = signing.loads(value, salt=SALT, max_age=max_age())
+    except signing.BadSignature:  # includes SignatureExpired
+        return None
+    if payload.get('t') != str(tenant_id):
+        return None
+    now = time.time()
+    valid_until = payload.get('u')
+    if valid_until is not None and valid_until <= now:
+        return None
+    if payload.get('m') and payload['m'] != get_machine_hash():
+        return None
+    revoked_at = cache.get(f'{REVOKED_KEY_PREFIX}{tenant_id}')
+    if revoked_at is not None and payload.get('i', 0) <= revoked_at:
+        return None
+    return payload
+
+
+def claim_from_request(request):
+    return request.COOKIES.get(cookie_name()) or request.headers.get(HEADER_NAME)
+
+
+def attach_claim(response, request, claim):
+    """Hand ``claim`` to the client as a cookie and a response header."""
+    response.set_cookie(cookie_name(), claim, max_age=max_age(), httponly=True,
+                        secure=request.is_secure(), samesite='Lax')
+    response[HEADER_NAME] = claim
+    return response
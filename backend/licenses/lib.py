@@ -1,28 +1,100 @@
+import functools
 import hashlib
 import json
 import os
+import threading
+import time
 from django.conf import settings
 import jwt
 from jwt import InvalidTokenError
 
 
+# Values derived from files (key material, machine id) are cached and only
+# recomputed when the file's mtime changes; the file is stat()ed at most
+# once per FILE_CHECK_INTERVAL seconds, so hot paths do no I/O at all.
+FILE_CHECK_INTERVAL = 5.0
+_file_cache = {}
+_file_cache_lock = threading.Lock()
+
+
+def _cached_file_value(path, compute):
+    """Return ``compute(path)`` for an existing file, or ``None`` if it does not exist.
+
+    Missing files are remembered too, for the same interval.
+    """
+    now = time.monotonic()
+    entry = _file_cache.get(path)
+    if entry and now - entry[1] < FILE_CHECK_INTERVAL:
+        return entry[2]
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except (OSError, ValueError):  # ValueError: embedded NUL, e.g. an inline key
+        mtime = None
+    if entry and entry[0] == mtime:
+        value = entry[2]
+    else:
+        value = compute(path) if mtime is not None else None
+    with _file_cache_lock:
+        _file_cache[path] = (mtime, now, value)
+    return value
+
+
+def clear_caches():
+    """Forget cached key material, verifiers and the machine hash."""
+    with _file_cache_lock:
+        _file_cache.clear()
+    _prepared_key.cache_clear()
+
+
+def _read_text(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def _hash_file(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
 def get_machine_hash():
     """Return a stable machine hash stored in a file under the project data dir.
     This is a simple placeholder: in production you may derive from host identifiers.
+    The hash is memoized until the machine_id file changes.
     """
     data_dir = getattr(settings, 'DATA_DIR', None) or os.path.join(settings.BASE_DIR, 'data')
-    os.makedirs(data_dir, exist_ok=True)
     path = os.path.join(data_dir, 'machine_id')
-    if os.path.exists(path):
-        with open(path, 'rb') as f:
-            return hashlib.sha256(f.read()).hexdigest()
+    cached = _cached_file_value(path, _hash_file)
+    if cached is not None:
+        return cached
     # generate and persist
+    os.makedirs(data_dir, exist_ok=True)
     random = os.urandom(32)
     with open(path, 'wb') as f:
         f.write(random)
+    with _file_cache_lock:
+        _file_cache.pop(path, None)
     return hashlib.sha256(random).hexdigest()
 
 
+def get_verification_key():
+    """Return LICENSE_PUBLIC_KEY, read from disk when the setting is a path to a key file."""
+    key_setting = getattr(settings, 'LICENSE_PUBLIC_KEY', None)
+    if not key_setting:
+        return None
+    # treat as file path if it looks like one
+    if isinstance(key_setting, str):
+        content = _cached_file_value(key_setting, _read_text)
+        if content is not None:
+            return content
+    return key_setting
+
+
+@functools.lru_cache(maxsize=16)
+def _prepared_key(algo, key):
+    # parse the PEM (or normalize the HMAC secret) once per algorithm/key
+    return jwt.get_algorithm_by_name(algo).prepare_key(key)
+
+
 def verify_activation_token(token: str, expected_machine_hash: str | None = None) -> dict:
     """Verify a JWT activation token.
 
@@ -30,29 +102,21 @@ def verify_activation_token(token: str, expected_machine_hash: str | None = None
     Returns the decoded payload or raises ValueError.
     """
     algo = getattr(settings, 'LICENSE_TOKEN_ALGORITHM', 'HS256')
-    key_setting = getattr(settings, 'LICENSE_PUBLIC_KEY', None)
-
-    # If settings contains a path to a key file, prefer reading the file.
-    key = None
-    if key_setting:
-        # treat as file path if it looks like one
-        if isinstance(key_setting, str) and os.path.exists(key_setting):
-            with open(key_setting, 'r', encoding='utf-8') as f:
-                key = f.read()
-        else:
-            key = key_setting
+    # If settings contains a path to a key file, the file's content is used.
+    key = get_verification_key()
 
     try:
         if algo.upper().startswith('HS'):
             # symmetric: public key setting is used as shared secret in tests/environments
             secret = key or ''
-            payload = jwt.decode(token, secret, algorithms=[algo])
+            payload = jwt.decode(token, _prepared_key(algo, secret), algorithms=[algo])
         else:
             # asymmetric: require public key (PEM)
             if not key:
                 raise ValueError('Public key not configured for asymmetric verification')
-            payload = jwt.decode(token, key, algorithms=[algo])
-    except InvalidTokenError as e:
+            payload = jwt.decode(token, _prepared_key(algo, key), algorithms=[algo])
+    except (InvalidTokenError, NotImplementedError) as e:
+        # NotImplementedError: algorithm unknown to PyJWT (or needs cryptography)
         raise ValueError('Invalid token') from e
 
     # check machine hash if provided
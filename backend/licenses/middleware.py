@@ -1,11 +1,31 @@
+import re
+import time
+
 from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
 from django.utils.deprecation import MiddlewareMixin
 from django.http import JsonResponse
-from .models import License
+from django.utils import timezone
+from .cache import get_license_snapshot
+from .claims import attach_claim, claim_from_request, enabled as claims_enabled, issue_claim, verify_claim
 import logging
 
 logger = logging.getLogger(__name__)
 
+# settings that feed the exempt-path matcher
+EXEMPT_SETTINGS = {'LICENSE_ENFORCE_EXEMPT_PATHS', 'LICENSE_ENFORCE_SKIP_ADMIN', 'STATIC_URL', 'MEDIA_URL'}
+# bumped whenever one of EXEMPT_SETTINGS changes; middleware instances
+# recompile their matcher when they see a new value
+_exempt_settings_generation = 0
+
+
+@receiver(setting_changed)
+def _reset_exempt_matcher(setting, **kwargs):
+    global _exempt_settings_generation
+    if setting in EXEMPT_SETTINGS:
+        _exempt_settings_generation += 1
+
 
 class LicenseEnforceMiddleware(MiddlewareMixin):
     """Check that the request.user.tenant has an active, non-expired license.
@@ -14,6 +34,14 @@ class LicenseEnforceMiddleware(MiddlewareMixin):
     - LICENSE_ENFORCE_EXEMPT_PATHS: sequence of path prefixes (strings) to skip
       enforcement for (default: ['/health', '/status', '/api/docs', '/api/openapi']).
     - LICENSE_ENFORCE_SKIP_ADMIN: bool to skip /admin/ paths (default: True).
+    - LICENSE_STATUS_CACHE_TTL: seconds a tenant's license status is cached
+      (default: 60; see licenses.cache).
+    - LICENSE_CLAIM_COOKIE / LICENSE_CLAIM_MAX_AGE: name and lifetime of the
+      signed license claim (see licenses.claims).
+
+    A request carrying a valid signed claim (cookie or X-License-Claim
+    header) is allowed without any lookup. Otherwise the cached License
+    snapshot decides, and an allowed response carries a fresh claim.
 
     The middleware will also skip STATIC_URL and MEDIA_URL paths when configured.
     """
@@ -25,7 +53,12 @@ class LicenseEnforceMiddleware(MiddlewareMixin):
         '/licenses/activate', '/api/licenses/activate'
     ]
 
-    def _is_exempt_path(self, path: str) -> bool:
+    def __init__(self, get_response=None):
+        super().__init__(get_response)
+        self._exempt_generation = _exempt_settings_generation
+        self._exempt_matcher = self._compile_exempt_matcher()
+
+    def _exempt_prefixes(self):
         # Gather configured exempt prefixes
         configured = getattr(settings, 'LICENSE_ENFORCE_EXEMPT_PATHS', None)
         prefixes = list(configured) if configured else []
@@ -50,12 +83,28 @@ class LicenseEnforceMiddleware(MiddlewareMixin):
             if not pstr or pstr == '/':
                 continue
             normalized.append(pstr)
+        return normalized
+
+    def _compile_exempt_matcher(self):
+        """Compile the exempt prefixes into one anchored alternation.
 
-        # Check against normalized prefixes
-        for p in normalized:
-            if path.startswith(p):
-                logger.debug('LicenseEnforceMiddleware: path %s matched exempt prefix %s', path, p)
-                return True
+        Built once and rebuilt only after one of ``EXEMPT_SETTINGS`` changes
+        (``override_settings`` in tests), instead of on every request.
+        """
+        prefixes = sorted(set(self._exempt_prefixes()), key=len, reverse=True)
+        if not prefixes:
+            return None
+        return re.compile('|'.join(re.escape(p) for p in prefixes))
+
+    def _is_exempt_path(self, path: str) -> bool:
+        if self._exempt_generation != _exempt_settings_generation:
+            self._exempt_matcher = self._compile_exempt_matcher()
+            self._exempt_generation = _exempt_settings_generation
+        # re.match anchors at the start of the path, i.e. a startswith() check
+        match = self._exempt_matcher.match(path) if self._exempt_matcher else None
+        if match:
+            logger.debug('LicenseEnforceMiddleware: path %s matched exempt prefix %s', path, match.group(0))
+            return True
         return False
 
     def process_request(self, request):
@@ -74,22 +123,43 @@ class LicenseEnforceMiddleware(MiddlewareMixin):
             logger.debug('LicenseEnforceMiddleware: unauthenticated user or missing user, skipping enforcement')
             return None
 
-        tenant = getattr(user, 'tenant', None)
-        if not tenant:
+        # tenant_id avoids loading the Tenant row just to look up its license
+        tenant_id = getattr(user, 'tenant_id', None)
+        if not tenant_id:
             logger.debug('LicenseEnforceMiddleware: authenticated user has no tenant, skipping enforcement')
             return None
 
-        # Check for License row for tenant
-        try:
-            lic = License.objects.get(tenant=tenant)
-        except License.DoesNotExist:
-            logger.debug('LicenseEnforceMiddleware: no License row for tenant %s — blocking', getattr(tenant, 'id', None))
+        # A signed claim is checked in memory: signature, tenant, expiry, revocation
+        if verify_claim(claim_from_request(request), tenant_id):
+            logger.debug('LicenseEnforceMiddleware: valid license claim for tenant %s — allowing', tenant_id)
+            return None
+
+        # a claim issued from this snapshot predates any revocation after the read
+        issued_at = time.time()
+        # License snapshot for the tenant, cached per tenant
+        snapshot = get_license_snapshot(tenant_id)
+        if snapshot is None:
+            logger.debug('LicenseEnforceMiddleware: no License row for tenant %s — blocking', tenant_id)
             return JsonResponse({'detail': 'Tenant license not found'}, status=402)
+        status, valid_until = snapshot['status'], snapshot['valid_until']
 
         # Only allow if license status is 'active'
-        if getattr(lic, 'status', None) != 'active':
-            logger.debug('LicenseEnforceMiddleware: license status for tenant %s is %s — blocking', getattr(tenant, 'id', None), getattr(lic, 'status', None))
+        if status != 'active':
+            logger.debug('LicenseEnforceMiddleware: license status for tenant %s is %s — blocking', tenant_id, status)
             return JsonResponse({'detail': 'Tenant license not active'}, status=402)
-
-        logger.debug('LicenseEnforceMiddleware: license active for tenant %s — allowing', getattr(tenant, 'id', None))
+        if valid_until and valid_until <= timezone.now():
+            logger.debug('LicenseEnforceMiddleware: license for tenant %s expired at %s — blocking', tenant_id, valid_until)
+            return JsonResponse({'detail': 'Tenant license expired'}, status=402)
+
+        logger.debug('LicenseEnforceMiddleware: license active for tenant %s — allowing', tenant_id)
+        # hand out a claim so the following requests skip the lookup
+        if claims_enabled():
+            request._license_claim = issue_claim(tenant_id, snapshot['features'], valid_until, snapshot['machine_hash'],
+                                                 issued_at=issued_at)
         return None
+
+    def process_response(self, request, response):
+        claim = getattr(request, '_license_claim', None)
+        if claim:
+            attach_claim(response, request, claim)
+        return response
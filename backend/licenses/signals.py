@@ -0,0 +1,14 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import cache
+from .claims import revoke_claims
+from .models import License
+
+
+@receiver(post_save, sender=License)
+@receiver(post_delete, sender=License)
+def invalidate_license_status(sender, instance, **kwargs):
+    """Drop the cached status and outstanding claims so the middleware sees the change on the next request."""
+    cache.invalidate(instance.tenant_id)
+    revoke_claims(instance.tenant_id)
@@ -0,0 +1,137 @@
+import datetime
+from unittest import mock
+
+import jwt
+from django.contrib.auth import get_user_model
+from django.core.cache import cache as django_cache
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from tenants.models import Tenant
+from . import claims, middleware
+from .lib import get_machine_hash
+from .middleware import LicenseEnforceMiddleware
+from .models import License
+from .views import LicenseViewSet
+
+
+User = get_user_model()
+
+
+class LicenseClaimTests(TestCase):
+    def setUp(self):
+        django_cache.clear()
+        self.tenant = Tenant.objects.create(name='ClaimTenant')
+        self.user = User.objects.create_user(username='claim', password='pass', tenant=self.tenant)
+        self.middleware = LicenseEnforceMiddleware(get_response=lambda req: None)
+        self.rf = RequestFactory()
+
+    def request(self, claim=None):
+        req = self.rf.get('/api/campaigns/')
+        if claim:
+            req.COOKIES[claims.cookie_name()] = claim
+        req.user = self.user
+        return req, self.middleware.process_request(req)
+
+    def test_valid_claim_needs_no_lookup(self):
+        # no License row and nothing cached: only the claim can allow this
+        claim = claims.issue_claim(self.tenant.id, {'pro': True})
+        with self.assertNumQueries(0):
+            self.assertIsNone(self.request(claim)[1])
+        # the header works for clients without cookies
+        req = self.rf.get('/api/campaigns/', HTTP_X_LICENSE_CLAIM=claim)
+        req.user = self.user
+        self.assertIsNone(self.middleware.process_request(req))
+
+    def test_fallback_issues_claim(self):
+        License.objects.create(tenant=self.tenant, status='active', features={'pro': True})
+        req, resp = self.request()
+        self.assertIsNone(resp)
+        response = self.middleware.process_response(req, HttpResponse())
+        claim = response.cookies[claims.cookie_name()].value
+        self.assertEqual(response[claims.HEADER_NAME], claim)
+        self.assertEqual(claims.verify_claim(claim, self.tenant.id)['f'], {'pro': True})
+
+    def test_license_change_revokes_claims(self):
+        lic = License.objects.create(tenant=self.tenant, status='active')
+        claim = claims.issue_claim(self.tenant.id)
+        self.assertIsNone(self.request(claim)[1])
+        lic.status = 'revoked'
+        lic.save()
+        self.assertEqual(self.request(claim)[1].status_code, 402)
+        # a claim issued after the change is honoured again
+        self.assertIsNone(self.request(claims.issue_claim(self.tenant.id))[1])
+        lic.delete()
+        self.assertEqual(self.request(claim)[1].content, b'{"detail": "Tenant license not found"}')
+
+    def test_revocation_during_lookup_rejects_issued_claim(self):
+        lic = License.objects.create(tenant=self.tenant, status='active')
+        original = middleware.get_license_snapshot
+
+        def revoked_after_read(tenant_id):
+            snapshot = original(tenant_id)
+            lic.status = 'revoked'
+            lic.save()
+            return snapshot
+
+        with mock.patch.object(middleware, 'get_license_snapshot', revoked_after_read):
+            req, resp = self.request()
+        # the request itself saw the license active, but its claim must not outlive the revocation
+        self.assertIsNone(resp)
+        self.assertIsNone(claims.verify_claim(req._license_claim, self.tenant.id))
+        self.assertEqual(self.request(req._license_claim)[1].status_code, 402)
+
+    def test_rejected_claims(self):
+        past = timezone.now() - datetime.timedelta(minutes=1)
+        other = Tenant.objects.create(name='Other')
+        claim = claims.issue_claim(self.tenant.id)
+        self.assertIsNone(claims.verify_claim(claims.issue_claim(self.tenant.id, valid_until=past), self.tenant.id))
+        self.assertIsNone(claims.verify_claim(claims.issue_claim(other.id), self.tenant.id))
+        self.assertIsNone(claims.verify_claim(claims.issue_claim(self.tenant.id, machine_hash='other-host'), self.tenant.id))
+        self.assertIsNone(claims.verify_claim(claim[:-1] + ('A' if claim[-1] != 'A' else 'B'), self.tenant.id))
+        self.assertIsNone(claims.verify_claim('', self.tenant.id))
+        # without a License row the middleware still blocks a bad claim
+        self.assertEqual(self.request(claim + 'x')[1].status_code, 402)
+
+    @override_settings(LICENSE_ALLOW_LOCAL_CACHE=False)
+    def test_local_cache_disables_claims(self):
+        # a revocation marker in this process's LocMemCache would not reach other workers
+        License.objects.create(tenant=self.tenant, status='active')
+        self.assertFalse(claims.enabled())
+        self.assertIsNone(claims.verify_claim(claims.issue_claim(self.tenant.id), self.tenant.id))
+        req, resp = self.request(claims.issue_claim(self.tenant.id))
+        self.assertIsNone(resp)
+        response = self.middleware.process_response(req, HttpResponse())
+        self.assertNotIn(claims.cookie_name(), response.cookies)
+        self.assertFalse(response.has_header(claims.HEADER_NAME))
+
+    @override_settings(LICENSE_CLAIM_MAX_AGE=0)
+    def test_claim_max_age(self):
+        claim = claims.issue_claim(self.tenant.id)
+        self.assertIsNone(claims.verify_claim(claim, self.tenant.id))
+
+
+class LicenseActivateClaimTests(TestCase):
+    def setUp(self):
+        django_cache.clear()
+        self.tenant = Tenant.objects.create(name='ActivateTenant')
+        self.admin = User.objects.create_user(username='boss', password='pass', tenant=self.tenant, is_staff=True)
+
+    @override_settings(LICENSE_TOKEN_ALGORITHM='HS256', LICENSE_PUBLIC_KEY='test-secret')
+    def test_activate_returns_claim(self):
+        valid_until = timezone.now() + datetime.timedelta(days=30)
+        token = jwt.encode({'tenant_id': str(self.tenant.id), 'machine_hash': get_machine_hash(),
+                            'features': {'pro': True}, 'valid_until': valid_until.isoformat()},
+                           'test-secret', algorithm='HS256')
+        # called on the viewset directly: planner's 'licenses' route shadows /api/licenses/activate/
+        req = APIRequestFactory().post('/api/licenses/activate/', {'token': token}, format='json')
+        force_authenticate(req, user=self.admin)
+        resp = LicenseViewSet.as_view({'post': 'activate'})(req)
+        self.assertEqual(resp.status_code, 201)
+        claim = resp.data['license_claim']
+        self.assertEqual(resp.cookies[claims.cookie_name()].value, claim)
+        payload = claims.verify_claim(claim, self.tenant.id)
+        self.assertEqual(payload['f'], {'pro': True})
+        self.assertAlmostEqual(payload['u'], valid_until.timestamp(), places=3)
@@ -0,0 +1,70 @@
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+import jwt
+from django.test import SimpleTestCase, override_settings
+
+from . import lib
+
+
+class KeyCacheTests(SimpleTestCase):
+    def setUp(self):
+        lib.clear_caches()
+        self.addCleanup(lib.clear_caches)
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp, True)
+
+    def write(self, name, content, mtime=None):
+        path = os.path.join(self.tmp, name)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        if mtime:
+            os.utime(path, (mtime, mtime))
+        return path
+
+    def token(self, secret):
+        return jwt.encode({'tenant_id': 't1'}, secret, algorithm='HS256')
+
+    def test_key_file_read_once_until_mtime_changes(self):
+        secret_a, secret_b = 'a' * 32, 'b' * 32
+        path = self.write('key.pem', secret_a, mtime=1_000_000)
+        with override_settings(LICENSE_TOKEN_ALGORITHM='HS256', LICENSE_PUBLIC_KEY=path), \
+                mock.patch.object(lib, '_read_text', wraps=lib._read_text) as read:
+            for _ in range(3):
+                self.assertEqual(lib.verify_activation_token(self.token(secret_a))['tenant_id'], 't1')
+            self.assertEqual(read.call_count, 1)
+            # within the check interval the file is not even stat()ed
+            with mock.patch.object(lib.os, 'stat', side_effect=AssertionError('stat called')):
+                lib.verify_activation_token(self.token(secret_a))
+
+            self.write('key.pem', secret_b, mtime=2_000_000)
+            with mock.patch.object(lib, 'FILE_CHECK_INTERVAL', 0):
+                self.assertEqual(lib.verify_activation_token(self.token(secret_b))['tenant_id'], 't1')
+                with self.assertRaises(ValueError):
+                    lib.verify_activation_token(self.token(secret_a))
+            self.assertEqual(read.call_count, 2)
+
+    def test_inline_key_and_prepared_verifier_reused(self):
+        secret = 'c' * 32
+        with override_settings(LICENSE_TOKEN_ALGORITHM='HS256', LICENSE_PUBLIC_KEY=secret):
+            for _ in range(3):
+                lib.verify_activation_token(self.token(secret))
+        info = lib._prepared_key.cache_info()
+        self.assertEqual((info.misses, info.hits), (1, 2))
+
+    def test_unknown_algorithm_is_invalid_token(self):
+        with override_settings(LICENSE_TOKEN_ALGORITHM='XX999', LICENSE_PUBLIC_KEY='k'):
+            with self.assertRaises(ValueError):
+                lib.verify_activation_token(self.token('d' * 32))
+
+    def test_machine_hash_memoized(self):
+        with override_settings(DATA_DIR=self.tmp), \
+                mock.patch.object(lib, '_hash_file', wraps=lib._hash_file) as hash_file:
+            first = lib.get_machine_hash()
+            self.assertEqual([lib.get_machine_hash() for _ in range(3)], [first] * 3)
+            self.assertLessEqual(hash_file.call_count, 1)
+            os.remove(os.path.join(self.tmp, 'machine_id'))
+            with mock.patch.object(lib, 'FILE_CHECK_INTERVAL', 0):
+                self.assertNotEqual(lib.get_machine_hash(), first)
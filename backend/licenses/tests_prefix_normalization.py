@@ -20,3 +20,18 @@ class PrefixNormalizationTests(TestCase):
         self.assertTrue(is_exempt_docs)
         # '/protected' should NOT be exempt just because '/' was in the config
         self.assertFalse(is_exempt_rooted)
+
+    def test_matcher_follows_setting_changes(self):
+        self.assertFalse(self.middleware._is_exempt_path('/custom/x'))
+        with override_settings(LICENSE_ENFORCE_EXEMPT_PATHS=['/custom']):
+            self.assertTrue(self.middleware._is_exempt_path('/custom/x'))
+            # prefixes are literal, not patterns
+            self.assertFalse(self.middleware._is_exempt_path('/cust'))
+        self.assertFalse(self.middleware._is_exempt_path('/custom/x'))
+
+    @override_settings(LICENSE_ENFORCE_EXEMPT_PATHS=['/a.b', '/x+'], LICENSE_ENFORCE_SKIP_ADMIN=False)
+    def test_prefixes_escaped(self):
+        self.assertTrue(self.middleware._is_exempt_path('/a.b/c'))
+        self.assertFalse(self.middleware._is_exempt_path('/aXb/c'))
+        self.assertTrue(self.middleware._is_exempt_path('/x+1'))
+        self.assertFalse(self.middleware._is_exempt_path('/admin/login'))
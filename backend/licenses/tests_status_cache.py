@@ -0,0 +1,84 @@
+import datetime
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache as django_cache
+from django.test import RequestFactory, TestCase, override_settings
+from django.utils import timezone
+
+from tenants.models import Tenant
+from . import cache
+from .middleware import LicenseEnforceMiddleware
+from .models import License
+
+
+User = get_user_model()
+
+
+class LicenseStatusCacheTests(TestCase):
+    def setUp(self):
+        django_cache.clear()
+        self.tenant = Tenant.objects.create(name='CacheTenant')
+        self.user = User.objects.create_user(username='cache', password='pass', tenant=self.tenant)
+        self.middleware = LicenseEnforceMiddleware(get_response=lambda req: None)
+        self.rf = RequestFactory()
+
+    def request(self):
+        req = self.rf.get('/api/campaigns/')
+        # a fresh user instance per request, as the auth middleware would load it
+        req.user = User.objects.get(pk=self.user.pk)
+        return self.middleware.process_request(req)
+
+    def test_repeat_requests_hit_cache(self):
+        License.objects.create(tenant=self.tenant, status='active')
+        self.assertIsNone(self.request())
+        req = self.rf.get('/api/campaigns/')
+        req.user = self.user
+        with self.assertNumQueries(0):
+            self.assertIsNone(self.middleware.process_request(req))
+
+    def test_save_and_delete_invalidate(self):
+        lic = License.objects.create(tenant=self.tenant, status='active')
+        self.assertIsNone(self.request())
+        lic.status = 'revoked'
+        lic.save()
+        self.assertEqual(self.request().status_code, 402)
+        lic.delete()
+        self.assertEqual(self.request().content, b'{"detail": "Tenant license not found"}')
+
+    def test_missing_license_cached_until_created(self):
+        self.assertEqual(self.request().status_code, 402)
+        self.assertEqual(django_cache.get(cache.cache_key(self.tenant.id)), cache.MISSING)
+        License.objects.create(tenant=self.tenant, status='active')
+        self.assertIsNone(self.request())
+
+    def test_expired_license_blocked(self):
+        License.objects.create(tenant=self.tenant, status='active',
+                               valid_until=timezone.now() - datetime.timedelta(minutes=1))
+        resp = self.request()
+        self.assertEqual(resp.status_code, 402)
+        self.assertEqual(resp.content, b'{"detail": "Tenant license expired"}')
+
+    @override_settings(LICENSE_STATUS_CACHE_TTL=300)
+    def test_ttl_capped_by_valid_until(self):
+        soon = timezone.now() + datetime.timedelta(seconds=30)
+        self.assertLessEqual(cache._ttl(soon), 30)
+        self.assertEqual(cache._ttl(None), 300)
+        License.objects.create(tenant=self.tenant, status='active', valid_until=soon)
+        snapshot = cache.get_license_snapshot(self.tenant.id)
+        self.assertEqual((snapshot['status'], snapshot['valid_until']), ('active', soon))
+        # served from the cache with the same values
+        with self.assertNumQueries(0):
+            self.assertEqual(cache.get_license_snapshot(self.tenant.id), snapshot)
+
+    @override_settings(LICENSE_ALLOW_LOCAL_CACHE=False)
+    def test_local_cache_not_trusted(self):
+        # another worker's invalidation would never reach this process's LocMemCache
+        self.assertIsNone(cache.shared_cache())
+        lic = License.objects.create(tenant=self.tenant, status='active')
+        self.assertIsNone(self.request())
+        with self.assertNumQueries(1):
+            self.assertEqual(cache.get_license_snapshot(self.tenant.id)['status'], 'active')
+        self.assertIsNone(django_cache.get(cache.cache_key(self.tenant.id)))
+        # a change made elsewhere, without signals, is seen on the next request
+        License.objects.filter(pk=lic.pk).update(status='revoked')
+        self.assertEqual(self.request().status_code, 402)
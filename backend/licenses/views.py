@@ -1,3 +1,5 @@
+import time
+
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.permissions import IsAdminUser, IsAuthenticated
@@ -6,6 +8,7 @@ from rest_framework.response import Response
 from .models import License
 from .serializers import LicenseSerializer, LicenseActivateSerializer
 from .lib import verify_activation_token, get_machine_hash
+from .claims import attach_claim, enabled as claims_enabled, issue_claim
 
 
 class LicenseViewSet(viewsets.ModelViewSet):
@@ -58,4 +61,14 @@ class LicenseViewSet(viewsets.ModelViewSet):
                 'meta': payload.get('meta', {}),
             }
         )
-        return Response(LicenseSerializer(lic).data, status=status.HTTP_201_CREATED if created else status.HTTP_200_OK)
+        # after the save's own revocation marker, before anything can revoke this state
+        issued_at = time.time()
+        # valid_until comes from the token as a string; read back the stored datetime
+        lic.refresh_from_db(fields=['valid_until'])
+        # signed claim letting the middleware authorize this tenant without a lookup
+        claim = None
+        if claims_enabled():
+            claim = issue_claim(lic.tenant_id, lic.features, lic.valid_until, lic.machine_hash, issued_at=issued_at)
+        data = {**LicenseSerializer(lic).data, 'license_claim': claim}
+        response = Response(data, status=status.HTTP_201_CREATED if created else status.HTTP_200_OK)
+        return attach_claim(response, request, claim) if claim else response
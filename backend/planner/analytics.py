@@ -0,0 +1,142 @@
+"""Planned vs aired delivery of campaigns, aggregated in SQL.
+
+``delivery`` answers, for a set of media plans and the monitoring entries
+reconciled against them: planned spots, planned cost (``spots *
+price_per_spot``), aired spots and match rate, in total and broken down by
+station, show, daypart and day. Aired figures come from the daily rollups
+(``planner.rollups``), refreshed at the end of every import and reconcile
+run, rather than from the entries; station and show are joined from the
+rollups' plans at query time, so they follow plan edits. Plans and rollups are each read once, as
+a ``GROUP BY`` over all the breakdown columns together; the resulting
+groups (at most one per plan line, daypart and day) are rolled up into the
+totals and breakdowns in Python. The cost therefore grows with the number
+of plan lines rather than with the number of entries.
+
+Entries count towards a campaign once reconciliation has set their
+``campaign`` (``planner.reconcile``); the match rate is the share of those
+also matched to a plan. Entries carry no station or show of their own, so
+they are attributed to their plan's; aired spots not matched to a plan land
+in the ``None`` group of those breakdowns. Plans without a price count
+towards ``unpriced_spots`` instead of the cost, which is not looked up
+from rate cards here.
+"""
+from decimal import Decimal
+
+from django.db.models import DecimalField, ExpressionWrapper, F, Q, Sum
+from django.db.models.functions import Coalesce
+
+from stations.models import Daypart, Show, Station
+from . import models
+
+
+# breakdown -> (plan column, rollup column, model naming the groups or None)
+BREAKDOWNS = {
+    'station': ('station_id', 'media_plan__station_id', Station),
+    'show': ('show_id', 'media_plan__show_id', Show),
+    'daypart': ('daypart_id', 'daypart_id', Daypart),
+    'day': ('date', 'date', None),
+}
+CAMPAIGN_BREAKDOWN = {'campaign': ('campaign_id', 'campaign_id', models.Campaign)}
+
+PLAN_COST = ExpressionWrapper(F('spots') * F('price_per_spot'),
+                              output_field=DecimalField(max_digits=18, decimal_places=2))
+PLANNED = {
+    'planned_spots': Coalesce(Sum('spots'), 0),
+    'planned_cost': Sum(PLAN_COST),
+    'unpriced_spots': Coalesce(Sum('spots', filter=Q(price_per_spot__isnull=True)), 0),
+}
+AIRED = {
+    'aired_spots': Coalesce(Sum('spots_aired'), 0),
+    'entries': Coalesce(Sum('entry_count'), 0),
+    'matched_entries': Coalesce(Sum('matched_count'), 0),
+}
+CENT = Decimal('0.01')
+
+
+def _empty():
+    return {'planned_spots': 0, 'planned_cost': None, 'unpriced_spots': 0,
+            'aired_spots': 0, 'entries': 0, 'matched_entries': 0}
+
+
+def _add(total, row, measures):
+    for name in measures:
+        value = row[name]
+        if value is None:
+            continue
+        if name == 'planned_cost':
+            # SQLite hands decimal sums back as floats
+            value = Decimal(str(value))
+            total[name] = value if total[name] is None else total[name] + value
+        else:
+            total[name] += value
+
+
+def _finish(row):
+    # a string like stations.pricing.plan_totals
+    if row['planned_cost'] is not None:
+        row['planned_cost'] = str(row['planned_cost'].quantize(CENT))
+    row['match_rate'] = round(row['matched_entries'] / row['entries'], 4) if row['entries'] else None
+    return row
+
+
+def _grouped(queryset, columns, measures):
+    """``(keys, measures)`` of ``queryset`` grouped by all of ``columns`` (``{breakdown: column}``)."""
+    # aliased, as e.g. 'station' is also a field of the model
+    aliases = {name: f'{name}_group' for name in columns}
+    rows = queryset.order_by().values(**{aliases[name]: F(column) for name, column in columns.items()})
+    return [({name: row[alias] for name, alias in aliases.items()}, row) for row in rows.annotate(**measures)]
+
+
+def _labels(model, keys):
+    keys = [key for key in keys if key is not None]
+    return dict(model.objects.filter(pk__in=keys).values_list('pk', 'name')) if keys else {}
+
+
+def delivery(plans, rollups, breakdowns=BREAKDOWNS):
+    """Totals and ``by_<breakdown>`` rows for the ``plans`` and ``DailyDeliveryRollup`` querysets."""
+    planned = _grouped(plans, {name: plan for name, (plan, _, _) in breakdowns.items()}, PLANNED)
+    aired = _grouped(rollups, {name: rollup for name, (_, rollup, _) in breakdowns.items()}, AIRED)
+    totals = _empty()
+    groups = {name: {} for name in breakdowns}
+    for rows, measures in ((planned, PLANNED), (aired, AIRED)):
+        for keys, row in rows:
+            _add(totals, row, measures)
+            for name, key in keys.items():
+                group = groups[name].get(key)
+                if group is None:
+                    group = groups[name][key] = _empty()
+                _add(group, row, measures)
+    result = {'totals': _finish(totals)}
+    for name, (_, _, model) in breakdowns.items():
+        if model is None:
+            rows = [_finish({'date': key, **group}) for key, group in groups[name].items()]
+            rows.sort(key=lambda row: (row['date'] is None, row['date'] or 0))
+        else:
+            labels = _labels(model, groups[name])
+            rows = [_finish({'id': key, 'name': labels.get(key), **group}) for key, group in groups[name].items()]
+            rows.sort(key=lambda row: (row['id'] is None, row['name'] or '', str(row['id'])))
+        result[f'by_{name}'] = rows
+    return result
+
+
+def _window(plans, rollups, date_from, date_to):
+    if date_from:
+        plans, rollups = plans.filter(date__gte=date_from), rollups.filter(date__gte=date_from)
+    if date_to:
+        plans, rollups = plans.filter(date__lte=date_to), rollups.filter(date__lte=date_to)
+    return plans, rollups
+
+
+def campaign_delivery(campaign, date_from=None, date_to=None):
+    """Delivery of one campaign, optionally within a date window (plan date / air date)."""
+    plans = models.MediaPlan.objects.filter(campaign=campaign)
+    rollups = models.DailyDeliveryRollup.objects.filter(tenant_id=campaign.tenant_id, campaign=campaign)
+    return {'campaign': campaign.pk, **delivery(*_window(plans, rollups, date_from, date_to))}
+
+
+def tenant_delivery(tenant_id, date_from=None, date_to=None):
+    """Delivery of all of a tenant's campaigns, with a per-campaign breakdown as well."""
+    plans = models.MediaPlan.objects.filter(campaign__tenant_id=tenant_id)
+    rollups = models.DailyDeliveryRollup.objects.filter(tenant_id=tenant_id, campaign__isnull=False)
+    plans, rollups = _window(plans, rollups, date_from, date_to)
+    return {'tenant': tenant_id, **delivery(plans, rollups, {**CAMPAIGN_BREAKDOWN, **BREAKDOWNS})}
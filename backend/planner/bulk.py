@@ -0,0 +1,69 @@
+"""Set-based status transitions and edits for media plan lines.
+
+``transition_plans`` moves every plan of a queryset whose current status
+allows it to the target status with a single ``UPDATE ... WHERE status IN
+(...)`` and reports the rows left behind. ``update_plans`` loads the
+edited plans in one query and writes them back with ``bulk_update``.
+Neither costs a query per line.
+"""
+from django.db import transaction
+from django.utils import timezone
+
+from . import models
+from .loaders import BATCH_SIZE
+
+
+EDITABLE_FIELDS = ('spots', 'price_per_spot')
+# plans in these statuses cannot be edited in bulk
+FROZEN_STATUSES = ('locked',)
+
+
+def allowed_sources(status):
+    """Statuses a plan may be moved to ``status`` from."""
+    return sorted(source for source, targets in models.MediaPlan.STATUS_TRANSITIONS.items() if status in targets)
+
+
+def transition_plans(plans, status):
+    """Move ``plans`` to ``status`` where allowed.
+
+    Returns the number of plans updated and, for plans that are neither
+    moved nor already in ``status``, their id, current status and why.
+    """
+    with transaction.atomic():
+        updated = plans.filter(status__in=allowed_sources(status)).update(status=status, updated_at=timezone.now())
+        failed = [{'id': pk, 'status': current, 'detail': f'Cannot move from {current} to {status}.'}
+                  for pk, current in plans.exclude(status=status).values_list('id', 'status')]
+    return {'updated': updated, 'failed': failed}
+
+
+def update_plans(plans, edits):
+    """Apply validated ``edits`` (dicts with ``id`` and any of ``EDITABLE_FIELDS``) to ``plans``.
+
+    Edits for plans outside ``plans`` or in ``FROZEN_STATUSES`` are
+    reported in ``failed``; the rest are written with one ``bulk_update``.
+    """
+    found = plans.in_bulk([edit['id'] for edit in edits])
+    now = timezone.now()
+    changed = {}
+    fields = set()
+    failed = []
+    for edit in edits:
+        plan = found.get(edit['id'])
+        if plan is None:
+            failed.append({'id': edit['id'], 'detail': 'Not found.'})
+            continue
+        if plan.status in FROZEN_STATUSES:
+            failed.append({'id': plan.id, 'status': plan.status,
+                           'detail': f'{plan.status.capitalize()} plans cannot be edited.'})
+            continue
+        for field in EDITABLE_FIELDS:
+            if field in edit:
+                setattr(plan, field, edit[field])
+                fields.add(field)
+        plan.updated_at = now
+        changed[plan.pk] = plan
+    if changed:
+        with transaction.atomic():
+            models.MediaPlan.objects.bulk_update(
+                changed.values(), sorted(fields) + ['updated_at'], batch_size=BATCH_SIZE)
+    return {'updated': len(changed), 'failed': failed}
@@ -0,0 +1,153 @@
+"""Duplicate detection for monitoring uploads and entries.
+
+Stations re-send the same logs, and consecutive logs often overlap. Two
+levels keep the copies out:
+
+- ``file_sha256`` hashes an upload in fixed-size chunks; an upload whose
+  hash matches an earlier, non-failed import of the same tenant is answered
+  with that import instead of being stored again. A unique constraint on
+  (tenant, hash) over live imports catches identical uploads that race
+  past the lookup.
+- ``entry_fingerprint`` identifies an aired spot by station, airtime,
+  campaign and duration. A log can list the same spot several times (it
+  aired more than once in that slot), so ``drop_duplicates`` numbers the
+  repeats within an import: the n-th identical row gets
+  ``occurrence_fingerprint(fingerprint, n)``. ``MonitoringEntry.fingerprint``
+  is unique per tenant, and the pipeline skips rows whose numbered
+  fingerprint another import already stored, so an overlapping file only
+  inserts the spots (or extra repeats) that are new.
+
+Numbering reads the ordinals an import already stored, so the ranges of a
+fanned-out import number (and insert) their chunks one at a time under
+``lock``. A row can still lose its fingerprint to a concurrent import of
+the same spot; ``inserted`` tells which rows a chunk actually stored.
+
+Both are controlled by ``settings.MONITORING_IMPORT_DEDUPLICATE``.
+"""
+import hashlib
+
+from django.conf import settings
+from django.db import connection
+
+from . import models
+from .parsers import READ_CHUNK_SIZE
+
+
+def enabled():
+    return getattr(settings, 'MONITORING_IMPORT_DEDUPLICATE', True)
+
+
+def lock(import_id):
+    """Serialize numbering and inserting for ``import_id`` until the surrounding transaction ends."""
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_advisory_xact_lock(hashtext(%s))', [f'planner.dedup:{import_id}'])
+
+
+def file_sha256(fileobj):
+    """Hex SHA-256 of an uploaded file, read in chunks; rewinds the file."""
+    digest = hashlib.sha256()
+    if hasattr(fileobj, 'chunks'):
+        chunks = fileobj.chunks(READ_CHUNK_SIZE)
+    else:
+        chunks = iter(lambda: fileobj.read(READ_CHUNK_SIZE), b'')
+    for chunk in chunks:
+        digest.update(chunk)
+    fileobj.seek(0)
+    return digest.hexdigest()
+
+
+def find_duplicate_import(tenant_id, content_hash):
+    """Return the earliest non-failed import of ``tenant_id`` with this hash, or ``None``."""
+    if not content_hash:
+        return None
+    return (models.MonitoringImport.objects
+            .filter(tenant_id=tenant_id, content_hash=content_hash)
+            .exclude(status='failed').order_by('created_at').first())
+
+
+def entry_fingerprint(station_key, airtime, campaign_ref, campaign_key, duration):
+    """Fingerprint of one aired spot, or '' when the row has no airtime.
+
+    Takes the normalized keys from ``matching.entry_keys``, so it does not
+    depend on whether the campaign was matched yet.
+    """
+    if airtime is None:
+        return ''
+    parts = (station_key, airtime.isoformat(), campaign_ref or campaign_key,
+             '' if duration is None else str(duration))
+    return hashlib.blake2b('\x1f'.join(parts).encode('utf-8'), digest_size=16).hexdigest()
+
+
+def occurrence_fingerprint(fingerprint, n):
+    """Fingerprint of the ``n``-th identical spot; the first keeps ``fingerprint`` itself."""
+    if n == 1:
+        return fingerprint
+    return hashlib.blake2b(f'{fingerprint}\x1f{n}'.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def _stored_owners(entries_by_spot, tenant_id, import_id):
+    """``{numbered fingerprint: import id}`` stored for the ordinals ``drop_duplicates`` will hand out.
+
+    Ordinals already taken by ``import_id`` itself (chunks committed earlier,
+    or another range of the same import) are skipped when numbering, so for
+    every such hit one more ordinal of that spot is looked up.
+    """
+    owners = {}
+    looked_up = dict.fromkeys(entries_by_spot, 0)
+    needed = {spot: len(group) for spot, group in entries_by_spot.items()}
+    while needed:
+        candidates = {}
+        for spot, count in needed.items():
+            for n in range(looked_up[spot] + 1, looked_up[spot] + count + 1):
+                candidates[occurrence_fingerprint(spot, n)] = spot
+            looked_up[spot] += count
+        found = dict(models.MonitoringEntry.objects
+                     .filter(tenant_id=tenant_id, fingerprint__in=candidates)
+                     .values_list('fingerprint', 'monitoring_import_id'))
+        owners.update(found)
+        needed = {}
+        for fingerprint, owner in found.items():
+            if owner == import_id:
+                needed[candidates[fingerprint]] = needed.get(candidates[fingerprint], 0) + 1
+    return owners
+
+
+def drop_duplicates(entries, tenant_id, import_id):
+    """Number repeated spots of ``entries`` and drop those another import of the tenant stored.
+
+    Rows of one import are never dropped against each other: identical rows
+    get successive ordinals, continuing after the ones ``import_id`` has
+    already stored. Sets ``fingerprint`` on the kept entries.
+    """
+    entries_by_spot = {}
+    for entry in entries:
+        if entry.fingerprint:
+            entries_by_spot.setdefault(entry.fingerprint, []).append(entry)
+    if not entries_by_spot:
+        return entries
+    owners = _stored_owners(entries_by_spot, tenant_id, import_id)
+    next_ordinal = dict.fromkeys(entries_by_spot, 1)
+    kept = []
+    for entry in entries:
+        if entry.fingerprint:
+            spot, n = entry.fingerprint, next_ordinal[entry.fingerprint]
+            while owners.get(occurrence_fingerprint(spot, n)) == import_id:
+                n += 1
+            next_ordinal[spot] = n + 1
+            entry.fingerprint = occurrence_fingerprint(spot, n)
+            if entry.fingerprint in owners:
+                continue
+        kept.append(entry)
+    return kept
+
+
+def inserted(entries, tenant_id, import_id):
+    """The entries ``import_id`` stored; the rest lost their fingerprint to another import."""
+    fingerprints = [entry.fingerprint for entry in entries if entry.fingerprint]
+    if not fingerprints:
+        return entries
+    stored = set(models.MonitoringEntry.objects
+                 .filter(tenant_id=tenant_id, fingerprint__in=fingerprints, monitoring_import_id=import_id)
+                 .values_list('fingerprint', flat=True))
+    return [entry for entry in entries if not entry.fingerprint or entry.fingerprint in stored]
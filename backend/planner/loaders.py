@@ -0,0 +1,119 @@
+"""Loader backends writing ``MonitoringEntry`` batches to the database.
+
+``BulkCreateLoader`` is the portable path (multi-row INSERTs through
+``bulk_create``). ``CopyLoader`` streams the same rows into PostgreSQL with
+``COPY ... FROM STDIN`` through psycopg, which avoids building and parsing
+large parameterized INSERT statements for the JSON ``raw_row`` payloads.
+
+The loader is chosen per import from ``MonitoringImport.meta['loader']``,
+falling back to ``settings.MONITORING_IMPORT_LOADER`` (``bulk_create``
+unless a deployment opts into ``copy``). ``copy`` quietly
+degrades to ``bulk_create`` on databases other than PostgreSQL (SQLite in
+tests). With ``ignore_conflicts`` both skip rows that would violate a
+unique constraint (entry fingerprints, see ``dedup``).
+"""
+from django.conf import settings
+from django.db import connection
+
+from . import models
+
+
+BATCH_SIZE = 500
+DEFAULT_LOADER = 'bulk_create'
+
+
+class BulkCreateLoader:
+    """Insert entries with ``bulk_create`` in batches of ``batch_size``."""
+
+    name = 'bulk_create'
+
+    def __init__(self, model=models.MonitoringEntry, batch_size=BATCH_SIZE, ignore_conflicts=False):
+        self.model = model
+        self.batch_size = batch_size
+        self.ignore_conflicts = ignore_conflicts
+
+    def load(self, objs):
+        if objs:
+            self.model.objects.bulk_create(objs, batch_size=self.batch_size, ignore_conflicts=self.ignore_conflicts)
+
+
+class CopyLoader:
+    """Insert entries with a single ``COPY ... FROM STDIN`` per call (PostgreSQL only).
+
+    Values go through each field's ``pre_save``/``get_db_prep_save`` exactly
+    as ``bulk_create`` would, so defaults such as ``auto_now_add`` timestamps
+    and JSON encoding behave the same. The text COPY format is used; psycopg
+    adapts every value from its Python type, so no per-column binary type
+    declarations are needed.
+
+    COPY cannot skip conflicting rows, so with ``ignore_conflicts`` the rows
+    are copied into a session-local staging table first and moved over with
+    ``INSERT ... SELECT ... ON CONFLICT DO NOTHING``.
+    """
+
+    name = 'copy'
+
+    def __init__(self, model=models.MonitoringEntry, ignore_conflicts=False, **kwargs):
+        self.model = model
+        self.ignore_conflicts = ignore_conflicts
+        # Field.generated only exists from Django 5.0 on
+        self.fields = [f for f in model._meta.local_concrete_fields if not getattr(f, 'generated', False)]
+
+    @property
+    def table(self):
+        return connection.ops.quote_name(self.model._meta.db_table)
+
+    @property
+    def staging_table(self):
+        return connection.ops.quote_name(f'{self.model._meta.db_table}_copy_staging')
+
+    @property
+    def columns(self):
+        return ', '.join(connection.ops.quote_name(f.column) for f in self.fields)
+
+    def copy_sql(self, table=None):
+        return f'COPY {table or self.table} ({self.columns}) FROM STDIN'
+
+    def rows(self, objs):
+        for obj in objs:
+            yield [f.get_db_prep_save(f.pre_save(obj, True), connection) for f in self.fields]
+
+    def load(self, objs):
+        if not objs:
+            return
+        with connection.cursor() as cursor:
+            target = self.table
+            if self.ignore_conflicts:
+                target = self.staging_table
+                cursor.execute(f'CREATE TEMP TABLE IF NOT EXISTS {target} (LIKE {self.table} INCLUDING DEFAULTS)')
+                cursor.execute(f'TRUNCATE {target}')
+            # the psycopg cursor behind Django's wrapper exposes ``copy()``
+            with cursor.cursor.copy(self.copy_sql(target)) as copy:
+                for row in self.rows(objs):
+                    copy.write_row(row)
+            if self.ignore_conflicts:
+                cursor.execute(f'INSERT INTO {self.table} ({self.columns}) '
+                               f'SELECT {self.columns} FROM {target} ON CONFLICT DO NOTHING')
+
+
+LOADERS = {
+    BulkCreateLoader.name: BulkCreateLoader,
+    CopyLoader.name: CopyLoader,
+}
+
+
+def supports_copy():
+    return connection.vendor == 'postgresql'
+
+
+def get_loader(name=None, batch_size=BATCH_SIZE, ignore_conflicts=False):
+    """Return a loader instance for ``name`` (or the configured default).
+
+    Raises ``ValueError`` for unknown loader names.
+    """
+    name = name or getattr(settings, 'MONITORING_IMPORT_LOADER', DEFAULT_LOADER)
+    if name not in LOADERS:
+        raise ValueError(f'unknown loader {name!r}')
+    if name == CopyLoader.name and not supports_copy():
+        name = BulkCreateLoader.name
+    return LOADERS[name](batch_size=batch_size, ignore_conflicts=ignore_conflicts)
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from planner import rollups
+
+
+class Command(BaseCommand):
+    help = 'Recompute the daily delivery rollups from the monitoring entries (all tenants, or one)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tenant', help='only rebuild this tenant id')
+
+    def handle(self, *args, **options):
+        written = rollups.rebuild(options['tenant'])
+        self.stdout.write(f'Wrote {written} rollup rows')
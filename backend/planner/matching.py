@@ -0,0 +1,150 @@
+"""In-memory reconciliation of monitoring rows against campaigns and media plans.
+
+``EntryMatcher`` loads a tenant's campaigns (and, on first use, its dated
+media plans) once and answers every row lookup from dict indexes, so an
+import costs a fixed number of queries instead of several per row. Only the
+plans dated within the air-date window given to ``cover`` are loaded, so
+memory follows the rows being matched rather than the tenant's history. The
+lookup rules mirror the ORM filters used previously:
+
+- campaign by exact ``external_id``, then by case-insensitive ``name``;
+- media plan by campaign + air date, narrowed by show and/or station name
+  when the row provides them;
+- names compare as ``normalize_key`` (``stations.names``), which the models
+  store as ``name_key``;
+- ties resolve to the lowest primary key, like ``QuerySet.first()``.
+
+``entry_keys`` computes the same normalized keys for storage on
+``MonitoringEntry`` so ``planner.reconcile`` can apply these rules in SQL.
+"""
+from stations.names import KEY_MAX_LENGTH, normalize_key
+from . import models
+
+
+CAMPAIGN_ID_COLUMNS = ('campaign_id', 'campaign_external_id', 'campaign_id_external')
+CAMPAIGN_NAME_COLUMNS = ('campaign', 'campaign_name', 'advertiser')
+SHOW_COLUMNS = ('show', 'show_name')
+STATION_COLUMNS = ('station', 'station_name')
+
+
+def first_value(raw, columns):
+    """Return the first truthy value among ``columns`` (like chained ``or``)."""
+    for col in columns:
+        value = raw.get(col)
+        if value:
+            return value
+    return None
+
+
+def entry_keys(raw, airtime):
+    """Return the normalized lookup fields stored on ``MonitoringEntry``.
+
+    Empty strings mean the row did not provide the value.
+    """
+    campaign_ref = first_value(raw, CAMPAIGN_ID_COLUMNS)
+    campaign_name = first_value(raw, CAMPAIGN_NAME_COLUMNS)
+    show = first_value(raw, SHOW_COLUMNS)
+    station = first_value(raw, STATION_COLUMNS)
+    return {
+        'campaign_ref': str(campaign_ref)[:KEY_MAX_LENGTH] if campaign_ref else '',
+        'campaign_key': normalize_key(campaign_name) if campaign_name else '',
+        'show_key': normalize_key(show) if show else '',
+        'station_key': normalize_key(station) if station else '',
+        'air_date': airtime.date() if airtime else None,
+    }
+
+
+class EntryMatcher:
+    """Per-import matcher resolving rows to a campaign and media plan in O(1)."""
+
+    def __init__(self, tenant_id, date_from=None, date_to=None):
+        self.tenant_id = tenant_id
+        self.date_from = date_from
+        self.date_to = date_to
+        self._by_external_id = {}
+        self._by_name = {}
+        self._plans = None
+        self._load_campaigns()
+
+    def _load_campaigns(self):
+        qs = (models.Campaign.objects.filter(tenant_id=self.tenant_id)
+              .only('id', 'tenant_id', 'name', 'name_key', 'external_id').order_by('pk'))
+        for campaign in qs.iterator():
+            # setdefault keeps the lowest pk for duplicate keys
+            if campaign.external_id is not None:
+                self._by_external_id.setdefault(campaign.external_id, campaign)
+            self._by_name.setdefault(campaign.name_key, campaign)
+
+    def _load_plans(self):
+        qs = models.MediaPlan.objects.filter(campaign__tenant_id=self.tenant_id, date__isnull=False)
+        if self.date_from:
+            qs = qs.filter(date__gte=self.date_from)
+        if self.date_to:
+            qs = qs.filter(date__lte=self.date_to)
+        qs = (qs.select_related('show', 'station')
+              .only('id', 'campaign_id', 'date', 'show__name_key', 'station__name_key').order_by('pk'))
+        plans = {}
+        for plan in qs.iterator():
+            show = plan.show.name_key if plan.show_id else None
+            station = plan.station.name_key if plan.station_id else None
+            keys = [(None, None)]
+            if show is not None:
+                keys.append((show, None))
+            if station is not None:
+                keys.append((None, station))
+            if show is not None and station is not None:
+                keys.append((show, station))
+            for show_key, station_key in keys:
+                plans.setdefault((plan.campaign_id, plan.date, show_key, station_key), plan)
+        self._plans = plans
+
+    def cover(self, date_from, date_to):
+        """Match rows aired between ``date_from`` and ``date_to`` (inclusive) from now on.
+
+        Plans are reloaded for the new window unless the loaded one already
+        contains it.
+        """
+        if (self._plans is not None
+                and (self.date_from is None or date_from >= self.date_from)
+                and (self.date_to is None or date_to <= self.date_to)):
+            return
+        self.date_from, self.date_to = date_from, date_to
+        self._plans = None
+
+    def match_campaign(self, raw):
+        campaign = None
+        campaign_id_val = first_value(raw, CAMPAIGN_ID_COLUMNS)
+        if campaign_id_val:
+            campaign = self._by_external_id.get(str(campaign_id_val))
+        if not campaign:
+            campaign_name_val = first_value(raw, CAMPAIGN_NAME_COLUMNS)
+            if campaign_name_val:
+                campaign = self._by_name.get(normalize_key(campaign_name_val))
+        return campaign
+
+    def match_media_plan(self, campaign, airtime, raw):
+        if not campaign or not airtime:
+            return None
+        if self._plans is None:
+            self._load_plans()
+        show_val = first_value(raw, SHOW_COLUMNS)
+        station_val = first_value(raw, STATION_COLUMNS)
+        key = (
+            campaign.id,
+            airtime.date(),
+            normalize_key(show_val) if show_val else None,
+            normalize_key(station_val) if station_val else None,
+        )
+        return self._plans.get(key)
+
+    def match(self, raw, airtime):
+        """Return ``(campaign, media_plan, match_status)`` for a normalized row."""
+        campaign = self.match_campaign(raw)
+        media_plan = self.match_media_plan(campaign, airtime, raw)
+        if media_plan:
+            match_status = 'matched'
+        elif campaign:
+            match_status = 'ambiguous'
+        else:
+            match_status = 'unmatched'
+        return campaign, media_plan, match_status
@@ -0,0 +1,79 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:36
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def first_value(raw, columns):
+    for col in columns:
+        if raw.get(col):
+            return raw[col]
+    return None
+
+
+def key(value):
+    return str(value).strip().lower()[:512] if value else ''
+
+
+def backfill_match_keys(apps, schema_editor):
+    # same rules as planner.matching.entry_keys at the time of this migration
+    MonitoringEntry = apps.get_model('planner', 'MonitoringEntry')
+    fields = ['campaign_ref', 'campaign_key', 'show_key', 'station_key', 'air_date']
+    batch = []
+    for entry in MonitoringEntry.objects.only('id', 'raw_row', 'airtime').iterator(chunk_size=2000):
+        raw = entry.raw_row or {}
+        ref = first_value(raw, ('campaign_id', 'campaign_external_id', 'campaign_id_external'))
+        entry.campaign_ref = str(ref)[:512] if ref else ''
+        entry.campaign_key = key(first_value(raw, ('campaign', 'campaign_name', 'advertiser')))
+        entry.show_key = key(first_value(raw, ('show', 'show_name')))
+        entry.station_key = key(first_value(raw, ('station', 'station_name')))
+        # airtimes were parsed naive and stored in the default time zone
+        entry.air_date = timezone.localtime(entry.airtime).date() if entry.airtime else None
+        batch.append(entry)
+        if len(batch) >= 2000:
+            MonitoringEntry.objects.bulk_update(batch, fields)
+            batch = []
+    if batch:
+        MonitoringEntry.objects.bulk_update(batch, fields)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('planner', '0005_monitoringreport_campaign_monitoringreport_file_and_more'),
+        ('stations', '0001_initial'),
+        ('tenants', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='monitoringentry',
+            name='air_date',
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='monitoringentry',
+            name='campaign_key',
+            field=models.CharField(blank=True, default='', max_length=512),
+        ),
+        migrations.AddField(
+            model_name='monitoringentry',
+            name='campaign_ref',
+            field=models.CharField(blank=True, default='', max_length=512),
+        ),
+        migrations.AddField(
+            model_name='monitoringentry',
+            name='show_key',
+            field=models.CharField(blank=True, default='', max_length=512),
+        ),
+        migrations.AddField(
+            model_name='monitoringentry',
+            name='station_key',
+            field=models.CharField(blank=True, default='', max_length=512),
+        ),
+        migrations.RunPython(backfill_match_keys, reverse_code=migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='monitoringentry',
+            index=models.Index(fields=['monitoring_import', 'match_status'], name='planner_mon_monitor_e655c0_idx'),
+        ),
+    ]
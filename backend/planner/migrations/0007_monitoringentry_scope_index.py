@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('planner', '0006_monitoringentry_match_keys'),
+        ('stations', '0001_initial'),
+        ('tenants', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='monitoringentry',
+            index=models.Index(fields=['tenant', 'match_status', 'air_date'], name='planner_mon_tenant__c9ae10_idx'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:40
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('planner', '0007_monitoringentry_scope_index'),
+        ('stations', '0001_initial'),
+        ('tenants', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='monitoringentry',
+            name='fingerprint',
+            field=models.CharField(blank=True, default='', max_length=32),
+        ),
+        migrations.AddField(
+            model_name='monitoringimport',
+            name='content_hash',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+        migrations.AddIndex(
+            model_name='monitoringimport',
+            index=models.Index(fields=['tenant', 'content_hash'], name='planner_mon_tenant__ad6008_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='monitoringentry',
+            constraint=models.UniqueConstraint(condition=models.Q(('fingerprint', ''), _negated=True), fields=('tenant', 'fingerprint'), name='planner_entry_unique_fingerprint'),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('planner', '0008_monitoring_dedup'),
+        ('stations', '0002_catalog_tenant_indexes'),
+        ('tenants', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='monitoringentry',
+            name='planner_mon_monitor_e655c0_idx',
+        ),
+        migrations.AddIndex(
+            model_name='monitoringentry',
+            index=models.Index(fields=['monitoring_import', 'match_status', 'id'], name='planner_mon_monitor_d2cbba_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='monitoringentry',
+            index=models.Index(fields=['monitoring_import', 'id'], name='planner_mon_monitor_1ef9a5_idx'),
+        ),
+    ]
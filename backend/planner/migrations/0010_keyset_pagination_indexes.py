@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:09
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('planner', '0009_monitoringentry_page_indexes'),
+        ('stations', '0002_catalog_tenant_indexes'),
+        ('tenants', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='mediaplan',
+            index=models.Index(fields=['campaign', 'created_at', 'id'], name='planner_med_campaig_fac634_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='mediaplan',
+            index=models.Index(fields=['created_at', 'id'], name='planner_med_created_1bd114_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='monitoringimport',
+            index=models.Index(fields=['tenant', 'created_at', 'id'], name='planner_mon_tenant__3eb518_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='monitoringreport',
+            index=models.Index(fields=['created_at', 'id'], name='planner_mon_created_5e7090_idx'),
+        ),
+    ]
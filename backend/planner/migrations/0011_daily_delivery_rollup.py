@@ -0,0 +1,64 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:27
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('planner', '0010_keyset_pagination_indexes'),
+        ('stations', '0002_catalog_tenant_indexes'),
+        ('tenants', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyDeliveryRollup',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('date', models.DateField(blank=True, null=True)),
+                ('spots_aired', models.IntegerField(default=0)),
+                ('entry_count', models.IntegerField(default=0)),
+                ('matched_count', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='monitoringentry',
+            index=models.Index(fields=['tenant', 'air_date'], name='planner_mon_tenant__b986f4_idx'),
+        ),
+        migrations.AddField(
+            model_name='dailydeliveryrollup',
+            name='campaign',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='planner.campaign'),
+        ),
+        migrations.AddField(
+            model_name='dailydeliveryrollup',
+            name='daypart',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='stations.daypart'),
+        ),
+        migrations.AddField(
+            model_name='dailydeliveryrollup',
+            name='media_plan',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='planner.mediaplan'),
+        ),
+        migrations.AddField(
+            model_name='dailydeliveryrollup',
+            name='station',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='stations.station'),
+        ),
+        migrations.AddField(
+            model_name='dailydeliveryrollup',
+            name='tenant',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='tenants.tenant'),
+        ),
+        migrations.AddIndex(
+            model_name='dailydeliveryrollup',
+            index=models.Index(fields=['tenant', 'date'], name='planner_dai_tenant__7cf11e_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='dailydeliveryrollup',
+            index=models.Index(fields=['tenant', 'campaign', 'date'], name='planner_dai_tenant__e5ec4d_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:44
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('planner', '0011_daily_delivery_rollup'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='dailydeliveryrollup',
+            name='station',
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:51
+
+from django.db import migrations, models
+
+
+def backfill_name_keys(apps, schema_editor):
+    # same key as stations.names.normalize_key at the time of this migration
+    for model_name in ('Campaign',):
+        model = apps.get_model('planner', model_name)
+        batch = []
+        for obj in model.objects.only('id', 'name').iterator(chunk_size=2000):
+            obj.name_key = str(obj.name).strip().lower()[:512]
+            batch.append(obj)
+            if len(batch) >= 2000:
+                model.objects.bulk_update(batch, ['name_key'])
+                batch = []
+        if batch:
+            model.objects.bulk_update(batch, ['name_key'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('planner', '0012_rollup_station_from_plan'),
+        ('tenants', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='campaign',
+            name='name_key',
+            field=models.CharField(blank=True, default='', editable=False, max_length=512),
+        ),
+        migrations.RunPython(backfill_name_keys, reverse_code=migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='campaign',
+            index=models.Index(fields=['tenant', 'name_key'], name='planner_cam_tenant__6a622d_idx'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:06
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def clear_duplicate_hashes(apps, schema_editor):
+    # imports that slipped past the lookup keep their entries; only the earliest keeps the hash
+    MonitoringImport = apps.get_model('planner', 'MonitoringImport')
+    seen = set()
+    duplicates = []
+    live = (MonitoringImport.objects.exclude(content_hash='').exclude(status='failed')
+            .order_by('created_at', 'pk').values_list('pk', 'tenant_id', 'content_hash'))
+    for pk, tenant_id, content_hash in live.iterator(chunk_size=2000):
+        # the constraint treats imports without a tenant as distinct
+        if tenant_id is not None and (tenant_id, content_hash) in seen:
+            duplicates.append(pk)
+        seen.add((tenant_id, content_hash))
+    for i in range(0, len(duplicates), 2000):
+        MonitoringImport.objects.filter(pk__in=duplicates[i:i + 2000]).update(content_hash='')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('planner', '0013_campaign_name_key'),
+        ('tenants', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(clear_duplicate_hashes, reverse_code=migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='monitoringimport',
+            constraint=models.UniqueConstraint(condition=models.Q(models.Q(('content_hash', ''), _negated=True), models.Q(('status', 'failed'), _negated=True)), fields=('tenant', 'content_hash'), name='planner_import_unique_content_hash'),
+        ),
+    ]
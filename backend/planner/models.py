@@ -1,8 +1,12 @@
 import uuid
 from django.db import models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 from django.conf import settings
 from django.utils import timezone
 
+from stations.names import NameKeyMixin, name_key_field
+
 
 class TimestampedModel(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
@@ -12,10 +16,12 @@ class TimestampedModel(models.Model):
         abstract = True
 
 
-class Campaign(TimestampedModel):
+class Campaign(NameKeyMixin, TimestampedModel):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     tenant = models.ForeignKey('tenants.Tenant', on_delete=models.CASCADE)
     name = models.CharField(max_length=255)
+    # normalize_key(name), matched against monitoring entries' campaign_key
+    name_key = name_key_field()
     external_id = models.CharField(max_length=128, blank=True, null=True)
     advertiser_name = models.CharField(max_length=255, blank=True, null=True)
     target_audience = models.CharField(max_length=255, blank=True, null=True)
@@ -33,7 +39,11 @@ class Campaign(TimestampedModel):
     meta = models.JSONField(default=dict, blank=True)
 
     class Meta:
-        indexes = [models.Index(fields=['tenant', 'start_date', 'end_date'])]
+        indexes = [
+            models.Index(fields=['tenant', 'start_date', 'end_date']),
+            # campaign lookup by name in planner.reconcile
+            models.Index(fields=['tenant', 'name_key']),
+        ]
 
     def __str__(self):
         return f"{self.name} ({self.tenant_id})"
@@ -60,10 +70,23 @@ class MediaPlan(TimestampedModel):
         ('locked', 'Locked'),
         ('rejected', 'Rejected'),
     )
+    # status -> statuses a plan may move to from it (see bulk.transition_plans)
+    STATUS_TRANSITIONS = {
+        'draft': {'pending'},
+        'pending': {'accepted', 'rejected', 'draft'},
+        'accepted': {'locked', 'pending'},
+        'rejected': {'draft'},
+        'locked': set(),
+    }
     status = models.CharField(max_length=32, choices=STATUS_CHOICES, default='draft')
 
     class Meta:
-        indexes = [models.Index(fields=['campaign', 'status'])]
+        indexes = [
+            models.Index(fields=['campaign', 'status']),
+            # keyset pages (see planner.pagination), per campaign and overall
+            models.Index(fields=['campaign', 'created_at', 'id']),
+            models.Index(fields=['created_at', 'id']),
+        ]
 
     def __str__(self):
         return self.name
@@ -93,7 +116,10 @@ class MonitoringReport(TimestampedModel):
     summary = models.TextField(blank=True)
 
     class Meta:
-        indexes = [models.Index(fields=['media_plan', 'generated_at'])]
+        indexes = [
+            models.Index(fields=['media_plan', 'generated_at']),
+            models.Index(fields=['created_at', 'id']),
+        ]
 
     def __str__(self):
         return f"Report {self.id} for {self.media_plan_id}"
@@ -117,6 +143,23 @@ class License(TimestampedModel):
         return f"License {self.license_key} for {self.tenant_id}"
 
 
+class MonitoringImportQuerySet(models.QuerySet):
+    def with_entry_counts(self):
+        """Annotate ``entries_total`` and ``entries_<match status>`` counts.
+
+        Each count is a correlated subquery answered from the
+        (monitoring_import, match_status, id) index, so a page of imports
+        costs one query however many entries they hold.
+        """
+        def count(**filters):
+            entries = (MonitoringEntry.objects.filter(monitoring_import=OuterRef('pk'), **filters)
+                       .order_by().values('monitoring_import').annotate(n=Count('pk')).values('n'))
+            return Coalesce(Subquery(entries), 0)
+        return self.annotate(
+            entries_total=count(),
+            **{f'entries_{status}': count(match_status=status) for status, _ in MonitoringEntry.MATCH_STATUS})
+
+
 class MonitoringImport(TimestampedModel):
     """Represents an uploaded monitoring file and its processing state."""
     STATUS_CHOICES = (
@@ -135,9 +178,23 @@ class MonitoringImport(TimestampedModel):
     processed_at = models.DateTimeField(null=True, blank=True)
     summary = models.TextField(blank=True)
     meta = models.JSONField(default=dict, blank=True)
+    # SHA-256 of the uploaded file, used to spot re-sent logs (see planner.dedup)
+    content_hash = models.CharField(max_length=64, blank=True, default='')
+
+    objects = MonitoringImportQuerySet.as_manager()
 
     class Meta:
-        indexes = [models.Index(fields=['tenant', 'status', 'created_at'])]
+        indexes = [
+            models.Index(fields=['tenant', 'status', 'created_at']),
+            models.Index(fields=['tenant', 'content_hash']),
+            models.Index(fields=['tenant', 'created_at', 'id']),
+        ]
+        constraints = [
+            # one live import per file, also when identical uploads race; a failed one can be re-sent
+            models.UniqueConstraint(fields=['tenant', 'content_hash'],
+                                    condition=~models.Q(content_hash='') & ~models.Q(status='failed'),
+                                    name='planner_import_unique_content_hash'),
+        ]
 
     def __str__(self):
         return f"Import {self.id} ({self.original_filename})"
@@ -163,12 +220,61 @@ class MonitoringEntry(TimestampedModel):
     spots_aired = models.IntegerField(default=0)
     duration_seconds = models.IntegerField(null=True, blank=True)
     raw_row = models.JSONField(default=dict, blank=True)
+    # normalized lookup keys from raw_row (see matching.entry_keys), used by
+    # the set-based reconciliation in planner.reconcile
+    campaign_ref = models.CharField(max_length=512, blank=True, default='')
+    campaign_key = models.CharField(max_length=512, blank=True, default='')
+    show_key = models.CharField(max_length=512, blank=True, default='')
+    station_key = models.CharField(max_length=512, blank=True, default='')
+    air_date = models.DateField(null=True, blank=True)
+    # identifies the aired spot (and which repeat of it) across imports; '' when it cannot be computed
+    fingerprint = models.CharField(max_length=32, blank=True, default='')
     match_status = models.CharField(max_length=32, choices=MATCH_STATUS, default='unmatched')
     processed = models.BooleanField(default=False)
     processed_at = models.DateTimeField(null=True, blank=True)
 
     class Meta:
-        indexes = [models.Index(fields=['tenant', 'campaign', 'media_plan', 'processed'])]
+        indexes = [
+            models.Index(fields=['tenant', 'campaign', 'media_plan', 'processed']),
+            # per-status counts and keyset pages of an import's entries
+            models.Index(fields=['monitoring_import', 'match_status', 'id']),
+            models.Index(fields=['monitoring_import', 'id']),
+            models.Index(fields=['tenant', 'match_status', 'air_date']),
+            # days re-aggregated by rollups.refresh_days
+            models.Index(fields=['tenant', 'air_date']),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['tenant', 'fingerprint'], condition=~models.Q(fingerprint=''),
+                                    name='planner_entry_unique_fingerprint'),
+        ]
 
     def __str__(self):
         return f"Entry {self.id} import={self.monitoring_import_id} spots={self.spots_aired}"
+
+
+class DailyDeliveryRollup(models.Model):
+    """Aired spots and entry counts of one tenant, campaign, plan, daypart and air date.
+
+    Derived from ``MonitoringEntry`` by ``planner.rollups``; the delivery
+    report reads these rows instead of the entries, joining station and
+    show from the plan. Key columns are null where the entries' are.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    tenant = models.ForeignKey('tenants.Tenant', on_delete=models.CASCADE, null=True, blank=True)
+    campaign = models.ForeignKey(Campaign, null=True, blank=True, on_delete=models.SET_NULL)
+    media_plan = models.ForeignKey(MediaPlan, null=True, blank=True, on_delete=models.SET_NULL)
+    daypart = models.ForeignKey('stations.Daypart', null=True, blank=True, on_delete=models.SET_NULL)
+    date = models.DateField(null=True, blank=True)
+    spots_aired = models.IntegerField(default=0)
+    entry_count = models.IntegerField(default=0)
+    matched_count = models.IntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            # days replaced by rollups.refresh_days, tenant-wide reports
+            models.Index(fields=['tenant', 'date']),
+            models.Index(fields=['tenant', 'campaign', 'date']),
+        ]
+
+    def __str__(self):
+        return f"Rollup {self.date} campaign={self.campaign_id} spots={self.spots_aired}"
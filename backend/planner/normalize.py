@@ -0,0 +1,171 @@
+"""Batch normalization of monitoring rows.
+
+``BatchNormalizer`` resolves the column aliases once from a file's headers,
+detects the airtime format from a sample of values and then converts whole
+chunks of rows at a time. When pandas is installed it parses airtime columns
+in strptime formats; ISO 8601 columns use ``datetime.fromisoformat``, which
+is faster than going through pandas. Without pandas, a pure-Python path
+gives the same results.
+Values that do not fit the detected format go through the flexible
+``dateutil`` parser, as the per-row parsing did before.
+"""
+import datetime
+
+from dateutil import parser as dateparser
+
+try:
+    import pandas as pd
+except ImportError:  # optional dependency
+    pd = None
+
+
+SPOTS_COLUMNS = ('spots_aired', 'spots', 'sold', 'count')
+AIRTIME_COLUMNS = ('airtime', 'time', 'datetime', 'date_time')
+DURATION_COLUMNS = ('duration', 'duration_seconds', 'length')
+
+# ``ISO`` means datetime.fromisoformat. Month-first formats come before
+# day-first ones so ambiguous samples resolve the way dateutil does.
+AIRTIME_FORMATS = (
+    'ISO',
+    '%Y-%m-%d %H:%M:%S',
+    '%Y/%m/%d %H:%M:%S',
+    '%m/%d/%Y %H:%M:%S',
+    '%m/%d/%Y %H:%M',
+    '%m/%d/%Y %I:%M:%S %p',
+    '%m/%d/%Y %I:%M %p',
+    '%d/%m/%Y %H:%M:%S',
+    '%d/%m/%Y %H:%M',
+    '%d.%m.%Y %H:%M:%S',
+    '%d.%m.%Y %H:%M',
+)
+
+SAMPLE_SIZE = 200
+
+
+def flexible_parse(value):
+    try:
+        return dateparser.parse(value)
+    except Exception:
+        return None
+
+
+def _strict_parser(fmt):
+    if fmt == 'ISO':
+        return datetime.datetime.fromisoformat
+    return lambda value: datetime.datetime.strptime(value, fmt)
+
+
+def detect_airtime_format(values):
+    """Return the first format in ``AIRTIME_FORMATS`` that parses every sample
+    value to the same datetime as ``dateutil``, or ``None``."""
+    sample = [v for v in values if v][:SAMPLE_SIZE]
+    if not sample:
+        return None
+    expected = [flexible_parse(v) for v in sample]
+    if any(e is None for e in expected):
+        return None
+    for fmt in AIRTIME_FORMATS:
+        parse = _strict_parser(fmt)
+        try:
+            if all(parse(v) == e for v, e in zip(sample, expected)):
+                return fmt
+        except ValueError:
+            continue
+    return None
+
+
+def _to_int(value):
+    """``int(float(str(value).strip()))`` or ``None`` when that would raise."""
+    if value is None or value == '':
+        return None
+    try:
+        return int(float(str(value).strip()))
+    except Exception:
+        return None
+
+
+class BatchNormalizer:
+    """Convert chunks of normalized row dicts to ``(airtime, spots, duration)``.
+
+    For a file written in one consistent airtime format the results equal
+    parsing every row on its own with ``dateutil`` (see ``tests/test_normalize.py``).
+    """
+
+    def __init__(self, headers, sample_rows=(), use_pandas=None):
+        present = set(headers)
+        self.spots_columns = [c for c in SPOTS_COLUMNS if c in present]
+        self.airtime_columns = [c for c in AIRTIME_COLUMNS if c in present]
+        self.duration_columns = [c for c in DURATION_COLUMNS if c in present]
+        self.use_pandas = (pd is not None) if use_pandas is None else use_pandas
+        self.airtime_format = detect_airtime_format([self._first_str(row) for row in sample_rows])
+
+    @staticmethod
+    def _first(row, columns):
+        # like ``raw.get(a) or raw.get(b) ...`` over the columns present in the file
+        for col in columns:
+            value = row.get(col)
+            if value:
+                return value
+        return None
+
+    def _first_str(self, row):
+        value = self._first(row, self.airtime_columns)
+        return str(value) if value is not None else None
+
+    def _airtimes(self, rows):
+        values = [self._first_str(row) for row in rows]
+        parsed = [None] * len(values)
+        fmt = self.airtime_format
+        # fromisoformat is already C-speed; pandas pays off for strptime formats
+        if fmt and fmt != 'ISO' and self.use_pandas:
+            try:
+                series = pd.to_datetime(pd.Series(values, dtype=object),
+                                        format=fmt, errors='coerce')
+                mask = series.isna().tolist()
+                parsed = [None if na else dt for na, dt in zip(mask, series.dt.to_pydatetime())]
+            except (ValueError, TypeError):
+                parsed = [None] * len(values)
+        elif fmt:
+            strict = _strict_parser(fmt)
+            for i, value in enumerate(values):
+                if value:
+                    try:
+                        parsed[i] = strict(value)
+                    except ValueError:
+                        pass
+        # rows outside the detected format (or no format) use the flexible parser
+        for i, value in enumerate(values):
+            if parsed[i] is None and value:
+                parsed[i] = flexible_parse(value)
+        return parsed
+
+    def _to_ints(self, values):
+        # plain float() beats pandas.to_numeric here once the Python objects
+        # have to be converted back, so numbers always take the Python path
+        return [_to_int(v) for v in values]
+
+    def _spots(self, rows):
+        # first column (in alias order) holding a number, else 0
+        result = [0] * len(rows)
+        pending = list(range(len(rows)))
+        for col in self.spots_columns:
+            if not pending:
+                break
+            still = []
+            for i, value in zip(pending, self._to_ints([rows[i].get(col) for i in pending])):
+                if value is None:
+                    still.append(i)
+                else:
+                    result[i] = value
+            pending = still
+        return result
+
+    def _durations(self, rows):
+        # the first truthy alias is parsed; unlike spots there is no fallthrough
+        return self._to_ints([self._first(row, self.duration_columns) for row in rows])
+
+    def normalize(self, rows):
+        """Return a list of ``(airtime, spots, duration)`` tuples for ``rows``."""
+        if not rows:
+            return []
+        return list(zip(self._airtimes(rows), self._spots(rows), self._durations(rows)))
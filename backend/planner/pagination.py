@@ -0,0 +1,171 @@
+"""Keyset pagination for large planner tables.
+
+``KeysetPagination`` orders by ``ordering`` (whose last field must be
+unique, e.g. the primary key) and pages by seeking past the last row of
+the previous page, ``WHERE (a, b) > (last_a, last_b) ORDER BY a, b LIMIT
+n``, instead of ``OFFSET``. With an index on the ordering columns every
+page costs the same however deep it is. The opaque ``cursor`` query
+parameter carries the last row's ordering values; pages only go forward.
+
+``?ordering=`` on the first ordering field (either direction) is honoured.
+Requests with ``?offset=`` or another ordering fall back to
+``LimitOffsetPagination``, so existing clients keep working. The total
+``count`` costs a ``COUNT(*)`` per page; ``?count=false`` leaves it out.
+"""
+import base64
+import datetime
+import json
+import uuid
+from decimal import Decimal
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.filters import OrderingFilter
+from rest_framework.pagination import BasePagination, LimitOffsetPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+def _encode_value(value):
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, (uuid.UUID, Decimal)):
+        return str(value)
+    return value
+
+
+class KeysetPagination(BasePagination):
+    ordering = ('created_at', 'id')
+    page_size = api_settings.PAGE_SIZE or 25
+    max_page_size = 1000
+    page_size_query_param = 'limit'
+    cursor_query_param = 'cursor'
+    count_query_param = 'count'
+    # whether responses carry the total count unless ?count= says otherwise
+    include_count = True
+    invalid_cursor_message = 'Invalid cursor'
+    fallback_class = LimitOffsetPagination
+
+    def __init__(self):
+        self.keyset = self.ordering
+        self.fallback = None
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(size, 1), self.max_page_size)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            position = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')))
+        except (TypeError, ValueError, UnicodeEncodeError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(position, list) or len(position) != len(self.keyset):
+            raise NotFound(self.invalid_cursor_message)
+        return position
+
+    def encode_cursor(self, position):
+        return base64.urlsafe_b64encode(json.dumps(position).encode('utf-8')).decode('ascii')
+
+    def seek(self, position):
+        """Q for rows after ``position`` in ``ordering``: (a > x) | (a = x & b > y) | ..."""
+        condition = Q()
+        equal = {}
+        for field, value in zip(self.keyset, position):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            condition |= Q(**equal, **{f'{name}__{lookup}': value})
+            equal[name] = value
+        return condition
+
+    def position(self, obj):
+        return [_encode_value(getattr(obj, field.lstrip('-'))) for field in self.keyset]
+
+    def get_keyset(self, request):
+        """The ordering to seek on for this request, or ``None`` if the requested ordering cannot be."""
+        requested = request.query_params.get(OrderingFilter.ordering_param, '').strip()
+        if not requested:
+            return self.ordering
+        first = self.ordering[0].lstrip('-')
+        if requested == first:
+            return tuple(field.lstrip('-') for field in self.ordering)
+        if requested == f'-{first}':
+            return tuple(f"-{field.lstrip('-')}" for field in self.ordering)
+        return None
+
+    def wants_count(self, request):
+        value = request.query_params.get(self.count_query_param)
+        if value is None:
+            return self.include_count
+        return value.lower() not in ('0', 'false', 'no')
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.keyset = self.get_keyset(request)
+        if self.keyset is None or self.fallback_class.offset_query_param in request.query_params:
+            self.fallback = self.fallback_class()
+            return self.fallback.paginate_queryset(queryset, request, view)
+        page_size = self.get_page_size(request)
+        position = self.decode_cursor(request)
+        self.count = queryset.count() if self.wants_count(request) else None
+        queryset = queryset.order_by(*self.keyset)
+        if position is not None:
+            try:
+                queryset = queryset.filter(self.seek(position))
+            except (ValidationError, TypeError, ValueError):
+                # values that do not fit the ordering fields
+                raise NotFound(self.invalid_cursor_message)
+        rows = list(queryset[:page_size + 1])
+        self.has_next = len(rows) > page_size
+        rows = rows[:page_size]
+        self.next_position = self.position(rows[-1]) if self.has_next else None
+        return rows
+
+    def get_next_link(self):
+        if self.next_position is None:
+            return None
+        return replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param,
+                                   self.encode_cursor(self.next_position))
+
+    def get_paginated_response(self, data):
+        if self.fallback is not None:
+            return self.fallback.get_paginated_response(data)
+        page = {'next': self.get_next_link(), 'results': data}
+        if self.count is not None:
+            page = {'count': self.count, **page}
+        return Response(page)
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'count': {'type': 'integer', 'example': 123},
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {'name': self.cursor_query_param, 'required': False, 'in': 'query',
+             'description': 'Cursor from the previous page\'s next link.', 'schema': {'type': 'string'}},
+            {'name': self.page_size_query_param, 'required': False, 'in': 'query',
+             'description': 'Number of results per page.', 'schema': {'type': 'integer'}},
+            {'name': self.count_query_param, 'required': False, 'in': 'query',
+             'description': 'Set to false to leave out the total count.', 'schema': {'type': 'boolean'}},
+        ]
+
+
+class EntryPagination(KeysetPagination):
+    """Entries of one import, in primary key order; the count is opt-in (``?count=true``)."""
+    ordering = ('id',)
+    page_size = 100
+    include_count = False
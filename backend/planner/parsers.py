@@ -0,0 +1,274 @@
+"""Streaming row readers for monitoring import files.
+
+Both readers take a binary file object (an ``UploadedFile`` or the handle
+returned by ``FieldFile.open('rb')``) and yield one normalized ``dict`` per
+data row. Nothing is read ahead beyond the current line (CSV) or the
+current worksheet row (XLSX), so memory use stays flat whatever the size of
+the file.
+"""
+import codecs
+import csv
+import datetime
+import decimal
+
+
+CSV_EXTENSIONS = ('.csv',)
+XLSX_EXTENSIONS = ('.xlsx', '.xls')
+
+# size of the binary reads used to feed the incremental decoder
+READ_CHUNK_SIZE = 64 * 1024
+
+
+class UnsupportedFileType(ValueError):
+    """Raised when no row reader exists for the given file name."""
+
+
+def normalize_row(d):
+    """Lower-case and strip header names; replace ``None`` values with ''."""
+    return {(k or '').strip().lower(): (v if v is not None else '') for k, v in d.items()}
+
+
+def _json_safe(value):
+    # openpyxl returns native Python types; keep rows JSON-serializable so they
+    # can be stored in MonitoringEntry.raw_row as-is.
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, datetime.timedelta):
+        return value.total_seconds()
+    if isinstance(value, decimal.Decimal):
+        return str(value)
+    return value
+
+
+def iter_text_lines(fileobj, encoding='utf-8', errors='replace', on_line=None):
+    """Yield decoded lines from a binary file object, one chunk at a time.
+
+    Lines end at ``\\r\\n``, ``\\r`` or ``\\n`` (universal newlines, which is
+    what ``bytes.splitlines`` splits on), found at the byte level (safe for
+    UTF-8 and other ASCII-compatible encodings), and keep their terminator
+    so ``csv`` can handle quoted fields spanning several lines. A ``\\r``
+    closing a read chunk is held back until the next chunk shows whether a
+    ``\\n`` follows. Only the newly read chunk is split, and a line spanning
+    several chunks is joined once, so long lines cost linear time. A UTF-8
+    byte order mark at the start is dropped. ``on_line``, if given, is
+    called with the byte length of each line just before it is yielded.
+    """
+    if codecs.lookup(encoding).name == 'utf-8':
+        encoding = 'utf-8-sig'
+    decoder = codecs.getincrementaldecoder(encoding)(errors=errors)
+    # pieces of the line still being read; it is complete but for a
+    # possible '\n' when it ends in '\r'
+    parts = []
+    while True:
+        chunk = fileobj.read(READ_CHUNK_SIZE)
+        if not chunk:
+            break
+        lines = chunk.splitlines(keepends=True)
+        if parts and parts[-1].endswith(b'\r'):
+            if lines[0] == b'\n':
+                parts.append(lines.pop(0))
+            line = b''.join(parts)
+            parts = []
+            if on_line:
+                on_line(len(line))
+            yield decoder.decode(line)
+            if not lines:
+                continue
+        # an unterminated last line, or one whose '\r' may precede a '\n', waits for the next chunk
+        last = lines[-1]
+        held = None
+        if not last.endswith(b'\n'):
+            held = lines.pop()
+        if parts and lines:
+            parts.append(lines[0])
+            lines[0] = b''.join(parts)
+            parts = []
+        for line in lines:
+            if on_line:
+                on_line(len(line))
+            yield decoder.decode(line)
+        if held is not None:
+            parts.append(held)
+    line = b''.join(parts)
+    tail = decoder.decode(line, final=True)
+    if line and on_line:
+        on_line(len(line))
+    if tail:
+        yield tail
+
+
+class CSVRowReader:
+    """Iterate a CSV file as normalized dict rows without loading it in memory.
+
+    ``offset`` is the byte position just past the last row yielded; passing
+    it back as ``start`` resumes reading at the following row. The header
+    line is always read from the beginning of the file. With ``end`` set,
+    only rows starting before that byte position are yielded.
+    """
+
+    def __init__(self, fileobj, encoding='utf-8', start=0, end=None):
+        self.fileobj = fileobj
+        self.encoding = encoding
+        self.start = start
+        self.end = end
+        self.headers = None
+        self.offset = 0
+
+    def _advance(self, nbytes):
+        self.offset += nbytes
+
+    def _lines(self):
+        return iter_text_lines(self.fileobj, encoding=self.encoding, on_line=self._advance)
+
+    def __iter__(self):
+        lines = self._lines()
+        fieldnames = next(csv.reader(lines), None)
+        if fieldnames is None:
+            return
+        self.headers = [(h or '').strip().lower() for h in fieldnames]
+        if self.start > self.offset:
+            self.fileobj.seek(self.start)
+            self.offset = self.start
+            lines = self._lines()
+        reader = csv.DictReader(lines, fieldnames=fieldnames)
+        while self.end is None or self.offset < self.end:
+            raw = next(reader, None)
+            if raw is None:
+                break
+            yield normalize_row(raw)
+
+
+class XLSXRowReader:
+    """Iterate the active worksheet of an XLSX workbook as normalized dict rows.
+
+    Uses openpyxl's ``read_only`` mode, which parses the sheet XML lazily.
+    ``offset`` counts the data rows yielded so far (including the ``start``
+    rows skipped when resuming); ``end`` is an exclusive data-row index.
+    """
+
+    def __init__(self, fileobj, start=0, end=None):
+        self.fileobj = fileobj
+        self.start = start
+        self.end = end
+        self.headers = None
+        self.offset = 0
+
+    def __iter__(self):
+        try:
+            import openpyxl
+        except Exception:
+            raise RuntimeError('openpyxl not installed')
+        wb = openpyxl.load_workbook(self.fileobj, read_only=True, data_only=True)
+        try:
+            ws = wb.active
+            try:
+                header_row = next(ws.iter_rows(max_row=1, values_only=True))
+            except StopIteration:
+                return
+            headers = [str(h).strip().lower() if h is not None else '' for h in header_row]
+            self.headers = headers
+            self.offset = self.start
+            # worksheet rows are 1-based and row 1 holds the headers
+            max_row = self.end + 1 if self.end is not None else None
+            for row in ws.iter_rows(min_row=self.start + 2, max_row=max_row, values_only=True):
+                data = {headers[i] if i < len(headers) else f'col_{i}': _json_safe(row[i]) for i in range(len(row))}
+                self.offset += 1
+                yield normalize_row(data)
+        finally:
+            wb.close()
+
+
+def get_row_reader(fileobj, filename, start=0, end=None):
+    """Return the row reader matching ``filename``'s extension.
+
+    ``start`` is a checkpoint previously read from the reader's ``offset``;
+    ``start``/``end`` may also come from ``plan_ranges``.
+    Raises ``UnsupportedFileType`` for anything that is not CSV or XLSX.
+    """
+    name = (filename or '').lower()
+    if name.endswith(CSV_EXTENSIONS):
+        return CSVRowReader(fileobj, start=start, end=end)
+    if name.endswith(XLSX_EXTENSIONS):
+        return XLSXRowReader(fileobj, start=start, end=end)
+    raise UnsupportedFileType('unsupported file type')
+
+
+def _skip_line(fileobj):
+    """Return the position just past the next ``\\r\\n``, ``\\r`` or ``\\n`` (or EOF)."""
+    pos = fileobj.tell()
+    while True:
+        chunk = fileobj.read(READ_CHUNK_SIZE)
+        if not chunk:
+            return pos
+        lf = chunk.find(b'\n')
+        cr = chunk.find(b'\r', 0, len(chunk) if lf < 0 else lf)
+        if cr < 0 and lf < 0:
+            pos += len(chunk)
+            continue
+        if cr < 0:
+            return pos + lf + 1
+        if cr + 1 < len(chunk):
+            return pos + cr + (2 if cr + 1 == lf else 1)
+        # '\r' closes the chunk: a '\n' may follow in the next one
+        return pos + cr + (2 if fileobj.read(1) == b'\n' else 1)
+
+
+def plan_csv_ranges(fileobj, parts):
+    """Split a CSV file into up to ``parts`` row-aligned ``(start, end)`` byte ranges.
+
+    Boundaries are moved forward to the next line break, so this assumes
+    records do not contain quoted line breaks (true of station logs).
+    """
+    fileobj.seek(0, 2)
+    size = fileobj.tell()
+    fileobj.seek(0)
+    header_end = _skip_line(fileobj)
+    bounds = [header_end]
+    for i in range(1, parts):
+        target = header_end + (size - header_end) * i // parts
+        if target <= bounds[-1]:
+            continue
+        fileobj.seek(target - 1)
+        pos = _skip_line(fileobj)
+        if bounds[-1] < pos < size:
+            bounds.append(pos)
+    bounds.append(size)
+    fileobj.seek(0)
+    return [(bounds[i], bounds[i + 1]) for i in range(len(bounds) - 1)]
+
+
+def plan_xlsx_ranges(fileobj, parts):
+    """Split the active worksheet into up to ``parts`` ``(start, end)`` data-row ranges.
+
+    Relies on the sheet's recorded dimensions; returns a single open-ended
+    range when the workbook does not declare them.
+    """
+    try:
+        import openpyxl
+    except Exception:
+        raise RuntimeError('openpyxl not installed')
+    wb = openpyxl.load_workbook(fileobj, read_only=True, data_only=True)
+    try:
+        max_row = wb.active.max_row
+    finally:
+        wb.close()
+    fileobj.seek(0)
+    if not max_row:
+        return [(0, None)]
+    rows = max(max_row - 1, 0)
+    bounds = sorted({rows * i // parts for i in range(parts + 1)})
+    return [(bounds[i], bounds[i + 1]) for i in range(len(bounds) - 1)] or [(0, 0)]
+
+
+def plan_ranges(fileobj, filename, parts):
+    """Return ``(start, end)`` ranges for ``get_row_reader`` covering the whole file."""
+    name = (filename or '').lower()
+    if name.endswith(CSV_EXTENSIONS):
+        return plan_csv_ranges(fileobj, parts)
+    if name.endswith(XLSX_EXTENSIONS):
+        return plan_xlsx_ranges(fileobj, parts)
+    raise UnsupportedFileType('unsupported file type')
+
+
+def is_supported(filename):
+    return (filename or '').lower().endswith(CSV_EXTENSIONS + XLSX_EXTENSIONS)
@@ -1,15 +1,29 @@
 from rest_framework import permissions
 
 
+def object_tenant_id(obj, tenant_field='tenant'):
+    """Follow ``tenant_field`` (e.g. ``'station__tenant'``) from ``obj`` and return the tenant id."""
+    *path, field = tenant_field.split('__')
+    for attr in path:
+        obj = getattr(obj, attr, None)
+        if obj is None:
+            return None
+    # Objects may have tenant or tenant_id
+    return getattr(obj, f'{field}_id', None) or getattr(getattr(obj, field, None), 'id', None)
+
+
 class IsTenantMember(permissions.BasePermission):
-    """Allow access only to users that belong to the same tenant as the object."""
+    """Allow access only to users that belong to the same tenant as the object.
+
+    The object's tenant is found through the view's ``tenant_field``
+    (see ``TenantScopedMixin``).
+    """
 
     def has_object_permission(self, request, view, obj):
         user = request.user
-        if not user or not getattr(user, 'tenant', None):
+        if not user or not getattr(user, 'tenant_id', None):
             return False
-        # Objects may have tenant or tenant_id
-        tenant_id = getattr(obj, 'tenant_id', None) or getattr(getattr(obj, 'tenant', None), 'id', None)
+        tenant_id = object_tenant_id(obj, getattr(view, 'tenant_field', 'tenant'))
         return str(tenant_id) == str(user.tenant_id)
 
 
@@ -0,0 +1,306 @@
+"""Monitoring import pipeline shared by the upload view and the Celery task.
+
+``ImportPipeline`` streams rows from the stored file, normalizes the spots,
+airtime and duration columns and writes the ``MonitoringEntry`` rows, with
+their normalized match keys and daypart, through a loader from ``loaders``
+(``COPY`` on PostgreSQL, ``bulk_create`` elsewhere). Matching then runs once over the
+whole import in SQL (``reconcile``), or row by row with an ``EntryMatcher``
+when ``MONITORING_IMPORT_MATCHING`` is ``'inline'``. Finally the delivery
+rollups of the days the import covers are refreshed (``rollups``), also
+when the import fails after committing some chunks (``mark_failed``).
+"""
+import time
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from stations.dayparts import get_daypart_index
+from . import dedup, models, parsers, rollups
+from .loaders import BATCH_SIZE, get_loader
+from .matching import EntryMatcher, entry_keys
+from .normalize import BatchNormalizer
+from .reconcile import reconcile_entries
+
+
+# rows committed per transaction (and per checkpoint)
+CHUNK_SIZE = 5000
+
+
+def deferred_matching():
+    """True unless ``MONITORING_IMPORT_MATCHING`` asks for inline matching."""
+    return getattr(settings, 'MONITORING_IMPORT_MATCHING', 'deferred') != 'inline'
+
+
+def update_import_meta(import_id, apply=None, **updates):
+    """Merge ``updates`` into ``MonitoringImport.meta`` under a row lock.
+
+    ``apply``, if given, is called with the locked meta dict and may modify it
+    in place. Returns the merged dict. Only the ``meta`` column is written so
+    concurrent status updates (and parallel range tasks) are not clobbered.
+    """
+    with transaction.atomic():
+        meta = (models.MonitoringImport.objects.select_for_update()
+                .values_list('meta', flat=True).get(pk=import_id)) or {}
+        meta.update(updates)
+        if apply:
+            apply(meta)
+        models.MonitoringImport.objects.filter(pk=import_id).update(meta=meta, updated_at=timezone.now())
+    return meta
+
+
+class ImportPipeline:
+    """Parse, normalize and match every row of a ``MonitoringImport``.
+
+    Rows are committed in chunks of ``chunk_size``. Each chunk's entries and
+    the checkpoint stored in ``meta[checkpoint_key]`` (reader offset plus
+    running counters) are written in one transaction, so a rerun after a
+    crash resumes right after the last committed chunk without duplicating
+    entries. ``meta['progress']`` is refreshed with every chunk.
+    """
+
+    checkpoint_key = 'checkpoint'
+
+    def __init__(self, import_obj, batch_size=BATCH_SIZE, chunk_size=None):
+        self.import_obj = import_obj
+        self.batch_size = batch_size
+        self.chunk_size = chunk_size or getattr(settings, 'MONITORING_IMPORT_CHUNK_SIZE', CHUNK_SIZE)
+        self.matcher = None
+        self.normalizer = None
+        self.dayparts = None
+        self.deduplicate = dedup.enabled()
+        self.loader = get_loader((import_obj.meta or {}).get('loader'), batch_size=batch_size,
+                                 ignore_conflicts=self.deduplicate)
+        self.parsed = 0
+        self.matched = 0
+        self.duplicates = 0
+        self.offset = 0
+        self.end = None
+
+    @property
+    def filename(self):
+        return self.import_obj.original_filename or self.import_obj.file.name
+
+    def build_entry(self, raw, airtime, spots, duration):
+        if self.matcher:
+            campaign, media_plan, match_status = self.matcher.match(raw, airtime)
+        else:
+            # left to the reconcile pass once the whole import has landed
+            campaign, media_plan, match_status = None, None, 'unmatched'
+        keys = entry_keys(raw, airtime)
+        fingerprint = ''
+        if self.deduplicate:
+            fingerprint = dedup.entry_fingerprint(
+                keys['station_key'], airtime, keys['campaign_ref'], keys['campaign_key'], duration)
+        return models.MonitoringEntry(
+            monitoring_import=self.import_obj,
+            tenant_id=self.import_obj.tenant_id,
+            campaign=campaign,
+            media_plan=media_plan,
+            daypart_id=self.dayparts.at(airtime) if airtime else None,
+            spots_aired=spots,
+            airtime=airtime,
+            duration_seconds=duration,
+            raw_row=raw,
+            match_status=match_status,
+            fingerprint=fingerprint,
+            **keys,
+        )
+
+    def build_entries(self, rows, headers):
+        """Normalize ``rows`` as one batch and return their unsaved entries."""
+        if self.normalizer is None:
+            self.normalizer = BatchNormalizer(headers or rows[0].keys(), sample_rows=rows)
+        if self.dayparts is None:
+            # airtime -> daypart by bisect, loaded once per import
+            self.dayparts = get_daypart_index(self.import_obj.tenant_id)
+        values = self.normalizer.normalize(rows)
+        if self.matcher:
+            # plans are matched on the air date, so only this chunk's dates are loaded
+            days = [airtime.date() for airtime, _, _ in values if airtime]
+            if days:
+                self.matcher.cover(min(days), max(days))
+        return [self.build_entry(raw, airtime, spots, duration) for raw, (airtime, spots, duration) in zip(rows, values)]
+
+    def flush(self, batch):
+        self.loader.load(batch)
+
+    def load_checkpoint(self):
+        checkpoint = (self.import_obj.meta or {}).get(self.checkpoint_key) or {}
+        self.offset = checkpoint.get('offset', 0)
+        self.parsed = checkpoint.get('parsed', 0)
+        self.matched = checkpoint.get('matched', 0)
+        self.duplicates = checkpoint.get('duplicates', 0)
+
+    def progress(self):
+        elapsed = time.monotonic() - self._started
+        rows = self.parsed - self._resumed_rows
+        return {
+            'rows_parsed': self.parsed,
+            'rows_matched': self.matched,
+            'rows_duplicate': self.duplicates,
+            'rows_per_second': round(rows / elapsed, 1) if elapsed > 0 else None,
+            'offset': self.offset,
+            'updated_at': timezone.now().isoformat(),
+        }
+
+    def save_checkpoint(self):
+        checkpoint = {'offset': self.offset, 'parsed': self.parsed, 'matched': self.matched,
+                      'duplicates': self.duplicates}
+        self.import_obj.meta = update_import_meta(
+            self.import_obj.pk, **{self.checkpoint_key: checkpoint, 'progress': self.progress()})
+
+    def commit_chunk(self, entries):
+        """Store ``entries`` and the checkpoint, counting only the rows actually inserted.
+
+        With deduplication, rows whose spot another import already stored
+        are left out; identical rows of this import are kept (see ``dedup``).
+        """
+        with transaction.atomic():
+            tenant_id, import_id = self.import_obj.tenant_id, self.import_obj.pk
+            stored = entries
+            if self.deduplicate and entries:
+                # parallel ranges of this import number repeated spots in turn
+                dedup.lock(import_id)
+                stored = dedup.drop_duplicates(entries, tenant_id, import_id)
+            self.flush(stored)
+            if self.deduplicate and stored:
+                # rows a concurrent import stored first were skipped on conflict
+                stored = dedup.inserted(stored, tenant_id, import_id)
+            self.parsed += len(stored)
+            self.duplicates += len(entries) - len(stored)
+            self.matched += sum(1 for entry in stored if entry.match_status == 'matched')
+            self.save_checkpoint()
+
+    def run(self):
+        """Create the entries and return ``{'parsed': n, 'matched': m, 'duplicates': d}``."""
+        self.load_checkpoint()
+        self._started = time.monotonic()
+        self._resumed_rows = self.parsed
+        if not deferred_matching():
+            self.matcher = EntryMatcher(self.import_obj.tenant_id)
+        rows = []
+        with self.import_obj.file.open('rb') as file_obj:
+            reader = parsers.get_row_reader(file_obj, self.filename, start=self.offset, end=self.end)
+            for raw in reader:
+                rows.append(raw)
+                if len(rows) >= self.chunk_size:
+                    self.offset = reader.offset
+                    self.commit_chunk(self.build_entries(rows, reader.headers))
+                    rows = []
+            self.offset = reader.offset
+        self.commit_chunk(self.build_entries(rows, reader.headers) if rows else [])
+        return {'parsed': self.parsed, 'matched': self.matched, 'duplicates': self.duplicates}
+
+
+class RangeImportPipeline(ImportPipeline):
+    """Process one ``(start, end)`` range of an import planned by ``parsers.plan_ranges``.
+
+    Several ranges of the same import run concurrently in separate tasks.
+    Each keeps its checkpoint in ``meta['ranges'][index]``, and
+    ``meta['progress']`` is the sum over all ranges.
+    """
+
+    def __init__(self, import_obj, index, start, end, **kwargs):
+        super().__init__(import_obj, **kwargs)
+        self.index = str(index)
+        self.start = start
+        self.end = end
+
+    def load_checkpoint(self):
+        checkpoint = (self.import_obj.meta or {}).get('ranges', {}).get(self.index) or {}
+        self.offset = checkpoint.get('offset', self.start)
+        self.parsed = checkpoint.get('parsed', 0)
+        self.matched = checkpoint.get('matched', 0)
+        self.duplicates = checkpoint.get('duplicates', 0)
+
+    def save_checkpoint(self):
+        progress = self.progress()
+        checkpoint = {
+            'start': self.start, 'end': self.end, 'offset': self.offset,
+            'parsed': self.parsed, 'matched': self.matched, 'duplicates': self.duplicates,
+            'rows_per_second': progress['rows_per_second'],
+        }
+
+        def apply(meta):
+            ranges = meta.setdefault('ranges', {})
+            ranges[self.index] = checkpoint
+            meta['progress'] = {
+                'rows_parsed': sum(r['parsed'] for r in ranges.values()),
+                'rows_matched': sum(r['matched'] for r in ranges.values()),
+                'rows_duplicate': sum(r.get('duplicates', 0) for r in ranges.values()),
+                'rows_per_second': round(sum(r['rows_per_second'] or 0 for r in ranges.values()), 1),
+                'ranges': len(ranges),
+                'updated_at': progress['updated_at'],
+            }
+
+        self.import_obj.meta = update_import_meta(self.import_obj.pk, apply)
+
+
+def reconcile_loaded_import(import_obj, result):
+    """Run the deferred reconcile pass and return ``result`` with its match count."""
+    if not deferred_matching():
+        return result
+    # rollups are refreshed once the import is marked processed (see mark_processed)
+    matched = reconcile_entries(models.MonitoringEntry.objects.filter(monitoring_import=import_obj))['matched']
+
+    def apply(meta):
+        meta.setdefault('progress', {})['rows_matched'] = matched
+
+    import_obj.meta = update_import_meta(import_obj.pk, apply)
+    return {**result, 'matched': matched}
+
+
+def summarize(result):
+    summary = f"Parsed {result['parsed']} entries, matched {result['matched']}"
+    if result.get('duplicates'):
+        summary += f", skipped {result['duplicates']} duplicates"
+    return summary
+
+
+def mark_processed(import_obj, result):
+    """Refresh the delivery rollups of the import's entries and mark it processed."""
+    rollups.refresh_entries(models.MonitoringEntry.objects.filter(monitoring_import=import_obj))
+    import_obj.status = 'processed'
+    import_obj.processed_at = timezone.now()
+    import_obj.summary = summarize(result)
+    import_obj.save(update_fields=['status', 'processed_at', 'summary', 'updated_at'])
+    return result
+
+
+def mark_failed(import_obj, summary):
+    """Mark the import failed, rolling up the entries its committed chunks left behind."""
+    rollups.refresh_entries(models.MonitoringEntry.objects.filter(monitoring_import=import_obj))
+    import_obj.status = 'failed'
+    import_obj.summary = summary
+    import_obj.save(update_fields=['status', 'summary', 'updated_at'])
+
+
+def process_import(import_obj, batch_size=BATCH_SIZE, chunk_size=None):
+    """Run the pipeline for ``import_obj`` and mark it processed.
+
+    Resumes from the checkpoint in ``import_obj.meta`` when one exists.
+    Raises ``parsers.UnsupportedFileType`` for files without a row reader;
+    the caller decides how to report failures.
+    """
+    pipeline = ImportPipeline(import_obj, batch_size=batch_size, chunk_size=chunk_size)
+    if not parsers.is_supported(pipeline.filename):
+        raise parsers.UnsupportedFileType('unsupported file type')
+    return mark_processed(import_obj, reconcile_loaded_import(import_obj, pipeline.run()))
+
+
+def plan_import_ranges(import_obj, parts):
+    """Split ``import_obj``'s file into ``(start, end)`` ranges for ``RangeImportPipeline``."""
+    filename = import_obj.original_filename or import_obj.file.name
+    with import_obj.file.open('rb') as file_obj:
+        return parsers.plan_ranges(file_obj, filename, parts)
+
+
+def finalize_import(import_obj, results):
+    """Mark a fanned-out import processed from its per-range ``results``."""
+    result = {
+        'parsed': sum(r['parsed'] for r in results),
+        'matched': sum(r['matched'] for r in results),
+        'duplicates': sum(r.get('duplicates', 0) for r in results),
+    }
+    return mark_processed(import_obj, reconcile_loaded_import(import_obj, result))
@@ -0,0 +1,145 @@
+"""Set-based reconciliation of monitoring entries against campaigns and plans.
+
+Imports land ``MonitoringEntry`` rows with the normalized keys from
+``matching.entry_keys``; ``reconcile_entries`` then resolves ``campaign``,
+``media_plan`` and ``match_status`` for a whole queryset with a handful of
+``UPDATE ... SET col = (SELECT ...)`` statements instead of per-row Python.
+The rules are the ones ``EntryMatcher`` applies in memory:
+
+- campaign by exact ``external_id`` (``campaign_ref``), then by
+  normalized name (``campaign_key`` against ``Campaign.name_key``), within
+  the entry's tenant;
+- media plan by campaign + ``air_date``, narrowed by show and/or station
+  name (``show_key``/``station_key`` against their ``name_key``) when the
+  entry has those keys;
+- ties resolve to the lowest primary key.
+
+Reconciliation can be re-run at any time, e.g. after campaigns or plans were
+added or renamed, without re-uploading the file. ``reconcile_scope`` does so
+for just the entries a change to one tenant's campaigns or plans within a
+date window can affect.
+"""
+from django.db import transaction
+from django.db.models import Case, Count, OuterRef, Q, Subquery, Value, When
+from django.db.models.functions import Coalesce
+
+from . import models, rollups
+
+
+# entries per reconcile transaction in reconcile_scope
+SCOPE_CHUNK_SIZE = 5000
+
+
+def _campaign_by_ref():
+    return Subquery(models.Campaign.objects
+                    .filter(tenant_id=OuterRef('tenant_id'), external_id=OuterRef('campaign_ref'))
+                    .order_by('pk').values('pk')[:1])
+
+
+def _campaign_by_name():
+    return Subquery(models.Campaign.objects
+                    .filter(tenant_id=OuterRef('tenant_id'), name_key=OuterRef('campaign_key'))
+                    .order_by('pk').values('pk')[:1])
+
+
+def _plan(with_show, with_station):
+    qs = models.MediaPlan.objects.filter(campaign_id=OuterRef('campaign_id'), date=OuterRef('air_date'))
+    if with_show:
+        qs = qs.filter(show__name_key=OuterRef('show_key'))
+    if with_station:
+        qs = qs.filter(station__name_key=OuterRef('station_key'))
+    return Subquery(qs.order_by('pk').values('pk')[:1])
+
+
+def reconcile_entries(entries):
+    """Re-match every entry in the ``entries`` queryset in SQL.
+
+    Returns ``{'matched': n, 'ambiguous': n, 'unmatched': n}`` for the
+    queryset after the update.
+    """
+    has_ref = ~Q(campaign_ref='')
+    has_name = ~Q(campaign_key='')
+    has_show = ~Q(show_key='')
+    has_station = ~Q(station_key='')
+    with transaction.atomic():
+        entries.update(campaign_id=Case(
+            When(has_ref & has_name, then=Coalesce(_campaign_by_ref(), _campaign_by_name())),
+            When(has_ref, then=_campaign_by_ref()),
+            When(has_name, then=_campaign_by_name()),
+            default=Value(None),
+        ))
+        # one statement per show/station presence pattern keeps every
+        # subquery a plain equality join
+        entries.update(media_plan_id=None)
+        dated = entries.filter(campaign_id__isnull=False, air_date__isnull=False)
+        for with_show in (False, True):
+            for with_station in (False, True):
+                pattern = (has_show if with_show else ~has_show) & (has_station if with_station else ~has_station)
+                dated.filter(pattern).update(media_plan_id=_plan(with_show, with_station))
+        entries.update(match_status=Case(
+            When(media_plan_id__isnull=False, then=Value('matched')),
+            When(campaign_id__isnull=False, then=Value('ambiguous')),
+            default=Value('unmatched'),
+        ))
+    counts = dict(entries.order_by().values_list('match_status').annotate(n=Count('pk')))
+    return {status: counts.get(status, 0) for status in ('matched', 'ambiguous', 'unmatched')}
+
+
+def reconcile_import(import_obj):
+    """Reconcile all entries of ``import_obj`` and refresh their delivery rollups; see ``reconcile_entries``."""
+    entries = models.MonitoringEntry.objects.filter(monitoring_import=import_obj)
+    counts = reconcile_entries(entries)
+    rollups.refresh_entries(entries)
+    return counts
+
+
+def scoped_entries(tenant_id, campaign_id=None, date_from=None, date_to=None):
+    """Entries whose match could change after edits to the given scope.
+
+    That is entries in the date window that are not matched (or whose plan
+    was deleted), plus entries linked to a plan of the scope wherever they
+    aired, so a plan moved to another date releases its old entries. With
+    ``campaign_id``, unmatched entries must also carry that campaign's
+    external id or name.
+    """
+    window = Q()
+    if date_from:
+        window &= Q(air_date__gte=date_from)
+    if date_to:
+        window &= Q(air_date__lte=date_to)
+
+    plans = models.MediaPlan.objects.filter(campaign__tenant_id=tenant_id)
+    if date_from:
+        plans = plans.filter(date__gte=date_from)
+    if date_to:
+        plans = plans.filter(date__lte=date_to)
+
+    open_entries = Q(match_status__in=('unmatched', 'ambiguous')) | Q(match_status='matched', media_plan__isnull=True)
+    if campaign_id:
+        plans = plans.filter(campaign_id=campaign_id)
+        campaign = models.Campaign.objects.only('name_key', 'external_id').get(pk=campaign_id, tenant_id=tenant_id)
+        keys = Q(campaign_id=campaign_id) | Q(campaign_key=campaign.name_key)
+        if campaign.external_id:
+            keys |= Q(campaign_ref=campaign.external_id)
+        open_entries &= keys
+    return models.MonitoringEntry.objects.filter(
+        Q(tenant_id=tenant_id) & ((open_entries & window) | Q(media_plan__in=plans.values('pk'))))
+
+
+def reconcile_scope(tenant_id, campaign_id=None, date_from=None, date_to=None, chunk_size=SCOPE_CHUNK_SIZE):
+    """Reconcile ``scoped_entries`` in chunks; returns summed status counts.
+
+    Each chunk commits on its own, so a large scope never holds locks on
+    every affected row at once. The delivery rollups of the days the scope
+    covers are refreshed at the end.
+    """
+    totals = {'matched': 0, 'ambiguous': 0, 'unmatched': 0}
+    scoped = list(scoped_entries(tenant_id, campaign_id, date_from, date_to)
+                  .order_by().values_list('pk', 'air_date'))
+    pks = [pk for pk, _ in scoped]
+    for i in range(0, len(pks), chunk_size):
+        counts = reconcile_entries(models.MonitoringEntry.objects.filter(pk__in=pks[i:i + chunk_size]))
+        for status, n in counts.items():
+            totals[status] += n
+    rollups.refresh_days(tenant_id, {day for _, day in scoped})
+    return totals
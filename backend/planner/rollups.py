@@ -0,0 +1,118 @@
+"""Daily delivery rollups maintained incrementally from monitoring entries.
+
+``DailyDeliveryRollup`` holds aired spots and entry counts per tenant,
+campaign, media plan, daypart and air date, a few rows per plan line and
+day however many spots aired, so the delivery report
+(``planner.analytics``) never scans the entries themselves. Station and
+show are not copied: the report joins them from the plan, so editing a
+plan needs no refresh.
+
+Imports (processed or failed) and reconcile runs call ``refresh_entries``
+with the entries they loaded or re-matched; deleting an import refreshes
+the days its entries covered (``entry_days`` / ``refresh_tenant_days``). The (tenant, air date) days those entries fall on are
+recomputed from all of the tenant's entries of those days and their rollup
+rows replaced in one transaction, so an entry moved to another campaign or
+plan also leaves its old row. Days are replaced rather than single keys
+upserted because key columns can be null (unmatched entries have no
+campaign, plan or daypart) and nulls never conflict in a unique index.
+``rebuild`` recomputes everything, see ``manage.py rebuild_delivery_rollups``.
+
+Under READ COMMITTED two refreshes of the same day would each delete the
+rows the other has not committed yet and both insert, double-counting the
+day. Every refresh and rebuild therefore first takes a per-tenant
+transaction-scoped advisory lock (``pg_advisory_xact_lock``) on PostgreSQL;
+other backends serialize writers themselves.
+"""
+from itertools import islice
+
+from django.db import connection, transaction
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import Coalesce
+
+from . import models
+from .loaders import BATCH_SIZE
+
+
+def _grouped(entries):
+    return (entries.order_by()
+            .values('tenant_id', 'campaign_id', 'media_plan_id', 'daypart_id', 'air_date')
+            .annotate(aired=Coalesce(Sum('spots_aired'), 0), total=Count('pk'),
+                      matched=Count('pk', filter=Q(match_status='matched'))))
+
+
+def _insert(entries):
+    """Aggregate ``entries`` into new ``DailyDeliveryRollup`` rows; returns rows written."""
+    rows = _grouped(entries).iterator(chunk_size=BATCH_SIZE)
+    written = 0
+    while True:
+        batch = list(islice(rows, BATCH_SIZE))
+        if not batch:
+            return written
+        models.DailyDeliveryRollup.objects.bulk_create([
+            models.DailyDeliveryRollup(
+                tenant_id=row['tenant_id'], campaign_id=row['campaign_id'], media_plan_id=row['media_plan_id'],
+                daypart_id=row['daypart_id'], date=row['air_date'],
+                spots_aired=row['aired'], entry_count=row['total'], matched_count=row['matched'])
+            for row in batch])
+        written += len(batch)
+
+
+def _lock(tenant_id):
+    """Serialize rollup writers of ``tenant_id`` until the surrounding transaction ends."""
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_advisory_xact_lock(hashtext(%s))', [f'planner.rollups:{tenant_id}'])
+
+
+def _on_days(field, days):
+    condition = Q(**{f'{field}__in': [day for day in days if day is not None]})
+    if None in days:
+        condition |= Q(**{f'{field}__isnull': True})
+    return condition
+
+
+def refresh_days(tenant_id, days):
+    """Recompute the tenant's rollups of ``days`` (dates, ``None`` for undated entries); returns rows written."""
+    days = set(days)
+    if not days:
+        return 0
+    with transaction.atomic():
+        _lock(tenant_id)
+        models.DailyDeliveryRollup.objects.filter(Q(tenant_id=tenant_id) & _on_days('date', days)).delete()
+        return _insert(models.MonitoringEntry.objects.filter(Q(tenant_id=tenant_id) & _on_days('air_date', days)))
+
+
+def entry_days(entries):
+    """``{tenant_id: {air dates}}`` of the ``entries`` queryset."""
+    days = {}
+    for tenant_id, day in entries.order_by().values_list('tenant_id', 'air_date').distinct():
+        days.setdefault(tenant_id, set()).add(day)
+    return days
+
+
+def refresh_tenant_days(days):
+    """Recompute the rollups of ``days`` as returned by ``entry_days``."""
+    return sum(refresh_days(tenant_id, tenant_days) for tenant_id, tenant_days in days.items())
+
+
+def refresh_entries(entries):
+    """Recompute the rollups of every (tenant, day) the ``entries`` queryset touches."""
+    return refresh_tenant_days(entry_days(entries))
+
+
+def rebuild(tenant_id=None):
+    """Recompute all rollups, or one tenant's; returns rows written."""
+    if tenant_id is None:
+        # tenant by tenant, each under its own lock
+        tenants = (set(models.MonitoringEntry.objects.order_by().values_list('tenant_id', flat=True).distinct())
+                   | set(models.DailyDeliveryRollup.objects.order_by().values_list('tenant_id', flat=True).distinct()))
+        return sum(rebuild_tenant(tenant) for tenant in tenants)
+    return rebuild_tenant(tenant_id)
+
+
+def rebuild_tenant(tenant_id):
+    """Recompute the rollups of ``tenant_id`` (``None`` for entries without a tenant); returns rows written."""
+    with transaction.atomic():
+        _lock(tenant_id)
+        models.DailyDeliveryRollup.objects.filter(tenant_id=tenant_id).delete()
+        return _insert(models.MonitoringEntry.objects.filter(tenant_id=tenant_id))
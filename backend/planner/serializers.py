@@ -1,20 +1,150 @@
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import transaction
 from rest_framework import serializers
+from stations.models import Station
+from stations.pricing import fill_prices, get_rate_index
 from . import models
+from .loaders import BATCH_SIZE
 
 
-class CampaignSerializer(serializers.ModelSerializer):
+class SparseFieldsMixin:
+    """Serializer mixin taking ``fields`` / ``omit`` arguments that limit the output.
+
+    ``sparse_queryset`` trims a queryset to the columns the remaining fields
+    read, so large JSON columns are neither fetched nor serialized. Fields
+    not backed by a model field of their own (method fields reading another
+    column, say) name their columns in ``field_columns``.
+    """
+    sparse_params = ('fields', 'omit')
+    field_columns = {}
+
+    def __init__(self, *args, fields=None, omit=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+        for name in omit or ():
+            self.fields.pop(name, None)
+
+    @classmethod
+    def sparse_options(cls, query_params):
+        """``fields`` / ``omit`` arguments from comma separated query parameters."""
+        available = cls().fields
+        options = {}
+        for param in cls.sparse_params:
+            names = [name.strip() for name in query_params.get(param, '').split(',') if name.strip()]
+            if not names:
+                continue
+            unknown = [name for name in names if name not in available]
+            if unknown:
+                raise serializers.ValidationError({param: f"Unknown fields: {', '.join(unknown)}."})
+            options[param] = names
+        return options
+
+    def columns(self, names):
+        """Model columns read by the fields ``names``."""
+        concrete = {field.name for field in self.Meta.model._meta.concrete_fields}
+        columns = set()
+        for name in names:
+            if name in self.field_columns:
+                columns.update(self.field_columns[name])
+                continue
+            source_attrs = self.fields[name].source_attrs
+            if source_attrs and source_attrs[0] in concrete:
+                columns.add(source_attrs[0])
+        return columns
+
+    @classmethod
+    def sparse_queryset(cls, queryset, fields=None, omit=None, keep=()):
+        """``queryset`` loading only what ``fields`` / ``omit`` leave to serialize, plus ``keep``."""
+        if fields is None and not omit:
+            return queryset
+        serializer = cls()
+        if fields is not None:
+            return queryset.only(queryset.model._meta.pk.name, *keep, *serializer.columns(fields))
+        # an omitted field's column may still be read by a field that stays
+        remaining = set(serializer.fields) - set(omit)
+        deferred = serializer.columns(omit) - serializer.columns(remaining) - set(keep)
+        return queryset.defer(*deferred) if deferred else queryset
+
+
+class CampaignSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = models.Campaign
-        fields = '__all__'
+        # name_key is internal to monitoring reconciliation
+        exclude = ['name_key']
+
+
+class PreloadedPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """PrimaryKeyRelatedField that first looks in the objects a list serializer preloaded."""
+
+    def to_internal_value(self, data):
+        preloaded = self.context.get('preloaded', {}).get(self.field_name)
+        if preloaded is not None and not isinstance(data, bool):
+            obj = preloaded.get(str(data))
+            if obj is not None:
+                return obj
+        return super().to_internal_value(data)
 
 
-class MediaPlanSerializer(serializers.ModelSerializer):
+class MediaPlanListSerializer(serializers.ListSerializer):
+    """Validates a batch of plan lines and inserts them with one bulk_create.
+
+    The campaigns, stations, shows and dayparts referenced by the batch are
+    loaded with one query per field before the items are validated, and
+    prices come from the cached rate index, so validation costs no query
+    per line.
+    """
+
+    def preload(self, data):
+        preloaded = {}
+        for name, field in self.child.fields.items():
+            if field.read_only or not isinstance(field, PreloadedPrimaryKeyRelatedField):
+                continue
+            queryset = field.get_queryset()
+            pks = set()
+            for item in data:
+                value = item.get(name) if isinstance(item, dict) else None
+                if value in (None, '') or isinstance(value, bool):
+                    continue
+                try:
+                    pks.add(queryset.model._meta.pk.to_python(value))
+                except DjangoValidationError:
+                    # left for the field to report
+                    continue
+            preloaded[name] = {str(obj.pk): obj for obj in queryset.filter(pk__in=pks)} if pks else {}
+        return preloaded
+
+    def to_internal_value(self, data):
+        if isinstance(data, list):
+            self._context['preloaded'] = self.preload(data)
+        return super().to_internal_value(data)
+
+    def create(self, validated_data):
+        request = self.context.get('request')
+        plans = []
+        for attrs in validated_data:
+            if request and hasattr(request, 'user'):
+                attrs['created_by'] = request.user
+            plans.append(models.MediaPlan(**attrs))
+        by_tenant = {}
+        for plan in plans:
+            by_tenant.setdefault(plan.campaign.tenant_id, []).append(plan)
+        for tenant_id, tenant_plans in by_tenant.items():
+            fill_prices(tenant_plans, tenant_id)
+        with transaction.atomic():
+            return models.MediaPlan.objects.bulk_create(plans, batch_size=BATCH_SIZE)
+
+
+class MediaPlanSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    serializer_related_field = PreloadedPrimaryKeyRelatedField
     # ensure created_by is read-only and set by the view
     created_by = serializers.PrimaryKeyRelatedField(read_only=True)
 
     class Meta:
         model = models.MediaPlan
         fields = '__all__'
+        list_serializer_class = MediaPlanListSerializer
 
     def validate(self, attrs):
         # spots must be positive
@@ -46,16 +176,28 @@ class MediaPlanSerializer(serializers.ModelSerializer):
         request = self.context.get('request')
         if request and hasattr(request, 'user'):
             validated_data['created_by'] = request.user
+        if validated_data.get('price_per_spot') is None:
+            validated_data['price_per_spot'] = self.rate_card_price(validated_data)
         return super().create(validated_data)
 
+    def rate_card_price(self, data):
+        """Price per spot from the tenant's rate cards, or ``None`` when none applies."""
+        station = data.get('station')
+        if station is None:
+            return None
+        show, daypart = data.get('show'), data.get('daypart')
+        rate = get_rate_index(data['campaign'].tenant_id).resolve(
+            station.id, show.id if show else None, daypart.id if daypart else None, data.get('scheduled_at'))
+        return rate.price if rate else None
+
 
-class MediaBriefSerializer(serializers.ModelSerializer):
+class MediaBriefSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = models.MediaBrief
         fields = '__all__'
 
 
-class MonitoringReportSerializer(serializers.ModelSerializer):
+class MonitoringReportSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = models.MonitoringReport
         fields = '__all__'
@@ -69,27 +211,100 @@ class MonitoringReportUploadSerializer(serializers.ModelSerializer):
         fields = ('id', 'campaign', 'media_plan', 'file', 'metrics')
 
 
-class MonitoringImportSerializer(serializers.ModelSerializer):
-    entries = serializers.SerializerMethodField()
+class MonitoringImportSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    # entries are paged through /monitoring-imports/{id}/entries/
+    entry_counts = serializers.SerializerMethodField()
+    progress = serializers.SerializerMethodField()
+    field_columns = {'progress': ('meta',)}
 
     class Meta:
         model = models.MonitoringImport
-        # use '__all__' to include model fields; declared SerializerMethodField 'entries' will be included
+        # use '__all__' to include model fields; declared SerializerMethodFields are included too
         fields = '__all__'
 
-    def get_entries(self, obj):
-        # include a small representation of parsed entries
-        qs = obj.entries.all()[:200]
-        return MonitoringEntrySerializer(qs, many=True).data
+    def get_entry_counts(self, obj):
+        # annotated by MonitoringImportViewSet (see MonitoringImportQuerySet.with_entry_counts)
+        if not hasattr(obj, 'entries_total'):
+            obj = models.MonitoringImport.objects.filter(pk=obj.pk).with_entry_counts().get()
+        return {'total': obj.entries_total, 'matched': obj.entries_matched,
+                'ambiguous': obj.entries_ambiguous, 'unmatched': obj.entries_unmatched}
 
+    def get_progress(self, obj):
+        # live counters written by the import pipeline after every committed chunk
+        return (obj.meta or {}).get('progress')
 
-class MonitoringEntrySerializer(serializers.ModelSerializer):
+
+class MonitoringEntrySerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = models.MonitoringEntry
-        fields = '__all__'
+        # match keys and fingerprint are internal to monitoring reconciliation and dedup
+        exclude = ['campaign_ref', 'campaign_key', 'show_key', 'station_key', 'air_date', 'fingerprint']
 
 
 class LicenseSerializer(serializers.ModelSerializer):
     class Meta:
         model = models.License
         fields = '__all__'
+
+
+class ReconcileScopeSerializer(serializers.Serializer):
+    """Scope of a re-reconcile request; all fields optional."""
+    campaign = serializers.PrimaryKeyRelatedField(queryset=models.Campaign.objects.all(), required=False)
+    date_from = serializers.DateField(required=False)
+    date_to = serializers.DateField(required=False)
+
+    def validate(self, attrs):
+        date_from, date_to = attrs.get('date_from'), attrs.get('date_to')
+        if date_from and date_to and date_from > date_to:
+            raise serializers.ValidationError({'date_to': 'Must not be before date_from.'})
+        campaign = attrs.get('campaign')
+        tenant_id = self.context.get('tenant_id')
+        if campaign and str(campaign.tenant_id) != str(tenant_id):
+            raise serializers.ValidationError({'campaign': 'Campaign does not belong to your tenant.'})
+        return attrs
+
+
+class DeliveryWindowSerializer(serializers.Serializer):
+    """Optional date window of a delivery report (plan date / air date)."""
+    date_from = serializers.DateField(required=False)
+    date_to = serializers.DateField(required=False)
+
+    def validate(self, attrs):
+        date_from, date_to = attrs.get('date_from'), attrs.get('date_to')
+        if date_from and date_to and date_from > date_to:
+            raise serializers.ValidationError({'date_to': 'Must not be before date_from.'})
+        return attrs
+
+
+class PlanTransitionSerializer(serializers.Serializer):
+    """Target status and the plans it applies to; ``campaign`` or ``ids`` is required."""
+    status = serializers.ChoiceField(choices=models.MediaPlan.STATUS_CHOICES)
+    campaign = serializers.PrimaryKeyRelatedField(queryset=models.Campaign.objects.all(), required=False)
+    station = serializers.PrimaryKeyRelatedField(queryset=Station.objects.all(), required=False)
+    date_from = serializers.DateField(required=False)
+    date_to = serializers.DateField(required=False)
+    ids = serializers.ListField(child=serializers.UUIDField(), required=False, allow_empty=False)
+
+    def validate(self, attrs):
+        if not attrs.get('campaign') and not attrs.get('ids'):
+            raise serializers.ValidationError('Either campaign or ids is required.')
+        date_from, date_to = attrs.get('date_from'), attrs.get('date_to')
+        if date_from and date_to and date_from > date_to:
+            raise serializers.ValidationError({'date_to': 'Must not be before date_from.'})
+        campaign = attrs.get('campaign')
+        tenant_id = self.context.get('tenant_id')
+        if campaign and str(campaign.tenant_id) != str(tenant_id):
+            raise serializers.ValidationError({'campaign': 'Campaign does not belong to your tenant.'})
+        return attrs
+
+
+class MediaPlanEditSerializer(serializers.Serializer):
+    """One line of a bulk media plan edit."""
+    id = serializers.UUIDField()
+    spots = serializers.IntegerField(min_value=1, required=False)
+    price_per_spot = serializers.DecimalField(max_digits=12, decimal_places=2, required=False, allow_null=True)
+
+    def validate(self, attrs):
+        if 'spots' not in attrs and 'price_per_spot' not in attrs:
+            raise serializers.ValidationError('Nothing to update.')
+        return attrs
@@ -1,58 +1,117 @@
-from celery import shared_task
-from . import models
+from celery import chord, shared_task
+from django.conf import settings
+from . import models, parsers, rollups
+from .pipeline import (RangeImportPipeline, finalize_import, mark_failed, plan_import_ranges, process_import,
+                       update_import_meta)
+from .reconcile import reconcile_scope
 from django.utils import timezone
 
-@shared_task(bind=True)
+# files above this size are split into ranges processed by parallel tasks
+FANOUT_THRESHOLD = 64 * 1024 * 1024  # 64MB
+FANOUT_PARTS = 8
+
+
+def should_fan_out(imp):
+    parts = getattr(settings, 'MONITORING_IMPORT_FANOUT_PARTS', FANOUT_PARTS)
+    threshold = getattr(settings, 'MONITORING_IMPORT_FANOUT_THRESHOLD', FANOUT_THRESHOLD)
+    if parts < 2 or imp.meta.get('checkpoint'):
+        # a single-task run already started; let it resume instead
+        return False
+    try:
+        return imp.file.size > threshold
+    except Exception:
+        return False
+
+
+def fan_out_monitoring_import(imp, parts=None):
+    """Split ``imp`` into row-aligned ranges and process them in a chord.
+
+    Each range runs as ``process_monitoring_import_range``; the chord callback
+    ``finalize_monitoring_import`` sums their counters and sets the final status.
+    """
+    parts = parts or getattr(settings, 'MONITORING_IMPORT_FANOUT_PARTS', FANOUT_PARTS)
+    ranges = plan_import_ranges(imp, parts)
+    update_import_meta(imp.pk, mode='parallel', planned_ranges=[list(r) for r in ranges])
+    header = [process_monitoring_import_range.s(str(imp.id), i, start, end) for i, (start, end) in enumerate(ranges)]
+    chord(header)(finalize_monitoring_import.s(str(imp.id)))
+    return len(ranges)
+
+
+# acks_late + reject_on_worker_lost redeliver the task if the worker dies
+# mid-import; the pipeline then resumes from the last committed checkpoint.
+@shared_task(bind=True, acks_late=True, reject_on_worker_lost=True, max_retries=3, default_retry_delay=30)
 def process_monitoring_import(self, import_id):
     """Background task to parse MonitoringImport file and create MonitoringEntry rows.
-    This mirrors the parsing logic in views.upload but runs asynchronously.
+    Runs the same pipeline as the inline path of views.upload (CSV and XLSX,
+    normalization, campaign/plan matching, batched inserts), committing in
+    chunks so retries resume where the previous attempt stopped. Files above
+    MONITORING_IMPORT_FANOUT_THRESHOLD are fanned out across workers.
     """
     try:
         imp = models.MonitoringImport.objects.get(id=import_id)
+        if imp.status == 'processed':
+            progress = imp.meta.get('progress') or {}
+            return {'status': 'ok', 'parsed': progress.get('rows_parsed', 0), 'matched': progress.get('rows_matched', 0)}
+        if imp.meta.get('mode') == 'parallel':
+            # redelivered after fanning out; the range tasks own the work now
+            return {'status': 'fanned_out'}
         imp.status = 'processing'
         imp.save()
 
-        f = imp.file
-        # re-open via storage
-        file_obj = f.open('rb')
-        parsed = 0
-        matched = 0
-        entries = []
-
-        # simple CSV fallback
-        if imp.original_filename.lower().endswith('.csv'):
-            import csv
-            text = file_obj.read().decode('utf-8', errors='replace').splitlines()
-            reader = csv.DictReader(text)
-            for raw in reader:
-                parsed += 1
-                entry = models.MonitoringEntry.objects.create(
-                    monitoring_import=imp,
-                    tenant=imp.tenant,
-                    raw_row=raw,
-                    spots_aired=int(raw.get('spots_aired') or raw.get('spots') or 0),
-                )
-                entries.append(entry)
-        else:
-            # For now, unsupported types will mark as failed
+        if parsers.is_supported(imp.original_filename) and should_fan_out(imp):
+            return {'status': 'fanned_out', 'ranges': fan_out_monitoring_import(imp)}
+
+        try:
+            result = process_import(imp)
+        except parsers.UnsupportedFileType:
             imp.status = 'failed'
             imp.summary = 'unsupported file type for background processing'
             imp.processed_at = timezone.now()
             imp.save()
             return {'status': 'failed'}
 
-        imp.status = 'processed'
-        imp.processed_at = timezone.now()
-        imp.summary = f'Parsed {parsed} entries in background'
-        imp.save()
-        return {'status': 'ok', 'parsed': parsed}
+        return {'status': 'ok', **result}
     except models.MonitoringImport.DoesNotExist:
         return {'status': 'not_found'}
     except Exception as exc:
+        if self.request.retries < self.max_retries:
+            # committed chunks are kept; the retry picks up from the checkpoint
+            raise self.retry(exc=exc)
         try:
-            imp.status = 'failed'
-            imp.summary = str(exc)
-            imp.save()
+            mark_failed(imp, str(exc))
         except Exception:
             pass
         raise
+
+
+@shared_task(bind=True, acks_late=True, reject_on_worker_lost=True, max_retries=3, default_retry_delay=30)
+def process_monitoring_import_range(self, import_id, index, start, end):
+    """Process one planned range of a fanned-out import; resumable like the full task."""
+    try:
+        imp = models.MonitoringImport.objects.get(id=import_id)
+        return RangeImportPipeline(imp, index, start, end).run()
+    except models.MonitoringImport.DoesNotExist:
+        return {'parsed': 0, 'matched': 0}
+    except Exception as exc:
+        if self.request.retries < self.max_retries:
+            raise self.retry(exc=exc)
+        models.MonitoringImport.objects.filter(id=import_id).update(
+            status='failed', summary=f'range {index} failed: {exc}', updated_at=timezone.now())
+        # roll up what this and the other ranges committed so far
+        rollups.refresh_entries(models.MonitoringEntry.objects.filter(monitoring_import_id=import_id))
+        raise
+
+
+@shared_task
+def finalize_monitoring_import(results, import_id):
+    """Chord callback: sum per-range counters and mark the import processed."""
+    imp = models.MonitoringImport.objects.get(id=import_id)
+    return {'status': 'ok', **finalize_import(imp, results)}
+
+
+@shared_task
+def reconcile_monitoring_entries(tenant_id, campaign_id=None, date_from=None, date_to=None):
+    """Re-match the entries a campaign/plan edit may affect; see reconcile.scoped_entries.
+    Dates are ISO strings (task arguments are JSON-serialized).
+    """
+    return {'status': 'ok', **reconcile_scope(tenant_id, campaign_id, date_from, date_to)}
@@ -0,0 +1,112 @@
+import datetime
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from stations.models import Daypart, Show, Station
+from tenants.models import Tenant
+from .. import analytics, models, rollups
+
+
+User = get_user_model()
+
+
+class DeliveryTests(TestCase):
+    def setUp(self):
+        self.tenant = Tenant.objects.create(name='DeliveryTenant')
+        self.user = User.objects.create_user(username='delivery', password='pass', tenant=self.tenant)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.campaign = models.Campaign.objects.create(tenant=self.tenant, name='Spring')
+        self.other = models.Campaign.objects.create(tenant=self.tenant, name='Autumn')
+        self.wxyz = Station.objects.create(tenant=self.tenant, name='WXYZ', type='Radio')
+        self.kabc = Station.objects.create(tenant=self.tenant, name='KABC', type='TV')
+        self.show = Show.objects.create(station=self.wxyz, name='Morning Drive')
+        self.morning = Daypart.objects.create(tenant=self.tenant, name='Morning',
+                                              start_time=datetime.time(6), end_time=datetime.time(10))
+        self.day1, self.day2 = datetime.date(2025, 9, 1), datetime.date(2025, 9, 2)
+        plan = models.MediaPlan.objects.create
+        self.wxyz_plan = plan(campaign=self.campaign, name='a', station=self.wxyz, show=self.show,
+                              daypart=self.morning, date=self.day1, spots=10, price_per_spot=Decimal('5.00'))
+        self.kabc_plan = plan(campaign=self.campaign, name='b', station=self.kabc, date=self.day2,
+                              spots=4, price_per_spot=Decimal('20.00'))
+        plan(campaign=self.campaign, name='c', station=self.kabc, date=self.day2, spots=3)
+        plan(campaign=self.other, name='d', station=self.kabc, date=self.day1, spots=2, price_per_spot=Decimal('1'))
+
+        def entry(campaign, media_plan, day, spots, status, daypart=None, tenant=self.tenant):
+            return models.MonitoringEntry(monitoring_import=self.imp, tenant=tenant, campaign=campaign,
+                                          media_plan=media_plan, air_date=day, spots_aired=spots,
+                                          match_status=status, daypart=daypart)
+        self.imp = models.MonitoringImport.objects.create(tenant=self.tenant, file='log.csv')
+        models.MonitoringEntry.objects.bulk_create([
+            entry(self.campaign, self.wxyz_plan, self.day1, 3, 'matched', self.morning),
+            entry(self.campaign, self.wxyz_plan, self.day1, 5, 'matched', self.morning),
+            entry(self.campaign, self.kabc_plan, self.day2, 2, 'matched'),
+            entry(self.campaign, None, self.day2, 1, 'ambiguous'),
+            entry(None, None, self.day2, 7, 'unmatched'),
+            entry(self.other, None, self.day1, 4, 'ambiguous'),
+        ])
+        rollups.rebuild()
+
+    def test_campaign_totals_and_breakdowns(self):
+        with self.assertNumQueries(1 + 2 + 3):  # get_object, plans and entries, station/show/daypart names
+            resp = self.client.get(f'/api/campaigns/{self.campaign.id}/delivery/')
+        self.assertEqual(resp.status_code, 200)
+        data = resp.json()
+        self.assertEqual(data['totals'], {
+            'planned_spots': 17, 'planned_cost': '130.00', 'unpriced_spots': 3,
+            'aired_spots': 11, 'entries': 4, 'matched_entries': 3, 'match_rate': 0.75})
+        stations = {row['name']: row for row in data['by_station']}
+        self.assertEqual(stations['WXYZ']['planned_spots'], 10)
+        self.assertEqual(stations['WXYZ']['aired_spots'], 8)
+        self.assertEqual(stations['KABC']['planned_spots'], 7)
+        self.assertEqual(stations['KABC']['aired_spots'], 2)
+        # the ambiguous airing has no plan, hence no station
+        self.assertEqual(data['by_station'][-1]['id'], None)
+        self.assertEqual(data['by_station'][-1]['aired_spots'], 1)
+        self.assertEqual([row['name'] for row in data['by_show']], ['Morning Drive', None])
+        self.assertEqual(data['by_daypart'][0]['name'], 'Morning')
+        self.assertEqual(data['by_daypart'][0]['match_rate'], 1.0)
+        self.assertEqual([(row['date'], row['planned_spots'], row['aired_spots']) for row in data['by_day']],
+                         [('2025-09-01', 10, 8), ('2025-09-02', 7, 3)])
+
+    def test_date_window(self):
+        result = analytics.campaign_delivery(self.campaign, date_from=self.day2, date_to=self.day2)
+        self.assertEqual(result['totals']['planned_spots'], 7)
+        self.assertEqual(result['totals']['aired_spots'], 3)
+        resp = self.client.get(f'/api/campaigns/{self.campaign.id}/delivery/',
+                               {'date_from': '2025-09-02', 'date_to': '2025-09-01'})
+        self.assertEqual(resp.status_code, 400)
+
+    def test_tenant_delivery_by_campaign(self):
+        resp = self.client.get('/api/campaigns/delivery/')
+        self.assertEqual(resp.status_code, 200)
+        data = resp.json()
+        self.assertEqual(data['totals']['planned_spots'], 19)
+        self.assertEqual(data['totals']['entries'], 5)  # the unmatched airing belongs to no campaign
+        campaigns = {row['name']: row for row in data['by_campaign']}
+        self.assertEqual(campaigns['Autumn']['aired_spots'], 4)
+        self.assertEqual(campaigns['Autumn']['match_rate'], 0.0)
+        self.assertEqual(campaigns['Spring']['planned_cost'], '130.00')
+
+    def test_other_tenant_campaign_not_found(self):
+        stranger = Tenant.objects.create(name='Stranger')
+        campaign = models.Campaign.objects.create(tenant=stranger, name='Hidden')
+        self.assertEqual(self.client.get(f'/api/campaigns/{campaign.id}/delivery/').status_code, 404)
+
+    def test_station_follows_plan_edit(self):
+        self.wxyz_plan.station = self.kabc
+        self.wxyz_plan.save()
+        data = self.client.get(f'/api/campaigns/{self.campaign.id}/delivery/').json()
+        stations = {row['name']: row for row in data['by_station']}
+        self.assertNotIn('WXYZ', stations)
+        self.assertEqual(stations['KABC']['planned_spots'], 17)
+        self.assertEqual(stations['KABC']['aired_spots'], 10)
+
+    def test_deleting_import_drops_its_spots(self):
+        self.assertEqual(self.client.delete(f'/api/monitoring-imports/{self.imp.id}/').status_code, 204)
+        self.assertFalse(models.DailyDeliveryRollup.objects.exists())
+        totals = self.client.get(f'/api/campaigns/{self.campaign.id}/delivery/').json()['totals']
+        self.assertEqual((totals['planned_spots'], totals['aired_spots'], totals['entries']), (17, 0, 0))
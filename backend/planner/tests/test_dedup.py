@@ -0,0 +1,145 @@
+import hashlib
+import io
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from .. import dedup, models
+from ..pipeline import RangeImportPipeline, plan_import_ranges, process_import
+from tenants.models import Tenant
+
+
+User = get_user_model()
+
+HEADER = 'airtime,station,campaign,spots,duration\n'
+
+
+def log(*minutes):
+    return (HEADER + ''.join(f'2025-09-01T10:{m:02d}:00,Radio One,Summer,1,30\n' for m in minutes)).encode('utf-8')
+
+
+class DedupTests(TestCase):
+    def setUp(self):
+        self.tenant = Tenant.objects.create(name='DedupTenant')
+        self.user = User.objects.create_user(username='dedup', password='pass', tenant=self.tenant)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def upload(self, content):
+        f = io.BytesIO(content)
+        f.name = 'log.csv'
+        return self.client.post('/api/monitoring-imports/upload/', {'file': f}, format='multipart')
+
+    def make_import(self, content):
+        return models.MonitoringImport.objects.create(
+            tenant=self.tenant, file=ContentFile(content, name='log.csv'), original_filename='log.csv')
+
+    def test_file_hash_is_streamed_sha256(self):
+        content = log(*range(60)) * 50
+        f = io.BytesIO(content)
+        self.assertEqual(dedup.file_sha256(f), hashlib.sha256(content).hexdigest())
+        self.assertEqual(f.tell(), 0)
+
+    def test_resent_file_returns_existing_import(self):
+        first = self.upload(log(1, 2))
+        self.assertEqual(first.status_code, 201)
+        again = self.upload(log(1, 2))
+        self.assertEqual(again.status_code, 200)
+        self.assertTrue(again.data['duplicate'])
+        self.assertEqual(again.data['import_id'], first.data['import_id'])
+        self.assertEqual(models.MonitoringImport.objects.count(), 1)
+        imp = models.MonitoringImport.objects.get()
+        self.assertEqual(imp.content_hash, hashlib.sha256(log(1, 2)).hexdigest())
+
+    def test_concurrent_identical_upload_returns_existing_import(self):
+        first = self.upload(log(1, 2))
+        original = dedup.find_duplicate_import
+        lookups = []
+
+        def missed_first_lookup(tenant_id, content_hash):
+            # the other upload had not committed yet when this one looked
+            lookups.append(content_hash)
+            return None if len(lookups) == 1 else original(tenant_id, content_hash)
+
+        with mock.patch.object(dedup, 'find_duplicate_import', missed_first_lookup):
+            again = self.upload(log(1, 2))
+        self.assertEqual(len(lookups), 2)
+        self.assertEqual(again.status_code, 200)
+        self.assertTrue(again.data['duplicate'])
+        self.assertEqual(again.data['import_id'], first.data['import_id'])
+        self.assertEqual(models.MonitoringImport.objects.count(), 1)
+
+    def test_failed_import_can_be_resent(self):
+        self.upload(log(1))
+        models.MonitoringImport.objects.update(status='failed')
+        self.assertEqual(self.upload(log(1)).status_code, 201)
+
+    def test_overlapping_file_only_inserts_new_spots(self):
+        process_import(self.make_import(log(1, 2, 3)))
+        imp = self.make_import(log(2, 3, 4, 4))
+        result = process_import(imp)
+        self.assertEqual((result['parsed'], result['duplicates']), (2, 2))
+        self.assertEqual(imp.entries.count(), 2)
+        self.assertEqual(models.MonitoringEntry.objects.filter(tenant=self.tenant).count(), 5)
+        imp.refresh_from_db()
+        self.assertEqual(imp.summary, 'Parsed 2 entries, matched 0, skipped 2 duplicates')
+
+    def test_identical_rows_in_one_file_are_kept(self):
+        # the spot aired three times in the same slot
+        imp = self.make_import(log(1, 1, 1, 2))
+        result = process_import(imp, chunk_size=2)
+        self.assertEqual((result['parsed'], result['duplicates']), (4, 0))
+        self.assertEqual(imp.entries.count(), 4)
+        self.assertEqual(len(set(imp.entries.values_list('fingerprint', flat=True))), 4)
+
+    def test_overlap_counts_repeats(self):
+        process_import(self.make_import(log(1, 1)))
+        # one more airing of the repeated spot, and a new one
+        result = process_import(self.make_import(log(1, 1, 1, 2)))
+        self.assertEqual(result['duplicates'], 2)
+        entries = models.MonitoringEntry.objects.filter(tenant=self.tenant)
+        self.assertEqual(entries.filter(airtime__minute=1).count(), 3)
+        self.assertEqual(entries.count(), 4)
+
+    def test_parallel_ranges_keep_repeats_of_one_spot(self):
+        imp = self.make_import(log(*[1] * 8))
+        (start, middle), (_, end) = plan_import_ranges(imp, 2)
+        second = RangeImportPipeline(imp, 1, middle, end)
+        original = RangeImportPipeline.commit_chunk
+        results = []
+
+        def second_range_commits_first(pipeline, entries):
+            # the first range has built its entries when the second one runs
+            if pipeline is not second and not results:
+                results.append(second.run())
+            return original(pipeline, entries)
+
+        with mock.patch.object(RangeImportPipeline, 'commit_chunk', second_range_commits_first):
+            results.append(RangeImportPipeline(imp, 0, start, middle).run())
+        self.assertEqual(imp.entries.count(), 8)
+        self.assertEqual(sum(r['parsed'] for r in results), 8)
+        self.assertEqual(sum(r['duplicates'] for r in results), 0)
+
+    def test_rows_lost_to_a_concurrent_import_are_not_counted(self):
+        process_import(self.make_import(log(1, 2)))
+        imp = self.make_import(log(1, 2, 3))
+        # as if the other import stored its spots after this one looked them up
+        with mock.patch.object(dedup, 'drop_duplicates', lambda entries, tenant_id, import_id: entries):
+            result = process_import(imp)
+        self.assertEqual((result['parsed'], result['duplicates']), (1, 2))
+        self.assertEqual(imp.entries.count(), 1)
+
+    def test_rows_without_airtime_are_kept(self):
+        content = (HEADER + ',Radio One,Summer,1,30\n' * 2).encode('utf-8')
+        result = process_import(self.make_import(content))
+        self.assertEqual(result['duplicates'], 0)
+        self.assertEqual(models.MonitoringEntry.objects.filter(fingerprint='').count(), 2)
+
+    @override_settings(MONITORING_IMPORT_DEDUPLICATE=False)
+    def test_disabled(self):
+        self.assertEqual(self.upload(log(1)).status_code, 201)
+        self.assertEqual(self.upload(log(1)).status_code, 201)
+        self.assertEqual(models.MonitoringEntry.objects.filter(tenant=self.tenant).count(), 2)
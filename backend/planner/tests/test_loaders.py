@@ -0,0 +1,102 @@
+import datetime
+import io
+import unittest
+
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from .. import loaders, models
+from ..pipeline import process_import
+from tenants.models import Tenant
+
+
+User = get_user_model()
+
+
+class LoaderSelectionTests(TestCase):
+    def test_copy_falls_back_to_bulk_create_without_postgres(self):
+        loader = loaders.get_loader('copy')
+        expected = loaders.CopyLoader if connection.vendor == 'postgresql' else loaders.BulkCreateLoader
+        self.assertIsInstance(loader, expected)
+
+    @override_settings(MONITORING_IMPORT_LOADER='bulk_create')
+    def test_default_comes_from_settings(self):
+        self.assertIsInstance(loaders.get_loader(), loaders.BulkCreateLoader)
+
+    def test_bulk_create_by_default(self):
+        self.assertIsInstance(loaders.get_loader(), loaders.BulkCreateLoader)
+
+    def test_unknown_loader_rejected(self):
+        with self.assertRaises(ValueError):
+            loaders.get_loader('nope')
+
+    def test_upload_records_loader_choice(self):
+        tenant = Tenant.objects.create(name='LoaderTenant')
+        user = User.objects.create_user(username='loader', password='pass', tenant=tenant)
+        client = APIClient()
+        client.force_authenticate(user=user)
+
+        def upload(loader):
+            f = io.BytesIO(b'airtime,spots\n2025-09-01T10:00:00,1\n')
+            f.name = 'log.csv'
+            return client.post('/api/monitoring-imports/upload/', {'file': f, 'loader': loader}, format='multipart')
+
+        self.assertEqual(upload('nope').status_code, 400)
+        resp = upload('bulk_create')
+        self.assertEqual(resp.status_code, 201)
+        imp = models.MonitoringImport.objects.get(pk=resp.data['import_id'])
+        self.assertEqual(imp.meta['loader'], 'bulk_create')
+        self.assertEqual(imp.entries.count(), 1)
+
+
+class CopyLoaderTests(TestCase):
+    def setUp(self):
+        self.tenant = Tenant.objects.create(name='CopyTenant')
+        self.imp = models.MonitoringImport.objects.create(tenant=self.tenant, file='x.csv')
+
+    def entries(self, n):
+        airtime = timezone.make_aware(datetime.datetime(2025, 9, 1, 10, 0))
+        return [models.MonitoringEntry(
+            monitoring_import=self.imp, tenant=self.tenant, airtime=airtime, spots_aired=i,
+            raw_row={'row': i, 'note': 'tab\there, "quoted"'}) for i in range(n)]
+
+    def test_rows_fill_defaults_like_bulk_create(self):
+        loader = loaders.CopyLoader()
+        row = next(loader.rows(self.entries(1)))
+        self.assertEqual(len(row), len(loader.fields))
+        columns = [f.column for f in loader.fields]
+        self.assertIsNotNone(row[columns.index('created_at')])
+        self.assertIn('"monitoring_import_id"', loader.copy_sql())
+
+    @unittest.skipUnless(connection.vendor == 'postgresql', 'COPY needs PostgreSQL')
+    def test_copy_round_trip(self):
+        loaders.CopyLoader().load(self.entries(3))
+        rows = list(self.imp.entries.order_by('spots_aired').values_list('spots_aired', 'raw_row'))
+        self.assertEqual([r[0] for r in rows], [0, 1, 2])
+        self.assertEqual(rows[1][1], {'row': 1, 'note': 'tab\there, "quoted"'})
+
+    @unittest.skipUnless(connection.vendor == 'postgresql', 'COPY needs PostgreSQL')
+    def test_copy_skips_conflicts_through_staging_table(self):
+        entries = self.entries(3)
+        for i, entry in enumerate(entries):
+            entry.fingerprint = f'fp-{i}'
+        loaders.CopyLoader(ignore_conflicts=True).load(entries[:2])
+        # the staging table is reused within the session
+        loaders.CopyLoader(ignore_conflicts=True).load([
+            models.MonitoringEntry(monitoring_import=self.imp, tenant=self.tenant, spots_aired=9,
+                                   raw_row={}, fingerprint='fp-1'),
+            entries[2]])
+        self.assertEqual(sorted(self.imp.entries.values_list('spots_aired', flat=True)), [0, 1, 2])
+
+    @unittest.skipUnless(connection.vendor == 'postgresql', 'COPY needs PostgreSQL')
+    def test_copy_through_the_pipeline(self):
+        imp = models.MonitoringImport.objects.create(
+            tenant=self.tenant, file=ContentFile(b'airtime,spots\n2025-09-01T10:00:00,2\n', name='log.csv'),
+            original_filename='log.csv', meta={'loader': 'copy'})
+        self.assertEqual(process_import(imp)['parsed'], 1)
+        entry = imp.entries.get()
+        self.assertEqual((entry.spots_aired, entry.raw_row), (2, {'airtime': '2025-09-01T10:00:00', 'spots': '2'}))
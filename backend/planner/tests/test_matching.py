@@ -0,0 +1,107 @@
+import datetime
+import uuid
+
+from django.test import TestCase
+
+from .. import models
+from ..matching import EntryMatcher
+from tenants.models import Tenant
+from stations.models import Station, Show
+
+
+def legacy_match(tenant_id, raw, airtime):
+    """Per-row ORM lookups the upload view used before EntryMatcher."""
+    campaign_obj = None
+    campaign_id_val = raw.get('campaign_id') or raw.get('campaign_external_id') or raw.get('campaign_id_external')
+    campaign_name_val = raw.get('campaign') or raw.get('campaign_name') or raw.get('advertiser')
+    if campaign_id_val:
+        campaign_obj = models.Campaign.objects.filter(tenant_id=tenant_id, external_id=str(campaign_id_val)).first()
+    if not campaign_obj and campaign_name_val:
+        campaign_obj = models.Campaign.objects.filter(tenant_id=tenant_id, name__iexact=str(campaign_name_val).strip()).first()
+    media_plan_obj = None
+    if campaign_obj and airtime:
+        qs = models.MediaPlan.objects.filter(campaign=campaign_obj, date=airtime.date())
+        show_val = raw.get('show') or raw.get('show_name')
+        station_val = raw.get('station') or raw.get('station_name')
+        if show_val:
+            qs = qs.filter(show__name__iexact=str(show_val).strip())
+        if station_val:
+            qs = qs.filter(station__name__iexact=str(station_val).strip())
+        media_plan_obj = qs.first()
+    return campaign_obj, media_plan_obj
+
+
+class MatchingFixture:
+    """Campaigns, plans and sample rows shared with the reconcile tests."""
+
+    def setUp(self):
+        self.tenant = Tenant.objects.create(name='T1')
+        other = Tenant.objects.create(name='T2')
+        self.station = Station.objects.create(tenant=self.tenant, name='Radio One', type='Radio')
+        self.station2 = Station.objects.create(tenant=self.tenant, name='Radio Two', type='Radio')
+        self.show = Show.objects.create(station=self.station, name='Morning Drive')
+        self.show2 = Show.objects.create(station=self.station2, name='Morning Drive')
+        self.c1 = models.Campaign.objects.create(tenant=self.tenant, name='Summer Sale', external_id='EXT-1')
+        self.c2 = models.Campaign.objects.create(tenant=self.tenant, name='Winter')
+        # duplicate names resolve to the lowest pk, like QuerySet.first()
+        models.Campaign.objects.create(id=uuid.UUID(int=2 ** 128 - 1), tenant=self.tenant, name='winter')
+        models.Campaign.objects.create(tenant=other, name='Summer Sale', external_id='EXT-2')
+        day = datetime.date(2025, 9, 1)
+        for station, show in ((self.station, self.show), (self.station2, self.show2), (None, None)):
+            models.MediaPlan.objects.create(campaign=self.c1, name='p', date=day, spots=1, station=station, show=show)
+        models.MediaPlan.objects.create(campaign=self.c2, name='p', date=day, spots=1)
+
+    def rows(self):
+        airtime = datetime.datetime(2025, 9, 1, 10, 0)
+        return [
+            ({'campaign_id': 'EXT-1'}, airtime),
+            ({'campaign_id': 'EXT-2', 'campaign_name': ' summer SALE '}, airtime),
+            ({'campaign_id': 'EXT-2'}, airtime),
+            ({'campaign': 'WINTER'}, airtime),
+            ({'campaign': 'Summer Sale', 'show': 'morning drive'}, airtime),
+            ({'campaign': 'Summer Sale', 'show': 'morning drive', 'station_name': 'radio two'}, airtime),
+            ({'campaign': 'Summer Sale', 'station': 'Radio One '}, airtime),
+            ({'campaign': 'Summer Sale', 'show': 'Evening'}, airtime),
+            ({'campaign': 'Summer Sale'}, datetime.datetime(2025, 9, 2, 10, 0)),
+            ({'campaign': 'Summer Sale'}, None),
+            ({'advertiser': 'Nobody'}, airtime),
+            ({}, airtime),
+        ]
+
+
+class EntryMatcherTests(MatchingFixture, TestCase):
+    def test_matches_legacy_lookups(self):
+        matcher = EntryMatcher(self.tenant.id)
+        for raw, airtime in self.rows():
+            campaign, plan, _ = matcher.match(raw, airtime)
+            expected_campaign, expected_plan = legacy_match(self.tenant.id, raw, airtime)
+            self.assertEqual(getattr(campaign, 'pk', None), getattr(expected_campaign, 'pk', None), raw)
+            self.assertEqual(getattr(plan, 'pk', None), getattr(expected_plan, 'pk', None), raw)
+
+    def test_cover_loads_only_plans_in_window(self):
+        day = datetime.date(2025, 9, 1)
+        for offset in range(1, 31):
+            models.MediaPlan.objects.create(campaign=self.c1, name='old', date=day - datetime.timedelta(days=offset),
+                                            spots=1)
+        matcher = EntryMatcher(self.tenant.id)
+        matcher.cover(day, day)
+        with self.assertNumQueries(1):
+            statuses = [matcher.match(raw, airtime)[2] for raw, airtime in self.rows()]
+        self.assertEqual(statuses[0], 'matched')
+        self.assertEqual({key[1] for key in matcher._plans}, {day})
+        # a narrower window reuses the loaded plans, a later one replaces them
+        with self.assertNumQueries(0):
+            matcher.cover(day, day)
+            matcher.match(*self.rows()[0])
+        matcher.cover(day - datetime.timedelta(days=30), day - datetime.timedelta(days=30))
+        with self.assertNumQueries(1):
+            self.assertEqual(matcher.match({'campaign_id': 'EXT-1'}, datetime.datetime(2025, 8, 2, 9))[2], 'matched')
+        self.assertEqual({key[1] for key in matcher._plans}, {datetime.date(2025, 8, 2)})
+
+    def test_fixed_query_count(self):
+        rows = self.rows() * 50
+        with self.assertNumQueries(2):
+            matcher = EntryMatcher(self.tenant.id)
+            statuses = [matcher.match(raw, airtime)[2] for raw, airtime in rows]
+        self.assertEqual(statuses[:4], ['matched', 'matched', 'unmatched', 'matched'])
+        self.assertEqual(statuses[7:12], ['ambiguous', 'ambiguous', 'ambiguous', 'unmatched', 'unmatched'])
@@ -1,10 +1,16 @@
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
 from django.contrib.auth import get_user_model
 from rest_framework.test import APIClient
 from .. import models, serializers
 from tenants.models import Tenant
-from stations.models import Station, Show, Daypart
+from stations.models import Station, Show, Daypart, RateCard
+from stations.pricing import get_rate_index
+import datetime
 import io
+from decimal import Decimal
 
 
 User = get_user_model()
@@ -46,6 +52,211 @@ class MediaPlanSerializerTests(TestCase):
         self.assertIn('show', serializer.errors)
 
 
+class MediaPlanViewScopeTests(TestCase):
+    def test_plans_scoped_through_campaign_tenant(self):
+        tenant = Tenant.objects.create(name='PlanTenant')
+        other = Tenant.objects.create(name='OtherTenant')
+        user = User.objects.create_user(username='plans', password='pass', tenant=tenant)
+        mine = models.MediaPlan.objects.create(campaign=models.Campaign.objects.create(tenant=tenant, name='Mine'),
+                                               name='Mine')
+        theirs = models.MediaPlan.objects.create(campaign=models.Campaign.objects.create(tenant=other, name='Theirs'),
+                                                 name='Theirs')
+        client = APIClient()
+        client.force_authenticate(user=user)
+        resp = client.get('/api/media-plans/')
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual([row['id'] for row in resp.json()['results']], [str(mine.id)])
+        self.assertEqual(client.get(f'/api/media-plans/{mine.id}/').status_code, 200)
+        self.assertEqual(client.get(f'/api/media-plans/{theirs.id}/').status_code, 404)
+
+
+class MediaPlanPricingTests(TestCase):
+    def setUp(self):
+        self.tenant = Tenant.objects.create(name='PricedTenant')
+        self.user = User.objects.create_user(username='priced', password='pass', tenant=self.tenant)
+        self.campaign = models.Campaign.objects.create(tenant=self.tenant, name='Priced')
+        self.station = Station.objects.create(tenant=self.tenant, name='Priced TV', type='TV')
+        self.show = Show.objects.create(station=self.station, name='News')
+        self.daypart = Daypart.objects.create(name='Prime', start_time=datetime.time(19), end_time=datetime.time(23))
+        RateCard.objects.create(station=self.station, daypart=self.daypart, price=100)
+        RateCard.objects.create(station=self.station, show=self.show, daypart=self.daypart, price=150)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def create(self, **extra):
+        data = {'campaign': self.campaign.id, 'name': 'Line', 'station': self.station.id, 'spots': 2, **extra}
+        resp = self.client.post('/api/media-plans/', data, format='json')
+        self.assertEqual(resp.status_code, 201, resp.content)
+        return resp.json()
+
+    def test_create_prices_from_rate_card(self):
+        self.assertEqual(self.create(show=self.show.id, daypart=self.daypart.id)['price_per_spot'], '150.00')
+        self.assertEqual(self.create(scheduled_at=timezone.make_aware(datetime.datetime(2025, 9, 1, 20)).isoformat())['price_per_spot'], '100.00')
+        # manual prices are kept, lines without a rate stay unpriced
+        self.assertEqual(self.create(daypart=self.daypart.id, price_per_spot='80.00')['price_per_spot'], '80.00')
+        self.assertIsNone(self.create()['price_per_spot'])
+
+    def test_totals(self):
+        self.create(show=self.show.id, daypart=self.daypart.id)
+        self.create(daypart=self.daypart.id, spots=3, price_per_spot='80.00')
+        self.create()
+        # a line created before its rate card existed is priced at read time
+        models.MediaPlan.objects.create(campaign=self.campaign, name='Old', station=self.station,
+                                        daypart=self.daypart, spots=1)
+        resp = self.client.get('/api/media-plans/totals/', {'campaign': self.campaign.id})
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.json(), {'lines': 4, 'spots': 8, 'priced': 3, 'unpriced': 1,
+                                       'totals': {'USD': '640.00'}})
+
+
+class MediaPlanBulkCreateTests(TestCase):
+    def setUp(self):
+        self.tenant = Tenant.objects.create(name='BulkTenant')
+        self.user = User.objects.create_user(username='bulk', password='pass', tenant=self.tenant)
+        self.campaign = models.Campaign.objects.create(tenant=self.tenant, name='Bulk')
+        self.stations = [Station.objects.create(tenant=self.tenant, name=f'Bulk {i}', type='TV') for i in range(3)]
+        self.shows = [Show.objects.create(station=station, name='News') for station in self.stations]
+        self.daypart = Daypart.objects.create(name='Prime', start_time=datetime.time(19), end_time=datetime.time(23))
+        RateCard.objects.create(station=self.stations[0], daypart=self.daypart, price=100)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def items(self, n):
+        return [{'campaign': str(self.campaign.id), 'name': f'Line {i}', 'station': str(self.stations[i % 3].id),
+                 'show': str(self.shows[i % 3].id), 'daypart': str(self.daypart.id), 'date': '2025-09-01',
+                 'spots': 1 + i % 4} for i in range(n)]
+
+    def post(self, items):
+        return self.client.post('/api/media-plans/bulk/', {'items': items}, format='json')
+
+    def test_queries_do_not_grow_with_batch(self):
+        get_rate_index(self.tenant.id)  # built once, then served from memory
+        counts = []
+        for n in (3, 60):
+            with CaptureQueriesContext(connection) as ctx:
+                resp = self.post(self.items(n))
+            self.assertEqual(resp.status_code, 201, resp.content)
+            self.assertEqual(len(resp.data['created']), n)
+            counts.append(len(ctx.captured_queries))
+        self.assertEqual(counts[0], counts[1])
+        plans = models.MediaPlan.objects.filter(campaign=self.campaign)
+        self.assertEqual(plans.count(), 63)
+        self.assertEqual(set(plans.values_list('created_by', flat=True)), {self.user.id})
+        # station 0 has a rate card, the others have none
+        self.assertEqual(set(plans.filter(station=self.stations[0]).values_list('price_per_spot', flat=True)),
+                         {100})
+        self.assertEqual(set(plans.exclude(station=self.stations[0]).values_list('price_per_spot', flat=True)),
+                         {None})
+
+    def test_failing_item_creates_nothing(self):
+        items = self.items(5)
+        items[1]['show'] = str(self.shows[2].id)  # show of another station
+        items[3]['spots'] = 0
+        items[4]['campaign'] = str(models.Campaign.objects.create(tenant=Tenant.objects.create(name='X'), name='X').id)
+        resp = self.post(items)
+        self.assertEqual(resp.status_code, 400)
+        self.assertEqual(resp.data['failed'], [1, 3, 4])
+        self.assertEqual([sorted(e) for e in resp.data['errors']], [['show'], ['spots'], ['campaign']])
+        self.assertFalse(models.MediaPlan.objects.exists())
+
+    def test_unknown_references_reported(self):
+        items = self.items(2)
+        items[0]['station'] = 'not-a-uuid'
+        items[1]['show'] = '00000000-0000-0000-0000-000000000000'
+        resp = self.post(items)
+        self.assertEqual(resp.status_code, 400)
+        self.assertEqual([sorted(e) for e in resp.data['errors']], [['station'], ['show']])
+        self.assertEqual(self.post({'campaign': 'x'}).status_code, 400)
+
+
+class MediaPlanBulkStatusTests(TestCase):
+    def setUp(self):
+        self.tenant = Tenant.objects.create(name='StatusTenant')
+        self.user = User.objects.create_user(username='status', password='pass', tenant=self.tenant)
+        self.campaign = models.Campaign.objects.create(tenant=self.tenant, name='Status')
+        self.station = Station.objects.create(tenant=self.tenant, name='Status TV', type='TV')
+        self.plans = [models.MediaPlan.objects.create(
+            campaign=self.campaign, name=f'Line {i}', station=self.station if i % 2 else None,
+            date=datetime.date(2025, 9, 1 + i), spots=1) for i in range(6)]
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def statuses(self):
+        return [plan.status for plan in models.MediaPlan.objects.order_by('date')]
+
+    def transition(self, **data):
+        return self.client.post('/api/media-plans/transition/', {'campaign': str(self.campaign.id), **data},
+                                format='json')
+
+    def test_transition_filtered_set_in_one_update(self):
+        with self.assertNumQueries(5):
+            resp = self.transition(status='pending', date_from='2025-09-02', date_to='2025-09-05')
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual((resp.data['updated'], resp.data['failed']), (4, []))
+        self.assertEqual(self.statuses(), ['draft', 'pending', 'pending', 'pending', 'pending', 'draft'])
+
+        resp = self.transition(status='accepted', station=str(self.station.id))
+        self.assertEqual(resp.data['updated'], 2)
+        # line 5 is still a draft
+        self.assertEqual([(f['id'], f['status']) for f in resp.data['failed']], [(self.plans[5].id, 'draft')])
+        self.assertEqual(self.statuses(), ['draft', 'accepted', 'pending', 'accepted', 'pending', 'draft'])
+
+        resp = self.transition(status='locked', ids=[str(self.plans[1].id), str(self.plans[2].id)])
+        self.assertEqual(resp.data['updated'], 1)
+        self.assertEqual(resp.data['failed'][0]['detail'], 'Cannot move from pending to locked.')
+        self.assertEqual(self.statuses(), ['draft', 'locked', 'pending', 'accepted', 'pending', 'draft'])
+
+    def test_transition_requires_scope_in_tenant(self):
+        resp = self.client.post('/api/media-plans/transition/', {'status': 'pending'}, format='json')
+        self.assertEqual(resp.status_code, 400)
+        other = models.Campaign.objects.create(tenant=Tenant.objects.create(name='Other'), name='Other')
+        self.assertEqual(self.transition(status='pending', campaign=str(other.id)).status_code, 400)
+        self.assertEqual(self.transition(status='archived').status_code, 400)
+        self.assertEqual(set(self.statuses()), {'draft'})
+
+    def test_bulk_writes_need_the_users_own_tenant(self):
+        other_tenant = Tenant.objects.create(name='Other')
+        outsider = User.objects.create_user(username='outsider', password='pass', tenant=other_tenant)
+        tenantless = User.objects.create_user(username='tenantless', password='pass')
+        edit = {'items': [{'id': str(plan.id), 'spots': 9} for plan in self.plans]}
+        transition = {'status': 'pending', 'ids': [str(plan.id) for plan in self.plans]}
+        for user, expected in ((outsider, 200), (tenantless, 403)):
+            self.client.force_authenticate(user=user)
+            resp = self.client.patch('/api/media-plans/bulk/', edit, format='json')
+            self.assertEqual(resp.status_code, expected)
+            if expected == 200:
+                self.assertEqual(resp.data['updated'], 0)
+            # the X-Tenant header does not widen a bulk write
+            resp = self.client.post('/api/media-plans/transition/', transition, format='json',
+                                    HTTP_X_TENANT=str(self.tenant.id))
+            self.assertEqual(resp.status_code, expected)
+            if expected == 200:
+                self.assertEqual(resp.data['updated'], 0)
+        self.assertEqual(set(self.statuses()), {'draft'})
+        self.assertEqual(set(models.MediaPlan.objects.values_list('spots', flat=True)), {1})
+
+    def test_bulk_update(self):
+        models.MediaPlan.objects.filter(pk=self.plans[0].pk).update(status='locked')
+        items = [
+            {'id': str(self.plans[0].id), 'spots': 9},
+            {'id': str(self.plans[1].id), 'spots': 4, 'price_per_spot': '12.50'},
+            {'id': str(self.plans[2].id), 'price_per_spot': None},
+            {'id': str(self.plans[3].id), 'spots': 0},
+            {'id': '00000000-0000-0000-0000-000000000000', 'spots': 2},
+            {'id': str(self.plans[4].id)},
+        ]
+        with self.assertNumQueries(4):
+            resp = self.client.patch('/api/media-plans/bulk/', {'items': items}, format='json')
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.data['updated'], 2)
+        self.assertEqual([f.get('index') for f in resp.data['failed']], [3, 5, None, None])
+        self.assertEqual([f['detail'] for f in resp.data['failed'][2:]],
+                         ['Locked plans cannot be edited.', 'Not found.'])
+        spots = dict(models.MediaPlan.objects.values_list('id', 'spots'))
+        self.assertEqual([spots[p.id] for p in self.plans[:4]], [1, 4, 1, 1])
+        self.assertEqual(models.MediaPlan.objects.get(pk=self.plans[1].pk).price_per_spot, Decimal('12.50'))
+
+
 class MonitoringImportViewTests(TestCase):
     def setUp(self):
         self.tenant = Tenant.objects.create(name='MonTenant')
@@ -64,4 +275,14 @@ class MonitoringImportViewTests(TestCase):
         self.assertTrue(models.MonitoringImport.objects.exists())
         mi = models.MonitoringImport.objects.first()
         # parsed summary should mention entries
-        self.assertIn('Parsed', mi.summary)
\ No newline at end of file
+        self.assertIn('Parsed', mi.summary)
+
+    def test_upload_csv_parses_rows_from_stored_file(self):
+        csv_content = 'airtime,spots_aired,campaign_name\n2025-09-01T10:00:00,2,TestCampaign\n2025-09-01T11:00:00,3,TestCampaign\n'
+        f = io.BytesIO(csv_content.encode('utf-8'))
+        f.name = 'sample.csv'
+        resp = self.client.post('/api/monitoring-imports/upload/', {'file': f}, format='multipart')
+        self.assertEqual(resp.status_code, 201)
+        self.assertEqual(resp.data['parsed'], 2)
+        mi = models.MonitoringImport.objects.get(id=resp.data['import_id'])
+        self.assertEqual(sorted(mi.entries.values_list('spots_aired', flat=True)), [2, 3])
@@ -0,0 +1,99 @@
+import datetime
+import unittest
+
+from dateutil import parser as dateparser
+from django.test import SimpleTestCase
+
+from .. import normalize
+from ..matching import first_value
+from ..normalize import AIRTIME_COLUMNS, DURATION_COLUMNS, SPOTS_COLUMNS, BatchNormalizer, detect_airtime_format
+
+
+# per-row parsers the import pipeline used before BatchNormalizer
+def parse_spots(raw):
+    """Return the first column of ``SPOTS_COLUMNS`` that parses as a number, else 0."""
+    for col in SPOTS_COLUMNS:
+        s = raw.get(col)
+        if s is None or s == '':
+            continue
+        try:
+            return int(float(str(s).strip()))
+        except Exception:
+            continue
+    return 0
+
+
+def parse_airtime(raw):
+    value = first_value(raw, AIRTIME_COLUMNS)
+    if not value:
+        return None
+    try:
+        return dateparser.parse(str(value))
+    except Exception:
+        return None
+
+
+def parse_duration(raw):
+    value = first_value(raw, DURATION_COLUMNS)
+    if value in (None, ''):
+        return None
+    try:
+        return int(float(str(value).strip()))
+    except Exception:
+        return None
+
+
+ROWS = [
+    {'airtime': '2025-09-01T10:00:00', 'spots_aired': '2', 'spots': '', 'duration': '30'},
+    {'airtime': '2025-09-01 10:15:30', 'spots_aired': '1.0', 'spots': '', 'duration': ' 15 '},
+    {'airtime': '2025-09-01T10:00:00+02:00', 'spots_aired': 'n/a', 'spots': '4', 'duration': 'abc'},
+    {'airtime': 'Sep 1 2025 10am', 'spots_aired': '', 'spots': 'x', 'duration': ''},
+    {'airtime': 'not a date', 'spots_aired': 'inf', 'spots': 'nan', 'duration': '1e2'},
+    {'airtime': '', 'time': '', 'spots_aired': None, 'spots': 3, 'duration': 45},
+]
+
+
+class BatchNormalizerTests(SimpleTestCase):
+    def expected(self, rows):
+        return [(parse_airtime(r), parse_spots(r), parse_duration(r)) for r in rows]
+
+    def check(self, rows, use_pandas):
+        headers = set().union(*(r.keys() for r in rows))
+        normalizer = BatchNormalizer(headers, sample_rows=rows[:1], use_pandas=use_pandas)
+        self.assertEqual(normalizer.airtime_format, 'ISO')
+        self.assertEqual(normalizer.normalize(rows), self.expected(rows))
+
+    def test_matches_per_row_parsers(self):
+        self.check(ROWS, use_pandas=False)
+
+    @unittest.skipIf(normalize.pd is None, 'pandas not installed')
+    def test_pandas_path_matches_per_row_parsers(self):
+        self.check(ROWS, use_pandas=True)
+
+    def test_spots_fall_through_aliases(self):
+        normalizer = BatchNormalizer(['spots_aired', 'spots'])
+        rows = [{'spots_aired': 'x', 'spots': '4.0'}, {'spots_aired': ''}]
+        self.assertEqual([spots for _, spots, _ in normalizer.normalize(rows)], [4, 0])
+
+    def test_aliases_resolved_from_headers(self):
+        normalizer = BatchNormalizer(['time', 'count', 'length', 'station'])
+        self.assertEqual(normalizer.airtime_columns, ['time'])
+        self.assertEqual(normalizer.spots_columns, ['count'])
+        self.assertEqual(normalizer.duration_columns, ['length'])
+        rows = [{'time': '09/01/2025 10:00', 'count': '2', 'length': '30'}]
+        self.assertEqual(normalizer.normalize(rows), [(datetime.datetime(2025, 9, 1, 10, 0), 2, 30)])
+
+
+class DetectAirtimeFormatTests(SimpleTestCase):
+    def test_detects_strptime_formats(self):
+        self.assertEqual(detect_airtime_format(['09/01/2025 10:00', '12/31/2025 23:59']), '%m/%d/%Y %H:%M')
+        self.assertEqual(detect_airtime_format(['13.09.2025 10:00:00', '']), '%d.%m.%Y %H:%M:%S')
+
+    def test_ambiguous_dates_follow_dateutil(self):
+        # dateutil reads 01/02 month-first, so must the detected format
+        self.assertEqual(detect_airtime_format(['01/02/2025 10:00:00']), '%m/%d/%Y %H:%M:%S')
+
+    def test_no_format_when_sample_does_not_parse(self):
+        self.assertIsNone(detect_airtime_format(['Sep 1 2025 10am']))
+        self.assertIsNone(detect_airtime_format(['garbage']))
+        self.assertIsNone(detect_airtime_format([]))
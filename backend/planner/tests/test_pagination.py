@@ -0,0 +1,131 @@
+import datetime
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from tenants.models import Tenant
+from .. import models
+
+
+User = get_user_model()
+
+
+class MonitoringImportEntriesTests(TestCase):
+    def setUp(self):
+        self.tenant = Tenant.objects.create(name='EntriesTenant')
+        self.user = User.objects.create_user(username='entries', password='pass', tenant=self.tenant)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.imports = []
+        for n in (7, 3):
+            imp = models.MonitoringImport.objects.create(tenant=self.tenant, file='log.csv', status='processed')
+            models.MonitoringEntry.objects.bulk_create([
+                models.MonitoringEntry(
+                    monitoring_import=imp, tenant=self.tenant, spots_aired=1, raw_row={'row': i},
+                    airtime=datetime.datetime(2025, 9, 1, 10, i, tzinfo=datetime.timezone.utc),
+                    match_status=('matched', 'unmatched', 'ambiguous')[i % 3])
+                for i in range(n)])
+            self.imports.append(imp)
+
+    def test_list_carries_counts_not_entries(self):
+        with self.assertNumQueries(2):
+            resp = self.client.get('/api/monitoring-imports/')
+        self.assertEqual(resp.status_code, 200)
+        rows = {row['id']: row for row in resp.json()['results']}
+        first = rows[str(self.imports[0].id)]
+        self.assertNotIn('entries', first)
+        self.assertEqual(first['entry_counts'], {'total': 7, 'matched': 3, 'ambiguous': 2, 'unmatched': 2})
+        self.assertEqual(rows[str(self.imports[1].id)]['entry_counts']['total'], 3)
+        detail = self.client.get(f'/api/monitoring-imports/{self.imports[1].id}/').json()
+        self.assertEqual(detail['entry_counts'], {'total': 3, 'matched': 1, 'ambiguous': 1, 'unmatched': 1})
+
+    def test_entries_pages_follow_cursor(self):
+        url = f'/api/monitoring-imports/{self.imports[0].id}/entries/?limit=3'
+        seen = []
+        while url:
+            resp = self.client.get(url)
+            self.assertEqual(resp.status_code, 200)
+            data = resp.json()
+            self.assertLessEqual(len(data['results']), 3)
+            seen.extend(row['id'] for row in data['results'])
+            url = data['next']
+        expected = sorted(str(pk) for pk in self.imports[0].entries.values_list('id', flat=True))
+        self.assertEqual(seen, expected)
+
+    def test_entries_filter_and_fields(self):
+        url = f'/api/monitoring-imports/{self.imports[0].id}/entries/'
+        resp = self.client.get(url, {'match_status': 'matched', 'fields': 'id,airtime,match_status'})
+        self.assertEqual(resp.status_code, 200)
+        results = resp.json()['results']
+        self.assertEqual(len(results), 3)
+        self.assertEqual(set(results[0]), {'id', 'airtime', 'match_status'})
+        self.assertEqual({row['match_status'] for row in results}, {'matched'})
+        self.assertEqual(self.client.get(url, {'fields': 'id,nope'}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'match_status': 'lost'}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'cursor': 'garbage'}).status_code, 404)
+
+    def test_entries_hide_internal_columns(self):
+        row = self.client.get(f'/api/monitoring-imports/{self.imports[0].id}/entries/').json()['results'][0]
+        for name in ('campaign_ref', 'campaign_key', 'show_key', 'station_key', 'air_date', 'fingerprint'):
+            self.assertNotIn(name, row)
+        self.assertIn('raw_row', row)
+
+    def test_entries_scoped_to_tenant(self):
+        other = User.objects.create_user(username='other', password='pass',
+                                         tenant=Tenant.objects.create(name='Other'))
+        self.client.force_authenticate(user=other)
+        resp = self.client.get(f'/api/monitoring-imports/{self.imports[0].id}/entries/')
+        self.assertEqual(resp.status_code, 404)
+
+
+class KeysetListPaginationTests(TestCase):
+    def setUp(self):
+        self.tenant = Tenant.objects.create(name='KeysetTenant')
+        self.user = User.objects.create_user(username='keyset', password='pass', tenant=self.tenant)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        campaign = models.Campaign.objects.create(tenant=self.tenant, name='Keyset')
+        models.MediaPlan.objects.bulk_create(
+            [models.MediaPlan(campaign=campaign, name=f'Line {i}', spots=1) for i in range(11)])
+        # ties on created_at are broken by id
+        base = datetime.datetime(2025, 9, 1, tzinfo=datetime.timezone.utc)
+        for i, pk in enumerate(models.MediaPlan.objects.values_list('pk', flat=True)):
+            models.MediaPlan.objects.filter(pk=pk).update(created_at=base + datetime.timedelta(minutes=i // 3))
+
+    def walk(self, url):
+        seen = []
+        while url:
+            data = self.client.get(url).json()
+            seen.extend(row['id'] for row in data['results'])
+            url = data['next']
+        return seen
+
+    def test_pages_in_created_at_id_order(self):
+        expected = [str(pk) for pk in
+                    models.MediaPlan.objects.order_by('created_at', 'id').values_list('id', flat=True)]
+        self.assertEqual(self.walk('/api/media-plans/?limit=4'), expected)
+        self.assertEqual(self.walk('/api/media-plans/?limit=4&ordering=-created_at'), expected[::-1])
+
+    def test_count_is_optional(self):
+        data = self.client.get('/api/media-plans/?limit=4').json()
+        self.assertEqual(data['count'], 11)
+        with self.assertNumQueries(1):
+            data = self.client.get('/api/media-plans/?limit=4&count=false').json()
+        self.assertNotIn('count', data)
+        self.assertEqual(len(data['results']), 4)
+
+    def test_offset_and_other_orderings_fall_back(self):
+        data = self.client.get('/api/media-plans/?limit=4&offset=8').json()
+        self.assertEqual((data['count'], len(data['results'])), (11, 3))
+        self.assertIn('previous', data)
+        data = self.client.get('/api/media-plans/?ordering=-spots&limit=20').json()
+        self.assertEqual(len(data['results']), 11)
+        self.assertIn('previous', data)
+
+    def test_other_list_endpoints_use_cursor(self):
+        models.MonitoringImport.objects.create(tenant=self.tenant, file='log.csv')
+        for url in ('/api/monitoring-imports/', '/api/reports/'):
+            data = self.client.get(url).json()
+            self.assertIn('next', data)
+            self.assertNotIn('previous', data)
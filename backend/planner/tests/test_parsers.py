@@ -0,0 +1,164 @@
+import io
+
+from django.test import SimpleTestCase
+
+from .. import parsers
+
+
+class CSVRowReaderTests(SimpleTestCase):
+    def _read(self, content, **kwargs):
+        return list(parsers.CSVRowReader(io.BytesIO(content), **kwargs))
+
+    def test_rows_are_normalized(self):
+        rows = self._read(b' AirTime ,Spots_Aired\n2025-09-01T10:00:00,2\n')
+        self.assertEqual(rows, [{'airtime': '2025-09-01T10:00:00', 'spots_aired': '2'}])
+
+    def test_lines_split_across_read_chunks(self):
+        body = ''.join(f'row{i},{i}\n' for i in range(5000))
+        content = ('name,spots\n' + body).encode('utf-8')
+        old = parsers.READ_CHUNK_SIZE
+        parsers.READ_CHUNK_SIZE = 7
+        try:
+            rows = self._read(content)
+        finally:
+            parsers.READ_CHUNK_SIZE = old
+        self.assertEqual(len(rows), 5000)
+        self.assertEqual(rows[-1], {'name': 'row4999', 'spots': '4999'})
+
+    def test_multibyte_characters_and_bom(self):
+        content = '﻿show,station\nCafé Matinée,Радио 1\n'.encode('utf-8')
+        old = parsers.READ_CHUNK_SIZE
+        parsers.READ_CHUNK_SIZE = 3
+        try:
+            rows = self._read(content)
+        finally:
+            parsers.READ_CHUNK_SIZE = old
+        self.assertEqual(rows, [{'show': 'Café Matinée', 'station': 'Радио 1'}])
+
+    def test_cr_and_crlf_line_breaks(self):
+        for newline in (b'\r', b'\r\n'):
+            content = newline.join([b'name,spots'] + [b'row%d,%d' % (i, i) for i in range(50)]) + newline
+            # every chunk size puts some '\r' at the end of a chunk
+            for size in (1, 2, 3, 7, 64):
+                old = parsers.READ_CHUNK_SIZE
+                parsers.READ_CHUNK_SIZE = size
+                try:
+                    rows = self._read(content)
+                finally:
+                    parsers.READ_CHUNK_SIZE = old
+                self.assertEqual(len(rows), 50, (newline, size))
+                self.assertEqual(rows[-1], {'name': 'row49', 'spots': '49'})
+
+    def test_offset_resumes_after_crlf_split_across_chunks(self):
+        content = b'name,spots\r\nfirst,1\r\nsecond,2\r\n'
+        old = parsers.READ_CHUNK_SIZE
+        parsers.READ_CHUNK_SIZE = 11
+        try:
+            reader = parsers.CSVRowReader(io.BytesIO(content))
+            next(iter(reader))
+            offset = reader.offset
+            rows = self._read(content, start=offset)
+        finally:
+            parsers.READ_CHUNK_SIZE = old
+        self.assertEqual(offset, content.index(b'second'))
+        self.assertEqual(rows, [{'name': 'second', 'spots': '2'}])
+
+    def test_long_line_spanning_many_chunks(self):
+        notes = 'x' * 100000
+        content = f'name,notes\nfirst,{notes}\nsecond,y'.encode('utf-8')
+        old = parsers.READ_CHUNK_SIZE
+        parsers.READ_CHUNK_SIZE = 10
+        try:
+            rows = self._read(content)
+        finally:
+            parsers.READ_CHUNK_SIZE = old
+        self.assertEqual(rows, [{'name': 'first', 'notes': notes}, {'name': 'second', 'notes': 'y'}])
+
+    def test_quoted_field_spanning_lines(self):
+        rows = self._read(b'show,notes\n"Morning","line one\nline two"\nEvening,x\n')
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[0]['notes'], 'line one\nline two')
+
+    def test_invalid_bytes_are_replaced(self):
+        rows = self._read(b'show\nbad \xff byte\n')
+        self.assertEqual(rows, [{'show': 'bad � byte'}])
+
+
+class XLSXRowReaderTests(SimpleTestCase):
+    def setUp(self):
+        try:
+            import openpyxl
+        except ImportError:
+            self.skipTest('openpyxl not installed')
+        self.openpyxl = openpyxl
+
+    def test_rows_match_csv_interface(self):
+        import datetime
+        wb = self.openpyxl.Workbook()
+        ws = wb.active
+        ws.append(['Airtime', 'Spots', None])
+        ws.append([datetime.datetime(2025, 9, 1, 10, 0), 3, 'extra'])
+        buf = io.BytesIO()
+        wb.save(buf)
+        buf.seek(0)
+        reader = parsers.get_row_reader(buf, 'log.XLSX')
+        rows = list(reader)
+        self.assertEqual(reader.headers, ['airtime', 'spots', ''])
+        self.assertEqual(rows, [{'airtime': '2025-09-01T10:00:00', 'spots': 3, '': 'extra'}])
+
+
+class GetRowReaderTests(SimpleTestCase):
+    def test_unsupported_extension(self):
+        with self.assertRaises(parsers.UnsupportedFileType):
+            parsers.get_row_reader(io.BytesIO(b''), 'log.txt')
+
+
+class PlanRangesTests(SimpleTestCase):
+    def test_csv_ranges_cover_every_row_once(self):
+        content = ('airtime,spots\n' + ''.join(f'2025-09-01T10:{i % 60:02d}:00,{i}\n' for i in range(997))).encode('utf-8')
+        f = io.BytesIO(content)
+        ranges = parsers.plan_ranges(f, 'log.csv', 6)
+        self.assertEqual(len(ranges), 6)
+        self.assertEqual(ranges[-1][1], len(content))
+        spots = []
+        for start, end in ranges:
+            f.seek(0)
+            spots += [int(r['spots']) for r in parsers.get_row_reader(f, 'log.csv', start=start, end=end)]
+        self.assertEqual(spots, list(range(997)))
+
+    def test_csv_more_parts_than_rows(self):
+        ranges = parsers.plan_csv_ranges(io.BytesIO(b'a\n1\n2\n'), 10)
+        rows = [r for s, e in ranges for r in parsers.CSVRowReader(io.BytesIO(b'a\n1\n2\n'), start=s, end=e)]
+        self.assertEqual(rows, [{'a': '1'}, {'a': '2'}])
+
+    def test_csv_ranges_with_cr_line_breaks(self):
+        for newline in (b'\r', b'\r\n'):
+            content = newline.join([b'airtime,spots'] + [b'2025-09-01T10:00:00,%d' % i for i in range(101)]) + newline
+            f = io.BytesIO(content)
+            ranges = parsers.plan_csv_ranges(f, 4)
+            self.assertEqual(len(ranges), 4)
+            spots = []
+            for start, end in ranges:
+                f.seek(0)
+                spots += [int(r['spots']) for r in parsers.CSVRowReader(f, start=start, end=end)]
+            self.assertEqual(spots, list(range(101)))
+
+    def test_xlsx_ranges_cover_every_row_once(self):
+        try:
+            import openpyxl
+        except ImportError:
+            self.skipTest('openpyxl not installed')
+        wb = openpyxl.Workbook()
+        ws = wb.active
+        ws.append(['spots'])
+        for i in range(23):
+            ws.append([i])
+        buf = io.BytesIO()
+        wb.save(buf)
+        ranges = parsers.plan_ranges(buf, 'log.xlsx', 4)
+        self.assertEqual(ranges, [(0, 5), (5, 11), (11, 17), (17, 23)])
+        spots = []
+        for start, end in ranges:
+            buf.seek(0)
+            spots += [r['spots'] for r in parsers.get_row_reader(buf, 'log.xlsx', start=start, end=end)]
+        self.assertEqual(spots, list(range(23)))
@@ -0,0 +1,269 @@
+import datetime
+import io
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from .. import models, tasks, views
+from ..pipeline import ImportPipeline, process_import
+from ..tasks import process_monitoring_import
+from tenants.models import Tenant
+from stations.models import Daypart, Station, Show
+
+
+User = get_user_model()
+
+CSV = (
+    'airtime,station,show,campaign_name,spots_aired,duration\n'
+    '2025-09-01T10:00:00,Radio One,Morning,Summer,2,30\n'
+    '2025-09-01T11:00:00,Radio One,Evening,Summer,1.0,30\n'
+    '2025-09-02T10:00:00,Radio One,Morning,Unknown,n/a,abc\n'
+)
+
+
+class ImportPipelineTests(TestCase):
+    def setUp(self):
+        self.tenant = Tenant.objects.create(name='PipeTenant')
+        self.user = User.objects.create_user(username='pipe', password='pass', tenant=self.tenant)
+        station = Station.objects.create(tenant=self.tenant, name='Radio One', type='Radio')
+        show = Show.objects.create(station=station, name='Morning')
+        campaign = models.Campaign.objects.create(tenant=self.tenant, name='Summer')
+        self.plan = models.MediaPlan.objects.create(
+            campaign=campaign, name='p', date=datetime.date(2025, 9, 1), spots=3, station=station, show=show)
+
+    def make_import(self, content, name):
+        return models.MonitoringImport.objects.create(
+            tenant=self.tenant, file=ContentFile(content, name=name), original_filename=name)
+
+    @override_settings(MONITORING_IMPORT_DEDUPLICATE=False)
+    def test_task_matches_inline_upload(self):
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+        f = io.BytesIO(CSV.encode('utf-8'))
+        f.name = 'log.csv'
+        resp = client.post('/api/monitoring-imports/upload/', {'file': f}, format='multipart')
+        self.assertEqual(resp.status_code, 201)
+        self.assertEqual((resp.data['parsed'], resp.data['matched']), (3, 1))
+
+        imp = self.make_import(CSV.encode('utf-8'), 'log.csv')
+        result = process_monitoring_import(str(imp.id))
+        self.assertEqual(result, {'status': 'ok', 'parsed': 3, 'matched': 1, 'duplicates': 0})
+        imp.refresh_from_db()
+        self.assertEqual(imp.status, 'processed')
+        self.assertEqual(imp.summary, 'Parsed 3 entries, matched 1')
+
+        def rows(import_id):
+            return list(models.MonitoringEntry.objects.filter(monitoring_import_id=import_id)
+                        .order_by('airtime', 'spots_aired')
+                        .values_list('airtime', 'spots_aired', 'duration_seconds', 'media_plan_id', 'match_status'))
+        self.assertEqual(rows(resp.data['import_id']), rows(imp.id))
+        self.assertEqual(rows(imp.id)[0][3], self.plan.id)
+
+    @override_settings(MONITORING_IMPORT_DEDUPLICATE=False)
+    def test_deferred_matching_equals_inline(self):
+        def run():
+            imp = self.make_import(CSV.encode('utf-8'), 'log.csv')
+            result = process_import(imp)
+            rows = list(imp.entries.order_by('airtime', 'spots_aired')
+                        .values_list('campaign_id', 'media_plan_id', 'match_status'))
+            return result, rows
+        with override_settings(MONITORING_IMPORT_MATCHING='inline'):
+            inline = run()
+        with override_settings(MONITORING_IMPORT_MATCHING='deferred'):
+            deferred = run()
+        self.assertEqual(inline, deferred)
+        self.assertEqual(deferred[0]['matched'], 1)
+
+    @override_settings(MONITORING_IMPORT_MATCHING='inline')
+    def test_inline_matching_loads_plans_of_the_import_window(self):
+        for month in range(1, 8):
+            models.MediaPlan.objects.create(campaign=self.plan.campaign, name='old', date=datetime.date(2025, month, 1),
+                                            spots=1)
+        pipeline = ImportPipeline(self.make_import(CSV.encode('utf-8'), 'log.csv'))
+        self.assertEqual(pipeline.run()['matched'], 1)
+        self.assertEqual({key[1] for key in pipeline.matcher._plans}, {datetime.date(2025, 9, 1)})
+
+    def test_entries_get_daypart_from_airtime(self):
+        morning = Daypart.objects.create(name='Morning', start_time=datetime.time(6), end_time=datetime.time(10, 30))
+        own = Daypart.objects.create(tenant=self.tenant, name='Late morning', start_time=datetime.time(10, 30),
+                                     end_time=datetime.time(12))
+        Daypart.objects.create(tenant=Tenant.objects.create(name='Other'), name='Elsewhere',
+                               start_time=datetime.time(0), end_time=datetime.time(0))
+        imp = self.make_import(CSV.encode('utf-8'), 'log.csv')
+        process_import(imp)
+        self.assertEqual(list(imp.entries.order_by('airtime').values_list('daypart_id', flat=True)),
+                         [morning.id, own.id, morning.id])
+
+    def test_task_handles_xlsx(self):
+        try:
+            import openpyxl
+        except ImportError:
+            self.skipTest('openpyxl not installed')
+        wb = openpyxl.Workbook()
+        ws = wb.active
+        ws.append(['Airtime', 'Station', 'Show', 'Campaign', 'Spots'])
+        ws.append([datetime.datetime(2025, 9, 1, 10, 0), 'Radio One', 'Morning', 'Summer', 2])
+        buf = io.BytesIO()
+        wb.save(buf)
+        imp = self.make_import(buf.getvalue(), 'log.xlsx')
+        result = process_monitoring_import(str(imp.id))
+        self.assertEqual(result, {'status': 'ok', 'parsed': 1, 'matched': 1, 'duplicates': 0})
+        entry = imp.entries.get()
+        self.assertEqual(entry.spots_aired, 2)
+        self.assertEqual(entry.raw_row['airtime'], '2025-09-01T10:00:00')
+
+    def test_entries_inserted_in_batches(self):
+        imp = self.make_import(CSV.encode('utf-8'), 'log.csv')
+        with mock.patch.object(models.MonitoringEntry.objects, 'bulk_create',
+                               wraps=models.MonitoringEntry.objects.bulk_create) as bulk:
+            process_import(imp, batch_size=2, chunk_size=2)
+        self.assertEqual([len(c.args[0]) for c in bulk.call_args_list], [2, 1])
+        self.assertEqual(bulk.call_args.kwargs['batch_size'], 2)
+
+    def test_unsupported_file_marks_failed(self):
+        imp = self.make_import(b'x', 'log.txt')
+        self.assertEqual(process_monitoring_import(str(imp.id)), {'status': 'failed'})
+        imp.refresh_from_db()
+        self.assertEqual(imp.status, 'failed')
+
+    def test_large_upload_is_enqueued(self):
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+        f = io.BytesIO(CSV.encode('utf-8'))
+        f.name = 'log.csv'
+        with mock.patch.object(views, 'INLINE_THRESHOLD', 10), \
+                mock.patch.object(process_monitoring_import, 'delay') as delay:
+            resp = client.post('/api/monitoring-imports/upload/', {'file': f}, format='multipart')
+        self.assertEqual(resp.status_code, 202)
+        delay.assert_called_once_with(str(resp.data['import_id']))
+
+
+class ResumableImportTests(TestCase):
+    def setUp(self):
+        self.tenant = Tenant.objects.create(name='ResumeTenant')
+        self.campaign = models.Campaign.objects.create(tenant=self.tenant, name='Summer')
+        models.MediaPlan.objects.create(campaign=self.campaign, name='p', date=datetime.date(2025, 9, 1), spots=1)
+
+    def make_import(self, content, name):
+        return models.MonitoringImport.objects.create(
+            tenant=self.tenant, file=ContentFile(content, name=name), original_filename=name)
+
+    def csv_content(self, rows):
+        lines = ['airtime,campaign,spots']
+        lines += [f'2025-09-0{1 + i % 2}T10:00:00,Summer,{i}' for i in range(rows)]
+        return ('\n'.join(lines) + '\n').encode('utf-8')
+
+    def test_checkpoint_and_progress_recorded_per_chunk(self):
+        imp = self.make_import(self.csv_content(7), 'log.csv')
+        result = process_import(imp, chunk_size=3)
+        self.assertEqual(result, {'parsed': 7, 'matched': 4, 'duplicates': 0})
+        imp.refresh_from_db()
+        self.assertEqual(imp.meta['checkpoint']['parsed'], 7)
+        self.assertEqual(imp.meta['checkpoint']['offset'], imp.file.size)
+        self.assertEqual(imp.meta['progress']['rows_matched'], 4)
+        self.assertIn('rows_per_second', imp.meta['progress'])
+
+    def _crash_and_resume(self, imp):
+        original = ImportPipeline.commit_chunk
+        calls = []
+
+        def crash_on_second_chunk(pipeline, entries):
+            calls.append(len(entries))
+            if len(calls) == 2:
+                raise RuntimeError('worker died')
+            return original(pipeline, entries)
+
+        with mock.patch.object(ImportPipeline, 'commit_chunk', crash_on_second_chunk):
+            with self.assertRaises(RuntimeError):
+                process_import(imp, chunk_size=4)
+        self.assertEqual(imp.entries.count(), 4)
+
+        imp = models.MonitoringImport.objects.get(pk=imp.pk)
+        result = process_import(imp, chunk_size=4)
+        self.assertEqual(result['parsed'], 10)
+        self.assertEqual(sorted(imp.entries.values_list('spots_aired', flat=True)), list(range(10)))
+
+    @override_settings(MONITORING_IMPORT_CHUNK_SIZE=4)
+    def test_failed_inline_upload_keeps_no_entries(self):
+        client = APIClient()
+        client.force_authenticate(user=User.objects.create_user(username='inline', password='pass', tenant=self.tenant))
+        f = io.BytesIO(self.csv_content(10))
+        f.name = 'log.csv'
+        original = ImportPipeline.commit_chunk
+
+        def crash_on_second_chunk(pipeline, entries):
+            if pipeline.parsed > 4:
+                raise ValueError('bad row')
+            return original(pipeline, entries)
+
+        with mock.patch.object(ImportPipeline, 'commit_chunk', crash_on_second_chunk):
+            resp = client.post('/api/monitoring-imports/upload/', {'file': f}, format='multipart')
+        self.assertEqual(resp.status_code, 500)
+        imp = models.MonitoringImport.objects.get()
+        self.assertEqual((imp.status, imp.summary), ('failed', 'bad row'))
+        self.assertFalse(imp.entries.exists())
+        self.assertNotIn('checkpoint', imp.meta)
+
+    def test_csv_resumes_from_checkpoint(self):
+        self._crash_and_resume(self.make_import(self.csv_content(10), 'log.csv'))
+
+    def test_xlsx_resumes_from_checkpoint(self):
+        try:
+            import openpyxl
+        except ImportError:
+            self.skipTest('openpyxl not installed')
+        wb = openpyxl.Workbook()
+        ws = wb.active
+        ws.append(['airtime', 'campaign', 'spots'])
+        for i in range(10):
+            ws.append(['2025-09-01T10:00:00', 'Summer', i])
+        buf = io.BytesIO()
+        wb.save(buf)
+        self._crash_and_resume(self.make_import(buf.getvalue(), 'log.xlsx'))
+
+    def test_detail_endpoint_exposes_progress(self):
+        user = User.objects.create_user(username='resume', password='pass', tenant=self.tenant)
+        imp = self.make_import(self.csv_content(3), 'log.csv')
+        process_import(imp)
+        client = APIClient()
+        client.force_authenticate(user=user)
+        resp = client.get(f'/api/monitoring-imports/{imp.id}/')
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.data['progress']['rows_parsed'], 3)
+
+
+class FanOutImportTests(TestCase):
+    def setUp(self):
+        self.tenant = Tenant.objects.create(name='FanTenant')
+        campaign = models.Campaign.objects.create(tenant=self.tenant, name='Summer')
+        models.MediaPlan.objects.create(campaign=campaign, name='p', date=datetime.date(2025, 9, 1), spots=1)
+        lines = ['airtime,campaign,spots'] + [f'2025-09-0{1 + i % 2}T10:00:00,Summer,{i}' for i in range(50)]
+        content = ('\n'.join(lines) + '\n').encode('utf-8')
+        self.imp = models.MonitoringImport.objects.create(
+            tenant=self.tenant, file=ContentFile(content, name='big.csv'), original_filename='big.csv')
+
+    def test_parallel_ranges_finalize_with_full_counts(self):
+        def eager_chord(header):
+            def run(callback):
+                results = [sig.type(*sig.args) for sig in header]
+                return callback.type(results, *callback.args)
+            return run
+
+        with self.settings(MONITORING_IMPORT_FANOUT_THRESHOLD=10, MONITORING_IMPORT_FANOUT_PARTS=4), \
+                mock.patch.object(tasks, 'chord', eager_chord):
+            result = tasks.process_monitoring_import(str(self.imp.id))
+        self.assertEqual(result, {'status': 'fanned_out', 'ranges': 4})
+        self.imp.refresh_from_db()
+        self.assertEqual(self.imp.status, 'processed')
+        self.assertEqual(self.imp.summary, 'Parsed 50 entries, matched 25')
+        self.assertEqual(self.imp.meta['progress']['rows_parsed'], 50)
+        self.assertEqual(len(self.imp.meta['ranges']), 4)
+        self.assertEqual(sorted(self.imp.entries.values_list('spots_aired', flat=True)), list(range(50)))
+
+    def test_small_files_stay_on_one_task(self):
+        with self.settings(MONITORING_IMPORT_FANOUT_THRESHOLD=10 ** 9):
+            result = tasks.process_monitoring_import(str(self.imp.id))
+        self.assertEqual(result, {'status': 'ok', 'parsed': 50, 'matched': 25, 'duplicates': 0})
@@ -0,0 +1,151 @@
+import datetime
+from unittest import mock
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+
+from .. import models, tasks, views
+from ..matching import EntryMatcher, entry_keys
+from ..reconcile import reconcile_entries, reconcile_import, reconcile_scope, scoped_entries
+from .test_matching import MatchingFixture
+from stations.models import Show, Station
+
+
+User = get_user_model()
+
+
+class ReconcileTests(MatchingFixture, TestCase):
+    def make_entries(self, rows):
+        imp = models.MonitoringImport.objects.create(tenant=self.tenant, file='log.csv')
+        models.MonitoringEntry.objects.bulk_create([
+            models.MonitoringEntry(monitoring_import=imp, tenant=self.tenant, airtime=airtime,
+                                   raw_row=raw, **entry_keys(raw, airtime))
+            for raw, airtime in rows])
+        return imp
+
+    def test_matches_entry_matcher(self):
+        rows = self.rows()
+        imp = self.make_entries(rows)
+        counts = reconcile_import(imp)
+
+        matcher = EntryMatcher(self.tenant.id)
+        expected = {'matched': 0, 'ambiguous': 0, 'unmatched': 0}
+        by_raw = {}
+        for entry in imp.entries.all():
+            by_raw.setdefault(repr((entry.raw_row, entry.air_date)), []).append(entry)
+        for raw, airtime in rows:
+            campaign, plan, status = matcher.match(raw, airtime)
+            expected[status] += 1
+            entry = by_raw[repr((raw, airtime.date() if airtime else None))].pop()
+            self.assertEqual(entry.campaign_id, getattr(campaign, 'pk', None), raw)
+            self.assertEqual(entry.media_plan_id, getattr(plan, 'pk', None), raw)
+            self.assertEqual(entry.match_status, status, raw)
+        self.assertEqual(counts, expected)
+
+    def test_non_ascii_names_match_in_sql_and_in_memory(self):
+        # SQL LOWER() leaves É alone on SQLite, and TRIM() keeps tabs
+        station = Station.objects.create(tenant=self.tenant, name='Radio Ça', type='Radio')
+        show = Show.objects.create(station=station, name='Matinée')
+        campaign = models.Campaign.objects.create(tenant=self.tenant, name='Été Promo')
+        plan = models.MediaPlan.objects.create(campaign=campaign, name='p', date=datetime.date(2025, 9, 1),
+                                               spots=1, station=station, show=show)
+        raw = {'campaign': '\tÉTÉ PROMO ', 'show': 'MATINÉE', 'station': 'RADIO ÇA'}
+        airtime = datetime.datetime(2025, 9, 1, 10, 0)
+        self.assertEqual(EntryMatcher(self.tenant.id).match(raw, airtime), (campaign, plan, 'matched'))
+        imp = self.make_entries([(raw, airtime)])
+        self.assertEqual(reconcile_import(imp)['matched'], 1)
+        self.assertEqual(imp.entries.get().media_plan_id, plan.pk)
+
+        # a rename keeps the stored key in step
+        show.name = 'Soirée'
+        show.save(update_fields=['name'])
+        self.assertEqual(Show.objects.get(pk=show.pk).name_key, 'soirée')
+        self.assertEqual(reconcile_import(imp)['ambiguous'], 1)
+
+    def test_statement_count_independent_of_size(self):
+        def queries(rows):
+            entries = models.MonitoringEntry.objects.filter(monitoring_import=self.make_entries(rows))
+            with CaptureQueriesContext(connection) as ctx:
+                reconcile_entries(entries)
+            return len(ctx.captured_queries)
+        self.assertEqual(queries(self.rows()), queries(self.rows() * 40))
+
+    def test_rerun_picks_up_new_plans(self):
+        raw = {'campaign': 'Winter', 'show': 'Morning Drive'}
+        imp = self.make_entries([(raw, datetime.datetime(2025, 9, 3, 8, 0))])
+        imp.status = 'processed'
+        imp.save()
+        self.assertEqual(reconcile_import(imp)['ambiguous'], 1)
+
+        plan = models.MediaPlan.objects.create(
+            campaign=self.c2, name='late', date=datetime.date(2025, 9, 3), spots=1, show=self.show)
+        user = User.objects.create_user(username='recon', password='pass', tenant=self.tenant)
+        client = APIClient()
+        client.force_authenticate(user=user)
+        resp = client.post(f'/api/monitoring-imports/{imp.id}/reconcile/')
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.data['matched'], 1)
+        self.assertEqual(imp.entries.get().media_plan_id, plan.id)
+        imp.refresh_from_db()
+        self.assertEqual(imp.summary, 'Parsed 1 entries, matched 1')
+
+
+class ScopedReconcileTests(MatchingFixture, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.imp = models.MonitoringImport.objects.create(tenant=self.tenant, file='log.csv')
+        models.MonitoringEntry.objects.bulk_create([
+            models.MonitoringEntry(monitoring_import=self.imp, tenant=self.tenant, airtime=airtime,
+                                   raw_row=raw, **entry_keys(raw, airtime))
+            for raw, airtime in self.rows()])
+        reconcile_import(self.imp)
+        self.user = User.objects.create_user(username='scope', password='pass', tenant=self.tenant)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def test_scope_limits_touched_entries(self):
+        day2 = datetime.date(2025, 9, 2)
+        scoped = scoped_entries(self.tenant.id, self.c1.id, day2, day2)
+        self.assertEqual([e.raw_row for e in scoped], [{'campaign': 'Summer Sale'}])
+        # without a campaign every open entry of the window qualifies
+        self.assertEqual(scoped_entries(self.tenant.id, date_from=day2, date_to=day2).count(), 1)
+        # matched entries only come in through plans dated inside the window
+        day1 = datetime.date(2025, 9, 1)
+        self.assertEqual(scoped_entries(self.tenant.id, date_from=day2).filter(match_status='matched').count(), 0)
+        self.assertEqual(scoped_entries(self.tenant.id, date_to=day1).filter(match_status='matched').count(), 6)
+
+    def test_added_plan_matches_open_entry(self):
+        day2 = datetime.date(2025, 9, 2)
+        plan = models.MediaPlan.objects.create(campaign=self.c1, name='fix', date=day2, spots=1)
+        resp = self.client.post('/api/monitoring-imports/reconcile/', {
+            'campaign': str(self.c1.id), 'date_from': '2025-09-02', 'date_to': '2025-09-02'})
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual((resp.data['entries'], resp.data['matched']), (1, 1))
+        self.assertTrue(self.imp.entries.filter(media_plan=plan, air_date=day2).exists())
+
+    def test_moved_plan_releases_old_entries(self):
+        plan = models.MediaPlan.objects.get(campaign=self.c2)
+        self.assertTrue(self.imp.entries.filter(media_plan=plan).exists())
+        plan.date = datetime.date(2025, 9, 5)
+        plan.save()
+        counts = reconcile_scope(self.tenant.id, self.c2.id, plan.date, plan.date)
+        self.assertEqual(counts['matched'], 0)
+        self.assertFalse(self.imp.entries.filter(media_plan=plan).exists())
+        self.assertEqual(self.imp.entries.filter(campaign=self.c2, match_status='ambiguous').count(), 1)
+
+    def test_large_scope_is_enqueued(self):
+        with mock.patch.object(views, 'RECONCILE_INLINE_LIMIT', 0), \
+                mock.patch('planner.tasks.reconcile_monitoring_entries.delay') as delay:
+            resp = self.client.post('/api/monitoring-imports/reconcile/', {'date_from': '2025-09-01'})
+        self.assertEqual(resp.status_code, 202)
+        delay.assert_called_once_with(str(self.tenant.id), None, '2025-09-01', None)
+        result = tasks.reconcile_monitoring_entries(*delay.call_args.args)
+        self.assertEqual(result['status'], 'ok')
+
+    def test_foreign_campaign_rejected(self):
+        other = models.Campaign.objects.exclude(tenant=self.tenant).get()
+        resp = self.client.post('/api/monitoring-imports/reconcile/', {'campaign': str(other.id)})
+        self.assertEqual(resp.status_code, 400)
@@ -0,0 +1,119 @@
+import datetime
+import threading
+import unittest
+from io import StringIO
+
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+
+from .. import models, rollups
+from ..matching import entry_keys
+from ..pipeline import mark_failed, process_import
+from ..reconcile import reconcile_import, reconcile_scope
+from .test_matching import MatchingFixture
+from .test_pipeline import CSV
+
+
+def expected(tenant):
+    """Rollup rows computed the slow way, from every entry of ``tenant``."""
+    rows = {}
+    for entry in models.MonitoringEntry.objects.filter(tenant=tenant):
+        key = (entry.campaign_id, entry.media_plan_id, entry.daypart_id, entry.air_date)
+        spots, count, matched = rows.get(key, (0, 0, 0))
+        rows[key] = (spots + entry.spots_aired, count + 1, matched + (entry.match_status == 'matched'))
+    return rows
+
+
+def stored(tenant):
+    return {(r.campaign_id, r.media_plan_id, r.daypart_id, r.date):
+            (r.spots_aired, r.entry_count, r.matched_count)
+            for r in models.DailyDeliveryRollup.objects.filter(tenant=tenant)}
+
+
+def make_entries(tenant, rows):
+    imp = models.MonitoringImport.objects.create(tenant=tenant, file='log.csv')
+    models.MonitoringEntry.objects.bulk_create([
+        models.MonitoringEntry(monitoring_import=imp, tenant=tenant, airtime=airtime, spots_aired=2,
+                               raw_row=raw, **entry_keys(raw, airtime))
+        for raw, airtime in rows])
+    return imp
+
+
+class DeliveryRollupTests(MatchingFixture, TestCase):
+    def make_entries(self, rows):
+        return make_entries(self.tenant, rows)
+
+    def test_import_refreshes_its_days(self):
+        imp = models.MonitoringImport.objects.create(
+            tenant=self.tenant, file=ContentFile(CSV.encode('utf-8'), name='log.csv'), original_filename='log.csv')
+        process_import(imp)
+        self.assertTrue(stored(self.tenant))
+        self.assertEqual(stored(self.tenant), expected(self.tenant))
+
+    def test_failed_import_keeps_committed_chunks_rolled_up(self):
+        imp = self.make_entries(self.rows())
+        mark_failed(imp, 'boom')
+        self.assertEqual(models.MonitoringImport.objects.get(pk=imp.pk).status, 'failed')
+        self.assertTrue(stored(self.tenant))
+        self.assertEqual(stored(self.tenant), expected(self.tenant))
+
+    def test_reconcile_moves_entries_between_rows(self):
+        reconcile_import(self.make_entries(self.rows()))
+        self.assertEqual(stored(self.tenant), expected(self.tenant))
+        plan = models.MediaPlan.objects.get(campaign=self.c2)
+        self.assertTrue(models.DailyDeliveryRollup.objects.filter(media_plan=plan).exists())
+
+        plan.date = datetime.date(2025, 9, 5)
+        plan.save()
+        reconcile_scope(self.tenant.id, self.c2.id, plan.date, plan.date)
+        self.assertFalse(models.DailyDeliveryRollup.objects.filter(media_plan=plan).exists())
+        self.assertEqual(stored(self.tenant), expected(self.tenant))
+
+    def test_refresh_leaves_other_days_alone(self):
+        reconcile_import(self.make_entries(self.rows()))
+        day2 = datetime.date(2025, 9, 2)
+        untouched = set(models.DailyDeliveryRollup.objects.exclude(date=day2).values_list('pk', flat=True))
+        later = self.make_entries([({'campaign': 'Summer Sale'}, datetime.datetime(2025, 9, 2, 18, 0))])
+        reconcile_import(later)
+        self.assertEqual(set(models.DailyDeliveryRollup.objects.exclude(date=day2).values_list('pk', flat=True)),
+                         untouched)
+        self.assertEqual(stored(self.tenant), expected(self.tenant))
+
+    def test_rebuild_command(self):
+        self.make_entries(self.rows())
+        self.assertFalse(models.DailyDeliveryRollup.objects.exists())
+        out = StringIO()
+        call_command('rebuild_delivery_rollups', stdout=out)
+        self.assertEqual(stored(self.tenant), expected(self.tenant))
+        self.assertEqual(out.getvalue().strip(), f'Wrote {len(expected(self.tenant))} rollup rows')
+        # idempotent, and per tenant
+        self.assertEqual(rollups.rebuild(self.tenant.id), len(expected(self.tenant)))
+        self.assertEqual(stored(self.tenant), expected(self.tenant))
+
+
+@unittest.skipUnless(connection.vendor == 'postgresql', 'READ COMMITTED race needs PostgreSQL')
+class ConcurrentRefreshTests(MatchingFixture, TransactionTestCase):
+    def test_concurrent_refreshes_do_not_double_count(self):
+        make_entries(self.tenant, self.rows())
+        day = datetime.date(2025, 9, 1)
+        start = threading.Barrier(4)
+        errors = []
+
+        def refresh():
+            try:
+                start.wait()
+                rollups.refresh_days(self.tenant.id, [day])
+            except Exception as exc:  # surfaced below
+                errors.append(exc)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=refresh) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(stored(self.tenant), expected(self.tenant))
@@ -0,0 +1,64 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from tenants.models import Tenant
+from .. import models
+
+
+User = get_user_model()
+
+
+class SparseFieldsTests(TestCase):
+    def setUp(self):
+        self.tenant = Tenant.objects.create(name='SparseTenant')
+        self.user = User.objects.create_user(username='sparse', password='pass', tenant=self.tenant)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.campaign = models.Campaign.objects.create(tenant=self.tenant, name='Spring', meta={'blob': 'x' * 1000})
+        self.plans = [models.MediaPlan.objects.create(campaign=self.campaign, name=f'Line {i}', spots=i + 1)
+                      for i in range(5)]
+        self.report = models.MonitoringReport.objects.create(
+            campaign=self.campaign, summary='week 1', metrics={'spots_aired': 12})
+
+    def get(self, url, params):
+        with CaptureQueriesContext(connection) as queries:
+            resp = self.client.get(url, params)
+        self.assertEqual(resp.status_code, 200, resp.content)
+        return resp.json(), ' '.join(q['sql'] for q in queries.captured_queries)
+
+    def test_fields_trims_output_and_columns(self):
+        data, sql = self.get('/api/campaigns/', {'fields': 'id,name'})
+        self.assertEqual(data['results'], [{'id': str(self.campaign.id), 'name': 'Spring'}])
+        self.assertNotIn('"meta"', sql)
+        detail, sql = self.get(f'/api/campaigns/{self.campaign.id}/', {'fields': 'name,status'})
+        self.assertEqual(detail, {'name': 'Spring', 'status': 'draft'})
+        self.assertNotIn('"meta"', sql)
+
+    def test_omit_defers_columns(self):
+        data, sql = self.get('/api/reports/', {'omit': 'metrics,file'})
+        row = data['results'][0]
+        self.assertNotIn('metrics', row)
+        self.assertEqual(row['summary'], 'week 1')
+        self.assertNotIn('"metrics"', sql)
+
+    def test_keyset_pages_with_fields_load_no_extra_rows(self):
+        with self.assertNumQueries(2):  # count + page
+            resp = self.client.get('/api/media-plans/', {'fields': 'id,spots', 'limit': 2})
+        data = resp.json()
+        self.assertEqual([row['spots'] for row in data['results']], [1, 2])
+        self.assertEqual(set(data['results'][0]), {'id', 'spots'})
+        self.assertIsNotNone(data['next'])
+
+    def test_method_field_columns_are_loaded(self):
+        models.MonitoringImport.objects.create(tenant=self.tenant, file='log.csv', meta={'progress': {'rows': 3}})
+        data, _ = self.get('/api/monitoring-imports/', {'fields': 'id,progress,entry_counts'})
+        row = data['results'][0]
+        self.assertEqual(set(row), {'id', 'progress', 'entry_counts'})
+        self.assertEqual(row['progress'], {'rows': 3})
+
+    def test_unknown_fields_rejected(self):
+        self.assertEqual(self.client.get('/api/campaigns/', {'fields': 'name,nope'}).status_code, 400)
+        self.assertEqual(self.client.get('/api/media-plans/', {'omit': 'nope'}).status_code, 400)
@@ -3,13 +3,24 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.filters import OrderingFilter, SearchFilter
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from stations.pricing import plan_totals
 from rest_framework import viewsets, permissions
-from . import models, serializers
+from . import analytics, bulk, dedup, loaders, models, parsers, rollups, serializers
+from .pagination import EntryPagination, KeysetPagination
+from .pipeline import mark_failed, process_import
+from .reconcile import reconcile_import, reconcile_scope, scoped_entries
 from .permissions import IsTenantMember, IsTenantAdmin
 
 
 class TenantScopedMixin:
-    """Mixin to scope queryset by tenant from request.user.tenant or X-Tenant header."""
+    """Mixin to scope queryset by tenant from request.user.tenant or X-Tenant header.
+
+    ``tenant_field`` is the lookup path from the model to its tenant, for
+    models that reach it through a relation (e.g. ``'campaign__tenant'``).
+    """
+    tenant_field = 'tenant'
 
     def get_tenant_id(self):
         user = getattr(self.request, 'user', None)
@@ -25,11 +36,39 @@ class TenantScopedMixin:
         qs = super().get_queryset()
         tid = self.get_tenant_id()
         if tid:
-            return qs.filter(tenant_id=tid)
+            return qs.filter(**{self.tenant_field: tid})
         return qs
 
 
-class CampaignViewSet(TenantScopedMixin, viewsets.ModelViewSet):
+class SparseFieldsViewMixin:
+    """Mixin honouring ``?fields=`` / ``?omit=`` (comma separated field names) on list and retrieve.
+
+    The serializer (a ``serializers.SparseFieldsMixin``) drops the other
+    fields and the queryset only loads the columns left to serialize, plus
+    the ones the paginator orders by.
+    """
+    sparse_actions = ('list', 'retrieve')
+
+    def get_sparse_options(self):
+        serializer_class = self.get_serializer_class()
+        if self.action not in self.sparse_actions or not issubclass(serializer_class, serializers.SparseFieldsMixin):
+            return {}
+        return serializer_class.sparse_options(self.request.query_params)
+
+    def get_queryset(self):
+        qs = super().get_queryset()
+        options = self.get_sparse_options()
+        if options:
+            keep = [field.lstrip('-') for field in getattr(self.paginator, 'ordering', ())]
+            qs = self.get_serializer_class().sparse_queryset(qs, keep=keep, **options)
+        return qs
+
+    def get_serializer(self, *args, **kwargs):
+        kwargs.update(self.get_sparse_options())
+        return super().get_serializer(*args, **kwargs)
+
+
+class CampaignViewSet(SparseFieldsViewMixin, TenantScopedMixin, viewsets.ModelViewSet):
     queryset = models.Campaign.objects.all()
     serializer_class = serializers.CampaignSerializer
     permission_classes = [permissions.IsAuthenticated, IsTenantMember]
@@ -38,10 +77,34 @@ class CampaignViewSet(TenantScopedMixin, viewsets.ModelViewSet):
     ordering_fields = ['start_date', 'end_date', 'created_at']
     search_fields = ['name', 'advertiser_name', 'target_audience']
 
+    def get_delivery_window(self, request):
+        serializer = serializers.DeliveryWindowSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        return serializer.validated_data
+
+    @action(detail=True, methods=['get'], url_path='delivery')
+    def delivery(self, request, pk=None):
+        """Planned vs aired spots, cost and match rate of the campaign, by station, show, daypart and day.
+
+        ``date_from`` / ``date_to`` limit it to plans and airings in that window.
+        """
+        campaign = self.get_object()
+        return Response(analytics.campaign_delivery(campaign, **self.get_delivery_window(request)))
+
+    @action(detail=False, methods=['get'], url_path='delivery')
+    def tenant_delivery(self, request):
+        """Delivery of all the tenant's campaigns, also broken down by campaign."""
+        tenant_id = self.get_tenant_id()
+        if not tenant_id:
+            return Response({'detail': 'tenant required'}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(analytics.tenant_delivery(tenant_id, **self.get_delivery_window(request)))
 
-class MediaPlanViewSet(TenantScopedMixin, viewsets.ModelViewSet):
+
+class MediaPlanViewSet(SparseFieldsViewMixin, TenantScopedMixin, viewsets.ModelViewSet):
     queryset = models.MediaPlan.objects.all()
     serializer_class = serializers.MediaPlanSerializer
+    tenant_field = 'campaign__tenant'
+    pagination_class = KeysetPagination
     permission_classes = [permissions.IsAuthenticated, IsTenantMember]
     filter_backends = [DjangoFilterBackend, OrderingFilter, SearchFilter]
     filterset_fields = ['campaign', 'station', 'show', 'daypart', 'date', 'status']
@@ -50,25 +113,103 @@ class MediaPlanViewSet(TenantScopedMixin, viewsets.ModelViewSet):
 
     @action(detail=False, methods=['post'], url_path='bulk')
     def bulk_create(self, request):
-        """Bulk create media plans (spots) for a campaign."""
+        """Bulk create media plans (spots) for a campaign.
+
+        The batch is validated as a whole and inserted in one transaction:
+        if any item fails nothing is created, and the response lists the
+        failing items' errors with their positions in ``failed``.
+        """
+        items = request.data.get('items', [])
+        if not isinstance(items, list):
+            return Response({'detail': 'items must be a list'}, status=status.HTTP_400_BAD_REQUEST)
+        serializer = self.get_serializer(data=items, many=True)
+        if not serializer.is_valid():
+            errors = serializer.errors
+            # {index: errors} or, with the older list format, one entry per item
+            if not isinstance(errors, dict):
+                errors = {i: item_errors for i, item_errors in enumerate(errors) if item_errors}
+            failed = sorted(errors)
+            return Response({'detail': 'Some items failed', 'errors': [errors[i] for i in failed], 'failed': failed},
+                            status=status.HTTP_400_BAD_REQUEST)
+        plans = serializer.save()
+        return Response({'created': [plan.id for plan in plans]}, status=status.HTTP_201_CREATED)
+
+    def member_plans(self):
+        """Plans of the requesting user's own tenant, or ``None`` for users without one.
+
+        Bulk writes skip the per-object ``IsTenantMember`` check, so they are
+        scoped the same way here: by ``user.tenant_id``, never by the
+        ``X-Tenant`` header.
+        """
+        tenant_id = getattr(self.request.user, 'tenant_id', None)
+        if not tenant_id:
+            return None
+        return self.get_queryset().filter(campaign__tenant_id=tenant_id)
+
+    @bulk_create.mapping.patch
+    def bulk_update(self, request):
+        """Edit spots and prices of many plans at once.
+
+        Valid edits are applied with one ``bulk_update``; invalid items,
+        unknown plans and locked plans are listed under ``failed``.
+        """
+        plans = self.member_plans()
+        if plans is None:
+            return Response({'detail': 'tenant required'}, status=status.HTTP_403_FORBIDDEN)
         items = request.data.get('items', [])
-        created = []
-        errors = []
-        for item in items:
-            serializer = self.get_serializer(data=item)
+        if not isinstance(items, list):
+            return Response({'detail': 'items must be a list'}, status=status.HTTP_400_BAD_REQUEST)
+        edits = []
+        failed = []
+        for index, item in enumerate(items):
+            serializer = serializers.MediaPlanEditSerializer(data=item)
             if serializer.is_valid():
-                obj = serializer.save()
-                created.append(obj.id)
+                edits.append(serializer.validated_data)
             else:
-                errors.append(serializer.errors)
-        if errors:
-            return Response({'detail': 'Some items failed', 'errors': errors}, status=status.HTTP_400_BAD_REQUEST)
-        return Response({'created': created}, status=status.HTTP_201_CREATED)
-
-
-class MediaBriefViewSet(TenantScopedMixin, viewsets.ModelViewSet):
+                failed.append({'index': index, 'id': item.get('id') if isinstance(item, dict) else None,
+                               'errors': serializer.errors})
+        result = bulk.update_plans(plans, edits)
+        return Response({'updated': result['updated'], 'failed': failed + result['failed']})
+
+    @action(detail=False, methods=['post'], url_path='transition')
+    def transition(self, request):
+        """Move the plans matching ``campaign``/``station``/``date_from``/``date_to``/``ids`` to ``status``.
+
+        Plans whose current status does not allow the move are left as they
+        are and listed under ``failed``.
+        """
+        plans = self.member_plans()
+        if plans is None:
+            return Response({'detail': 'tenant required'}, status=status.HTTP_403_FORBIDDEN)
+        serializer = serializers.PlanTransitionSerializer(data=request.data,
+                                                          context={'tenant_id': request.user.tenant_id})
+        serializer.is_valid(raise_exception=True)
+        scope = serializer.validated_data
+        if scope.get('campaign'):
+            plans = plans.filter(campaign=scope['campaign'])
+        if scope.get('station'):
+            plans = plans.filter(station=scope['station'])
+        if scope.get('date_from'):
+            plans = plans.filter(date__gte=scope['date_from'])
+        if scope.get('date_to'):
+            plans = plans.filter(date__lte=scope['date_to'])
+        if scope.get('ids'):
+            plans = plans.filter(pk__in=scope['ids'])
+        return Response({'status': scope['status'], **bulk.transition_plans(plans, scope['status'])})
+
+    @action(detail=False, methods=['get'], url_path='totals')
+    def totals(self, request):
+        """Spots and cost of the (filtered) plans, pricing lines without a price from the rate cards."""
+        rows = self.filter_queryset(self.get_queryset()).values(
+            'station_id', 'show_id', 'daypart_id', 'scheduled_at', 'spots', 'price_per_spot',
+            tenant_id=F('campaign__tenant_id'))
+        return Response(plan_totals(rows.iterator()))
+
+
+class MediaBriefViewSet(SparseFieldsViewMixin, TenantScopedMixin, viewsets.ModelViewSet):
     queryset = models.MediaBrief.objects.all()
     serializer_class = serializers.MediaBriefSerializer
+    tenant_field = 'campaign__tenant'
     permission_classes = [permissions.IsAuthenticated, IsTenantMember]
     filter_backends = [DjangoFilterBackend, OrderingFilter, SearchFilter]
     filterset_fields = ['campaign']
@@ -76,9 +217,11 @@ class MediaBriefViewSet(TenantScopedMixin, viewsets.ModelViewSet):
     search_fields = ['objective', 'target']
 
 
-class MonitoringReportViewSet(TenantScopedMixin, viewsets.ModelViewSet):
+class MonitoringReportViewSet(SparseFieldsViewMixin, TenantScopedMixin, viewsets.ModelViewSet):
     queryset = models.MonitoringReport.objects.all()
     serializer_class = serializers.MonitoringReportSerializer
+    tenant_field = 'campaign__tenant'
+    pagination_class = KeysetPagination
     permission_classes = [permissions.IsAuthenticated, IsTenantMember]
     filter_backends = [DjangoFilterBackend, OrderingFilter, SearchFilter]
     filterset_fields = ['media_plan']
@@ -102,11 +245,9 @@ class MonitoringReportViewSet(TenantScopedMixin, viewsets.ModelViewSet):
         # Basic CSV parsing if provided
         f = request.FILES.get('file')
         if f and f.name.endswith('.csv'):
-            import csv
-            decoded = f.read().decode('utf-8').splitlines()
-            reader = csv.DictReader(decoded)
+            f.seek(0)
             total_spots = 0
-            for row in reader:
+            for row in parsers.CSVRowReader(f):
                 try:
                     total_spots += int(row.get('spots_aired', 0))
                 except Exception:
@@ -118,79 +259,112 @@ class MonitoringReportViewSet(TenantScopedMixin, viewsets.ModelViewSet):
         return Response(serializers.MonitoringReportSerializer(report).data, status=status.HTTP_201_CREATED)
 
 
-class MonitoringImportViewSet(TenantScopedMixin, viewsets.ModelViewSet):
+# threshold in bytes for inline parsing of monitoring uploads
+INLINE_THRESHOLD = 100 * 1024  # 100KB
+# scoped re-reconciles touching more entries than this run in Celery
+RECONCILE_INLINE_LIMIT = 5000
+
+
+class MonitoringImportViewSet(SparseFieldsViewMixin, TenantScopedMixin, viewsets.ModelViewSet):
     """Handle raw monitoring file uploads and parse them into MonitoringEntry rows."""
     queryset = models.MonitoringImport.objects.all()
     serializer_class = serializers.MonitoringImportSerializer
+    pagination_class = KeysetPagination
     permission_classes = [permissions.IsAuthenticated, IsTenantMember]
     filter_backends = [DjangoFilterBackend, OrderingFilter, SearchFilter]
     filterset_fields = ['tenant', 'status']
     ordering_fields = ['created_at', 'processed_at']
 
+    def get_queryset(self):
+        qs = super().get_queryset()
+        if self.action in ('list', 'retrieve'):
+            qs = qs.with_entry_counts()
+        return qs
+
     def get_serializer_class(self):
         return self.serializer_class
 
+    def perform_destroy(self, instance):
+        # the entries go with the import; so must their spots in the delivery rollups
+        with transaction.atomic():
+            days = rollups.entry_days(models.MonitoringEntry.objects.filter(monitoring_import=instance))
+            instance.delete()
+            rollups.refresh_tenant_days(days)
+
+    @action(detail=True, methods=['get'], url_path='entries', pagination_class=EntryPagination)
+    def entries(self, request, pk=None):
+        """Page through the import's entries.
+
+        ``match_status`` filters them and ``fields`` / ``omit`` (comma
+        separated) pick the fields returned, e.g.
+        ``?fields=id,airtime,match_status`` or ``?omit=raw_row``.
+        Pages follow the ``next`` link (keyset pagination, see
+        ``planner.pagination``).
+        """
+        import_obj = self.get_object()
+        qs = models.MonitoringEntry.objects.filter(monitoring_import=import_obj)
+        match_status = request.query_params.get('match_status')
+        if match_status:
+            if match_status not in dict(models.MonitoringEntry.MATCH_STATUS):
+                return Response({'match_status': f'Unknown status {match_status!r}.'},
+                                status=status.HTTP_400_BAD_REQUEST)
+            qs = qs.filter(match_status=match_status)
+        options = serializers.MonitoringEntrySerializer.sparse_options(request.query_params)
+        # only load the selected columns (plus the pagination key)
+        qs = serializers.MonitoringEntrySerializer.sparse_queryset(qs, keep=('id',), **options)
+        page = self.paginate_queryset(qs)
+        return self.get_paginated_response(serializers.MonitoringEntrySerializer(page, many=True, **options).data)
+
+    def duplicate_response(self, existing):
+        return Response({'import_id': existing.id, 'status': existing.status, 'duplicate': True},
+                        status=status.HTTP_200_OK)
+
     @action(detail=False, methods=['post'], url_path='upload')
     def upload(self, request):
         """Accept CSV or XLSX, create a MonitoringImport and parse rows into MonitoringEntry."""
         f = request.FILES.get('file')
         if not f:
             return Response({'detail': 'file is required'}, status=status.HTTP_400_BAD_REQUEST)
-
-        import_obj = models.MonitoringImport.objects.create(
+        # optional per-import loader override ('copy' or 'bulk_create')
+        loader = request.data.get('loader')
+        if loader and loader not in loaders.LOADERS:
+            return Response({'detail': f'unknown loader {loader!r}'}, status=status.HTTP_400_BAD_REQUEST)
+
+        content_hash = ''
+        if dedup.enabled():
+            content_hash = dedup.file_sha256(f)
+            # a re-sent log: answer with the import that already holds it
+            existing = dedup.find_duplicate_import(self.get_tenant_id(), content_hash)
+            if existing:
+                return self.duplicate_response(existing)
+
+        import_obj = models.MonitoringImport(
             tenant_id=self.get_tenant_id(),
             uploaded_by=(request.user if getattr(request, 'user', None) and request.user.is_authenticated else None),
             file=f,
-            original_filename=getattr(f, 'name', '')
+            original_filename=getattr(f, 'name', ''),
+            content_hash=content_hash,
+            meta={'loader': loader} if loader else {},
         )
-    # Improved parsing: for small CSVs parse inline, otherwise enqueue a Celery task
-    # to process the import asynchronously.
-        entries_to_create = []
-        matched = 0
-        parsed = 0
         try:
-            tenant_id = self.get_tenant_id()
-            # helper to normalize keys
-            def normalize_row(d):
-                return { (k or '').strip().lower(): (v if v is not None else '') for k,v in d.items() }
-
-            def parse_csv(file_obj):
-                import csv
-                text = file_obj.read().decode('utf-8', errors='replace').splitlines()
-                reader = csv.DictReader(text)
-                for raw in reader:
-                    yield normalize_row(raw)
-
-            def parse_xlsx(file_obj):
-                try:
-                    import openpyxl
-                except Exception:
-                    raise RuntimeError('openpyxl not installed')
-                wb = openpyxl.load_workbook(file_obj, read_only=True, data_only=True)
-                ws = wb.active
-                rows = ws.iter_rows(values_only=True)
-                try:
-                    headers = [str(h).strip().lower() if h is not None else '' for h in next(rows)]
-                except StopIteration:
-                    return
-                for row in rows:
-                    data = {headers[i] if i < len(headers) else f'col_{i}': row[i] for i in range(len(row))}
-                    yield normalize_row(data)
-
-            # choose parser
-            if f.name.lower().endswith('.csv'):
-                row_iter = parse_csv(f)
-            elif f.name.lower().endswith(('.xlsx', '.xls')):
-                row_iter = parse_xlsx(f)
-            else:
+            with transaction.atomic():
+                import_obj.save()
+        except IntegrityError:
+            # an identical upload committed between the lookup and the insert
+            import_obj.file.delete(save=False)
+            existing = dedup.find_duplicate_import(self.get_tenant_id(), content_hash)
+            if existing is None:
+                raise
+            return self.duplicate_response(existing)
+        # Small files are parsed inline; larger ones are handed to a Celery task
+        # running the same pipeline.
+        try:
+            if not parsers.is_supported(f.name):
                 import_obj.status = 'failed'
                 import_obj.summary = 'unsupported file type'
                 import_obj.save()
                 return Response({'detail': 'unsupported file type'}, status=status.HTTP_400_BAD_REQUEST)
 
-            from django.db import transaction
-            from dateutil import parser as dateparser
-
             # If file is small, parse inline; otherwise enqueue background task
             f_size = None
             try:
@@ -198,122 +372,67 @@ class MonitoringImportViewSet(TenantScopedMixin, viewsets.ModelViewSet):
             except Exception:
                 pass
 
-            # threshold in bytes for inline parsing
-            INLINE_THRESHOLD = 100 * 1024  # 100KB
-
             if f_size is not None and f_size > INLINE_THRESHOLD:
                 # enqueue background processing
                 try:
                     from .tasks import process_monitoring_import
                 except Exception:
                     raise RuntimeError('Celery tasks not available')
-                process_monitoring_import.delay(str(import_obj.id))
+                # mark processing before enqueueing so a fast worker's final
+                # status is not overwritten
                 import_obj.status = 'processing'
                 import_obj.save()
+                process_monitoring_import.delay(str(import_obj.id))
                 return Response({'import_id': import_obj.id, 'status': 'processing'}, status=status.HTTP_202_ACCEPTED)
 
-            # inline parse for small files
+            # nothing resumes an inline import, so it lands completely or not at all
             with transaction.atomic():
-                for raw in row_iter:
-                    parsed += 1
-                    # normalize common column names
-                    spots_candidates = [raw.get('spots_aired'), raw.get('spots'), raw.get('sold'), raw.get('count')]
-                    spots = 0
-                    for s in spots_candidates:
-                        try:
-                            if s is None or s == '':
-                                continue
-                            spots = int(float(str(s).strip()))
-                            break
-                        except Exception:
-                            continue
-
-                    airtime = None
-                    airtime_value = raw.get('airtime') or raw.get('time') or raw.get('datetime') or raw.get('date_time')
-                    if airtime_value:
-                        try:
-                            airtime = dateparser.parse(str(airtime_value))
-                        except Exception:
-                            airtime = None
-
-                    duration = None
-                    try:
-                        dur = raw.get('duration') or raw.get('duration_seconds') or raw.get('length')
-                        if dur not in (None, ''):
-                            duration = int(float(str(dur).strip()))
-                    except Exception:
-                        duration = None
-
-                    # best-effort matching: campaign by external_id or name
-                    campaign_obj = None
-                    campaign_id_val = raw.get('campaign_id') or raw.get('campaign_external_id') or raw.get('campaign_id_external')
-                    campaign_name_val = raw.get('campaign') or raw.get('campaign_name') or raw.get('advertiser')
-                    if campaign_id_val:
-                        try:
-                            campaign_obj = models.Campaign.objects.filter(tenant_id=tenant_id, external_id=str(campaign_id_val)).first()
-                        except Exception:
-                            campaign_obj = None
-                    if not campaign_obj and campaign_name_val:
-                        campaign_obj = models.Campaign.objects.filter(tenant_id=tenant_id, name__iexact=str(campaign_name_val).strip()).first()
-
-                    # try to find a MediaPlan: by campaign + date (from airtime) + show/station if available
-                    media_plan_obj = None
-                    if campaign_obj and airtime:
-                        try:
-                            date_val = airtime.date()
-                            qs = models.MediaPlan.objects.filter(campaign=campaign_obj, date=date_val)
-                            # narrow by show/station if provided
-                            show_val = raw.get('show') or raw.get('show_name')
-                            station_val = raw.get('station') or raw.get('station_name')
-                            if show_val:
-                                qs = qs.filter(show__name__iexact=str(show_val).strip())
-                            if station_val:
-                                qs = qs.filter(station__name__iexact=str(station_val).strip())
-                            media_plan_obj = qs.first()
-                        except Exception:
-                            media_plan_obj = None
-
-                    match_status = 'unmatched'
-                    if media_plan_obj:
-                        match_status = 'matched'
-                        matched += 1
-                    elif campaign_obj:
-                        match_status = 'ambiguous'
-
-                    entry = models.MonitoringEntry(
-                        monitoring_import=import_obj,
-                        tenant_id=tenant_id,
-                        campaign=campaign_obj,
-                        media_plan=media_plan_obj,
-                        spots_aired=spots,
-                        airtime=airtime,
-                        duration_seconds=duration,
-                        raw_row=raw,
-                        match_status=match_status,
-                    )
-                    entries_to_create.append(entry)
-
-                # bulk create for performance
-                if entries_to_create:
-                    models.MonitoringEntry.objects.bulk_create(entries_to_create, batch_size=500)
-
-                import_obj.status = 'processed'
-                import_obj.processed_at = models.timezone.now()
-                import_obj.summary = f'Parsed {parsed} entries, matched {matched}'
-                import_obj.save()
-
+                result = process_import(import_obj)
         except RuntimeError as rexc:
-            import_obj.status = 'failed'
-            import_obj.summary = str(rexc)
-            import_obj.save()
+            mark_failed(import_obj, str(rexc))
             return Response({'detail': 'parsing failed', 'error': str(rexc)}, status=status.HTTP_400_BAD_REQUEST)
         except Exception as exc:
-            import_obj.status = 'failed'
-            import_obj.summary = str(exc)
-            import_obj.save()
+            mark_failed(import_obj, str(exc))
             return Response({'detail': 'parsing failed', 'error': str(exc)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-        return Response({'import_id': import_obj.id, 'parsed': parsed, 'matched': matched}, status=status.HTTP_201_CREATED)
+        return Response({'import_id': import_obj.id, **result}, status=status.HTTP_201_CREATED)
+
+    @action(detail=False, methods=['post'], url_path='reconcile')
+    def reconcile_affected(self, request):
+        """Re-match previously imported entries after campaign or plan edits.
+
+        Optional ``campaign``, ``date_from`` and ``date_to`` narrow the scope;
+        only entries whose match can change are touched (see
+        ``reconcile.scoped_entries``).
+        """
+        tenant_id = self.get_tenant_id()
+        if not tenant_id:
+            return Response({'detail': 'tenant required'}, status=status.HTTP_400_BAD_REQUEST)
+        serializer = serializers.ReconcileScopeSerializer(data=request.data, context={'tenant_id': tenant_id})
+        serializer.is_valid(raise_exception=True)
+        scope = serializer.validated_data
+        campaign_id = scope['campaign'].pk if scope.get('campaign') else None
+        date_from, date_to = scope.get('date_from'), scope.get('date_to')
+
+        affected = scoped_entries(tenant_id, campaign_id, date_from, date_to).count()
+        if affected > RECONCILE_INLINE_LIMIT:
+            from .tasks import reconcile_monitoring_entries
+            reconcile_monitoring_entries.delay(
+                str(tenant_id), str(campaign_id) if campaign_id else None,
+                date_from.isoformat() if date_from else None, date_to.isoformat() if date_to else None)
+            return Response({'status': 'processing', 'entries': affected}, status=status.HTTP_202_ACCEPTED)
+        counts = reconcile_scope(tenant_id, campaign_id, date_from, date_to)
+        return Response({'status': 'ok', 'entries': affected, **counts})
+
+    @action(detail=True, methods=['post'], url_path='reconcile')
+    def reconcile(self, request, pk=None):
+        """Re-match this import's entries against the current campaigns and plans."""
+        import_obj = self.get_object()
+        counts = reconcile_import(import_obj)
+        if import_obj.status == 'processed':
+            import_obj.summary = f"Parsed {sum(counts.values())} entries, matched {counts['matched']}"
+            import_obj.save(update_fields=['summary', 'updated_at'])
+        return Response({'import_id': import_obj.id, **counts})
 
 
 class LicenseViewSet(TenantScopedMixin, viewsets.ModelViewSet):
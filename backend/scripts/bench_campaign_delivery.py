@@ -0,0 +1,102 @@
+"""Benchmark the campaign delivery report against aggregating in Python.
+
+Creates one campaign with --plans plan lines spread over --stations
+stations and --days days, and --entries monitoring entries matched to
+them, then builds the daily delivery rollups and times
+planner.analytics.campaign_delivery (GROUP BY over plans and rollups)
+against aired spots per station computed by reading every entry, as a
+client paging through the entries would have to. Both must agree on aired
+spots. Also reports the cost of a full rollup rebuild and of refreshing
+the rollups of one day, as an import or reconcile run does.
+
+Run from the backend directory:
+python scripts/bench_campaign_delivery.py --entries 1000000
+"""
+import argparse
+import datetime
+import os
+import sys
+import time
+from decimal import Decimal
+
+# Ensure the backend package root is on sys.path so local imports work when running this
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument('--entries', type=int, default=200_000)
+    ap.add_argument('--plans', type=int, default=2000)
+    ap.add_argument('--stations', type=int, default=20)
+    ap.add_argument('--days', type=int, default=30)
+    ap.add_argument('--repeat', type=int, default=3)
+    ap.add_argument('--settings', default='config.test_settings')
+    args = ap.parse_args()
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', args.settings)
+    import django
+    django.setup()
+    from django.core.management import call_command
+    from django.db import connection
+    from planner import analytics, models, rollups
+    from stations.models import Station
+    from tenants.models import Tenant
+
+    if connection.settings_dict['NAME'] == ':memory:':
+        call_command('migrate', verbosity=0)
+    tenant = Tenant.objects.create(name='bench-delivery')
+    campaign = models.Campaign.objects.create(tenant=tenant, name='bench-delivery')
+    stations = Station.objects.bulk_create(
+        [Station(tenant=tenant, name=f'Station {i:03d}', type='TV') for i in range(args.stations)])
+    start = datetime.date(2025, 9, 1)
+    plans = models.MediaPlan.objects.bulk_create(
+        [models.MediaPlan(campaign=campaign, name=f'Line {i}', station=stations[i % len(stations)],
+                          date=start + datetime.timedelta(days=i % args.days), spots=10,
+                          price_per_spot=Decimal('12.50'))
+         for i in range(args.plans)], batch_size=5000)
+    imp = models.MonitoringImport.objects.create(tenant=tenant, file='bench.csv', status='processed')
+    models.MonitoringEntry.objects.bulk_create(
+        (models.MonitoringEntry(monitoring_import=imp, tenant=tenant, campaign=campaign,
+                                media_plan=plans[i % len(plans)], air_date=plans[i % len(plans)].date,
+                                spots_aired=1, match_status='matched' if i % 10 else 'ambiguous')
+         for i in range(args.entries)), batch_size=5000)
+
+    def in_python():
+        aired = {}
+        for station_id, spots in (models.MonitoringEntry.objects.filter(tenant=tenant, campaign=campaign)
+                                  .values_list('media_plan__station_id', 'spots_aired').iterator(chunk_size=5000)):
+            aired[station_id] = aired.get(station_id, 0) + spots
+        return sum(aired.values())
+
+    with connection.cursor() as cursor:
+        # planner statistics, as a long-lived database has them
+        cursor.execute('ANALYZE')
+    started = time.perf_counter()
+    rebuilt = rollups.rebuild(tenant.id)
+    print(f'rebuild: {rebuilt} rollup rows in {(time.perf_counter() - started) * 1e3:.1f} ms')
+    started = time.perf_counter()
+    refreshed = rollups.refresh_days(tenant.id, {start})
+    print(f'refresh one day: {refreshed} rollup rows in {(time.perf_counter() - started) * 1e3:.1f} ms')
+
+    assert analytics.campaign_delivery(campaign)['totals']['aired_spots'] == in_python() == args.entries
+    print(f"{'impl':>10} {'entries':>9} {'ms/report':>10} {'queries':>8}")
+    for name, report in (('sql', lambda: analytics.campaign_delivery(campaign)), ('python', in_python)):
+        queries = []
+
+        def count(execute, sql, params, many, context):
+            queries.append(sql)
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(count):
+            started = time.perf_counter()
+            for _ in range(args.repeat):
+                report()
+            seconds = time.perf_counter() - started
+        print(f'{name:>10} {args.entries:>9} {seconds / args.repeat * 1e3:>10.1f} {len(queries) // args.repeat:>8}')
+    tenant.delete()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+"""Micro-benchmark of airtime to daypart resolution.
+
+Resolves --airtimes random times against --dayparts dayparts with a linear
+scan over all intervals and with the bisect lookup of
+stations.dayparts.DaypartIndex, checking both agree. The 'grid' layout
+tiles the day with equal dayparts, the last one wrapping midnight (a
+station's schedule grid); 'random' uses random, overlapping intervals.
+
+Run from the backend directory:
+python scripts/bench_daypart_index.py --airtimes 1000000 --dayparts 48
+"""
+import argparse
+import datetime
+import os
+import random
+import sys
+import time
+
+# Ensure the backend package root is on sys.path so local imports work when running this
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+
+def linear_first(dayparts, at):
+    for start, end, pk in dayparts:
+        if start < end:
+            hit = start <= at < end
+        elif start > end:
+            hit = at >= start or at < end
+        else:
+            hit = True
+        if hit:
+            return pk
+    return None
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument('--airtimes', type=int, default=1_000_000)
+    ap.add_argument('--dayparts', type=int, default=48)
+    ap.add_argument('--layout', choices=['grid', 'random'], default='grid')
+    args = ap.parse_args()
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.test_settings')
+    import django
+    django.setup()
+    from stations.dayparts import DaypartIndex
+
+    rng = random.Random(7)
+
+    def random_time():
+        return datetime.time(rng.randrange(24), rng.randrange(60), rng.randrange(60))
+
+    if args.layout == 'grid':
+        step = 24 * 60 // args.dayparts
+        offset = step // 2  # so the last daypart wraps midnight
+
+        def at_minute(m):
+            m = (m + offset) % (24 * 60)
+            return datetime.time(m // 60, m % 60)
+        dayparts = [(at_minute(i * step), at_minute((i + 1) * step), i) for i in range(args.dayparts)]
+    else:
+        dayparts = [(random_time(), random_time(), i) for i in range(args.dayparts)]
+    airtimes = [random_time() for _ in range(args.airtimes)]
+    started = time.perf_counter()
+    index = DaypartIndex(dayparts)
+    build = time.perf_counter() - started
+
+    print(f"{'impl':>7} {'airtimes':>9} {'ns/lookup':>10}")
+    results = {}
+    for name, lookup in (('linear', lambda t: linear_first(dayparts, t)), ('bisect', index.at)):
+        started = time.perf_counter()
+        results[name] = [lookup(t) for t in airtimes]
+        seconds = time.perf_counter() - started
+        print(f'{name:>7} {args.airtimes:>9} {seconds / args.airtimes * 1e9:>10.0f}')
+    assert results['linear'] == results['bisect']
+    print(f'index build: {build * 1e3:.2f} ms for {args.dayparts} dayparts, {len(index.bounds)} segments')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+"""Benchmark MonitoringEntry loaders: bulk_create vs PostgreSQL COPY.
+
+Builds N unsaved entries with station-log sized ``raw_row`` payloads and
+writes them with each loader from planner.loaders inside a transaction that
+is rolled back afterwards, so the database is left untouched.
+
+Point DATABASE_URL at a Postgres database with migrations applied. With
+``--settings config.test_settings`` the benchmark runs against in-memory
+SQLite, where ``copy`` falls back to ``bulk_create``.
+
+Run from the backend directory:
+python scripts/bench_entry_loader.py --rows 50000 200000
+"""
+import argparse
+import datetime
+import os
+import sys
+import time
+
+# Ensure the backend package root is on sys.path so local imports work when running this
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+
+def build_entries(imp, rows):
+    from django.utils import timezone
+    from planner.models import MonitoringEntry
+    base = timezone.make_aware(datetime.datetime(2025, 9, 1))
+    return [MonitoringEntry(
+        monitoring_import=imp, tenant_id=imp.tenant_id,
+        airtime=base + datetime.timedelta(minutes=i), spots_aired=1 + i % 3, duration_seconds=30,
+        raw_row={
+            'airtime': (base + datetime.timedelta(minutes=i)).isoformat(),
+            'station': f'Station {i % 50}', 'show': f'Show {i % 400}',
+            'campaign_name': f'Campaign {i % 30}', 'spots_aired': str(1 + i % 3), 'duration': '30',
+        },
+        match_status='unmatched') for i in range(rows)]
+
+
+def timed_load(loader, entries):
+    from django.db import transaction
+    with transaction.atomic():
+        started = time.perf_counter()
+        loader.load(entries)
+        seconds = time.perf_counter() - started
+        transaction.set_rollback(True)
+    return seconds
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument('--rows', type=int, nargs='+', default=[50_000, 200_000])
+    ap.add_argument('--batch-size', type=int, default=500)
+    ap.add_argument('--settings', default='config.settings')
+    args = ap.parse_args()
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', args.settings)
+    import django
+    django.setup()
+    from django.core.management import call_command
+    from django.db import connection, transaction
+    from planner import loaders
+    from planner.models import MonitoringImport
+    from tenants.models import Tenant
+
+    if connection.settings_dict['NAME'] == ':memory:':
+        call_command('migrate', verbosity=0)
+    print(f'database: {connection.vendor}')
+    print(f"{'rows':>10} {'loader':>12} {'seconds':>8} {'rows/s':>10}")
+    with transaction.atomic():
+        tenant = Tenant.objects.create(name='bench-loader')
+        imp = MonitoringImport.objects.create(tenant=tenant, file='bench.csv', original_filename='bench.csv')
+        for n in args.rows:
+            for name in loaders.LOADERS:
+                loader = loaders.get_loader(name, batch_size=args.batch_size)
+                # fresh objects per run: pre_save fills timestamps in place
+                seconds = timed_load(loader, build_entries(imp, n))
+                label = name if loader.name == name else f'{name}*'
+                print(f'{n:>10} {label:>12} {seconds:>8.2f} {n / seconds:>10.0f}')
+        transaction.set_rollback(True)
+    if connection.vendor != 'postgresql':
+        print('* copy needs PostgreSQL; bulk_create was used instead')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""Micro-benchmark of the license middleware's exempt-path check.
+
+Compares the previous implementation, which rebuilt and normalized the
+prefix list from settings and scanned it with startswith() on every call,
+with the compiled matcher LicenseEnforceMiddleware now builds once. The
+path mix includes static assets, which hit the check on every request.
+
+Run from the backend directory:
+python scripts/bench_exempt_paths.py --calls 200000
+"""
+import argparse
+import os
+import sys
+import time
+
+# Ensure the backend package root is on sys.path so local imports work when running this
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+PATHS = [
+    '/static/js/app.3f9a1c.js', '/static/css/site.css', '/media/monitoring_imports/log.csv',
+    '/api/campaigns/', '/api/media-plans/?campaign=1', '/api/monitoring-imports/upload/',
+    '/admin/planner/campaign/', '/healthz', '/api/licenses/activate/', '/api/stations/',
+]
+
+
+def legacy_is_exempt(path, default_exempts):
+    """The per-call prefix rebuild and linear scan used before the compiled matcher."""
+    from django.conf import settings
+    configured = getattr(settings, 'LICENSE_ENFORCE_EXEMPT_PATHS', None)
+    prefixes = list(configured) if configured else []
+    prefixes = prefixes + default_exempts
+    if getattr(settings, 'LICENSE_ENFORCE_SKIP_ADMIN', True):
+        prefixes.append('/admin')
+    static_url = getattr(settings, 'STATIC_URL', None)
+    media_url = getattr(settings, 'MEDIA_URL', None)
+    if static_url:
+        prefixes.append(static_url)
+    if media_url:
+        prefixes.append(media_url)
+    normalized = []
+    for p in prefixes:
+        if not p:
+            continue
+        pstr = str(p).strip()
+        if not pstr or pstr == '/':
+            continue
+        normalized.append(pstr)
+    for p in normalized:
+        if path.startswith(p):
+            return True
+    return False
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument('--calls', type=int, default=200_000)
+    ap.add_argument('--extra-prefixes', type=int, default=0,
+                    help='add N configured exempt prefixes to model larger deployments')
+    args = ap.parse_args()
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.test_settings')
+    import django
+    django.setup()
+    from django.test import override_settings
+    from licenses.middleware import LicenseEnforceMiddleware
+
+    extra = [f'/partner-{i}/hooks' for i in range(args.extra_prefixes)]
+    with override_settings(LICENSE_ENFORCE_EXEMPT_PATHS=extra or None, MEDIA_URL='/media/'):
+        middleware = LicenseEnforceMiddleware(get_response=lambda req: None)
+        defaults = middleware.DEFAULT_EXEMPTS
+        for path in PATHS:
+            assert legacy_is_exempt(path, defaults) == middleware._is_exempt_path(path), path
+
+        paths = (PATHS * (args.calls // len(PATHS) + 1))[:args.calls]
+        print(f"{'impl':>9} {'calls':>8} {'ns/call':>9}")
+        for name, check in (('legacy', lambda p: legacy_is_exempt(p, defaults)),
+                            ('compiled', middleware._is_exempt_path)):
+            started = time.perf_counter()
+            for path in paths:
+                check(path)
+            seconds = time.perf_counter() - started
+            print(f'{name:>9} {args.calls:>8} {seconds / args.calls * 1e9:>9.0f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+"""Benchmark fanned-out monitoring imports against worker count.
+
+Writes a synthetic multi-million-row CSV, plans row-aligned ranges with
+planner.parsers.plan_ranges and processes them with a pool of N worker
+processes, the same way process_monitoring_import_range tasks split a file
+across Celery workers.
+
+Two modes:
+- ``--parse-only`` (default): each worker parses, normalizes and builds the
+  MonitoringEntry objects for its range without touching the database.
+- ``--db``: each worker runs RangeImportPipeline against DATABASE_URL (use
+  Postgres; an in-memory SQLite database cannot be shared between
+  processes).
+
+Run from the backend directory:
+python scripts/bench_import_fanout.py --rows 2000000 --workers 1 2 4 8
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from itertools import islice
+
+# Ensure the backend package root is on sys.path so local imports work when running this
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from bench_import_parser import write_sample  # noqa: E402
+
+
+def setup_django(settings_module):
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', settings_module)
+    import django
+    django.setup()
+
+
+def parse_range(args):
+    path, start, end = args
+    from planner import parsers
+    from planner.models import MonitoringEntry
+    from planner.normalize import BatchNormalizer
+    from planner.pipeline import CHUNK_SIZE
+    count = 0
+    normalizer = None
+    with open(path, 'rb') as f:
+        reader = parsers.get_row_reader(f, path, start=start, end=end)
+        rows_iter = iter(reader)
+        while True:
+            # normalized chunk by chunk, like ImportPipeline
+            rows = list(islice(rows_iter, CHUNK_SIZE))
+            if not rows:
+                return count
+            normalizer = normalizer or BatchNormalizer(reader.headers or rows[0].keys(), sample_rows=rows)
+            for raw, (airtime, spots, duration) in zip(rows, normalizer.normalize(rows)):
+                MonitoringEntry(airtime=airtime, spots_aired=spots, duration_seconds=duration, raw_row=raw)
+            count += len(rows)
+
+
+def import_range(args):
+    import_id, index, start, end = args
+    from django.db import connection
+    from planner.models import MonitoringImport
+    from planner.pipeline import RangeImportPipeline
+    connection.close()  # never share the parent's connection
+    imp = MonitoringImport.objects.get(pk=import_id)
+    return RangeImportPipeline(imp, index, start, end).run()['parsed']
+
+
+def create_import(path):
+    from django.core.files import File
+    from planner.models import Campaign, MonitoringImport
+    from tenants.models import Tenant
+    tenant = Tenant.objects.create(name='bench-fanout')
+    for i in range(30):
+        Campaign.objects.create(tenant=tenant, name=f'Campaign {i}')
+    with open(path, 'rb') as f:
+        return MonitoringImport.objects.create(tenant=tenant, file=File(f, name='bench.csv'), original_filename='bench.csv')
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument('--rows', type=int, default=2_000_000)
+    ap.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    ap.add_argument('--db', action='store_true', help='insert into DATABASE_URL through RangeImportPipeline')
+    args = ap.parse_args()
+
+    settings_module = 'config.settings' if args.db else 'config.test_settings'
+    setup_django(settings_module)
+    from planner import parsers
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'bench.csv')
+        write_sample(path, args.rows)
+        print(f'{args.rows} rows, {os.path.getsize(path) / 2 ** 20:.1f} MB, {os.cpu_count()} CPUs')
+        print(f"{'workers':>8} {'seconds':>8} {'rows/s':>10} {'speedup':>8}")
+        baseline = None
+        for n in args.workers:
+            with open(path, 'rb') as f:
+                ranges = parsers.plan_ranges(f, path, n)
+            if args.db:
+                from django.db import connection
+                imp = create_import(path)
+                connection.close()
+                jobs, fn = [(imp.pk, i, s, e) for i, (s, e) in enumerate(ranges)], import_range
+            else:
+                jobs, fn = [(path, s, e) for s, e in ranges], parse_range
+            started = time.perf_counter()
+            with multiprocessing.Pool(n, initializer=setup_django, initargs=(settings_module,)) as pool:
+                total = sum(pool.map(fn, jobs))
+            seconds = time.perf_counter() - started
+            if baseline is None:
+                # single-worker time estimated from the first run
+                baseline = seconds * n
+            assert total == args.rows, (total, args.rows)
+            print(f'{n:>8} {seconds:>8.2f} {total / seconds:>10.0f} {baseline / seconds:>8.2f}')
+
+
+if __name__ == '__main__':
+    main()
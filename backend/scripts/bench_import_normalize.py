@@ -0,0 +1,109 @@
+"""Benchmark per-row vs batch normalization of monitoring rows.
+
+Compares the per-row parse_airtime/parse_spots/parse_duration the import
+pipeline used before (kept below as the reference) with
+planner.normalize.BatchNormalizer (pure-Python and, when installed,
+pandas-backed) on synthetic rows.
+
+Run from the backend directory:
+python scripts/bench_import_normalize.py --rows 200000
+"""
+import argparse
+import os
+import sys
+import time
+
+# Ensure the backend package root is on sys.path so local imports work when running this
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.test_settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from dateutil import parser as dateparser  # noqa: E402
+
+from planner import normalize  # noqa: E402
+from planner.matching import first_value  # noqa: E402
+from planner.normalize import AIRTIME_COLUMNS, DURATION_COLUMNS, SPOTS_COLUMNS  # noqa: E402
+
+def parse_spots(raw):
+    """Return the first column of ``SPOTS_COLUMNS`` that parses as a number, else 0."""
+    for col in SPOTS_COLUMNS:
+        s = raw.get(col)
+        if s is None or s == '':
+            continue
+        try:
+            return int(float(str(s).strip()))
+        except Exception:
+            continue
+    return 0
+
+
+def parse_airtime(raw):
+    value = first_value(raw, AIRTIME_COLUMNS)
+    if not value:
+        return None
+    try:
+        return dateparser.parse(str(value))
+    except Exception:
+        return None
+
+
+def parse_duration(raw):
+    value = first_value(raw, DURATION_COLUMNS)
+    if value in (None, ''):
+        return None
+    try:
+        return int(float(str(value).strip()))
+    except Exception:
+        return None
+
+
+AIRTIME_SAMPLES = {
+    'iso': lambda i: f'2025-09-{1 + i % 28:02d}T{i % 24:02d}:{i % 60:02d}:00',
+    'us': lambda i: f'09/{1 + i % 28:02d}/2025 {i % 24:02d}:{i % 60:02d}',
+}
+
+
+def make_rows(n, style):
+    fmt = AIRTIME_SAMPLES[style]
+    return [{'airtime': fmt(i), 'spots_aired': str(1 + i % 3), 'duration': '30', 'station': f'S{i % 40}'}
+            for i in range(n)]
+
+
+def timed(fn):
+    started = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - started, result
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument('--rows', type=int, default=200_000)
+    ap.add_argument('--chunk', type=int, default=5000)
+    args = ap.parse_args()
+
+    print(f"{'airtime':>8} {'path':>12} {'seconds':>8} {'rows/s':>10}")
+    for style in AIRTIME_SAMPLES:
+        rows = make_rows(args.rows, style)
+        seconds, expected = timed(lambda: [(parse_airtime(r), parse_spots(r), parse_duration(r)) for r in rows])
+        print(f'{style:>8} {"per-row":>12} {seconds:>8.2f} {args.rows / seconds:>10.0f}')
+        paths = [('batch', False)] + ([('batch-pandas', True)] if normalize.pd is not None else [])
+        for label, use_pandas in paths:
+            def run():
+                normalizer = normalize.BatchNormalizer(rows[0].keys(), rows[:args.chunk], use_pandas=use_pandas)
+                out = []
+                for i in range(0, len(rows), args.chunk):
+                    out += normalizer.normalize(rows[i:i + args.chunk])
+                return out
+            seconds, result = timed(run)
+            assert result == expected
+            print(f'{style:>8} {label:>12} {seconds:>8.2f} {args.rows / seconds:>10.0f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+"""Benchmark peak memory of the streaming monitoring import parser.
+
+Generates synthetic CSV station logs of increasing size and parses each one
+in a fresh subprocess, reporting the peak RSS of that process next to the
+peak RSS of the old ``read().decode().splitlines()`` approach.
+
+Run from the backend directory:
+python scripts/bench_import_parser.py --rows 100000 500000 2000000
+"""
+import argparse
+import csv
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+# Ensure the backend package root is on sys.path so local imports work when running this
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+
+def write_sample(path, rows):
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['airtime', 'station', 'show', 'campaign_name', 'spots_aired', 'duration'])
+        for i in range(rows):
+            writer.writerow([
+                f'2025-09-{1 + i % 28:02d}T{i % 24:02d}:{i % 60:02d}:00',
+                f'Station {i % 50}', f'Show {i % 400}', f'Campaign {i % 30}', 1 + i % 3, 30,
+            ])
+
+
+def parse(path, mode):
+    """Parse ``path`` and return (rows, seconds); runs inside the child process."""
+    started = time.perf_counter()
+    count = 0
+    if mode == 'streaming':
+        from planner.parsers import CSVRowReader
+        with open(path, 'rb') as f:
+            for _ in CSVRowReader(f):
+                count += 1
+    else:
+        from planner.parsers import normalize_row
+        with open(path, 'rb') as f:
+            text = f.read().decode('utf-8', errors='replace').splitlines()
+        for raw in csv.DictReader(text):
+            normalize_row(raw)
+            count += 1
+    return count, time.perf_counter() - started
+
+
+def peak_rss_mb():
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == 'darwin' else rss / 1024
+
+
+def run_child(path, mode):
+    out = subprocess.check_output([sys.executable, __file__, '--child', mode, path], text=True)
+    rows, seconds, rss = out.split()
+    return int(rows), float(seconds), float(rss)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument('--rows', type=int, nargs='+', default=[50_000, 200_000, 800_000])
+    ap.add_argument('--child', nargs=2, metavar=('MODE', 'PATH'), help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.child:
+        mode, path = args.child
+        rows, seconds = parse(path, mode)
+        print(rows, f'{seconds:.3f}', f'{peak_rss_mb():.1f}')
+        return
+
+    print(f"{'rows':>10} {'file MB':>8} {'mode':>10} {'seconds':>8} {'rows/s':>10} {'peak RSS MB':>12}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in args.rows:
+            path = os.path.join(tmp, f'sample_{n}.csv')
+            write_sample(path, n)
+            size_mb = os.path.getsize(path) / (1024 * 1024)
+            for mode in ('streaming', 'readall'):
+                rows, seconds, rss = run_child(path, mode)
+                print(f'{rows:>10} {size_mb:>8.1f} {mode:>10} {seconds:>8.2f} {rows / seconds:>10.0f} {rss:>12.1f}')
+            os.remove(path)
+
+
+if __name__ == '__main__':
+    main()
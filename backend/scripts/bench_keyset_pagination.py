@@ -0,0 +1,78 @@
+"""Benchmark a deep page of the media plan list: OFFSET versus keyset.
+
+Inserts --plans plan lines for one campaign, then times fetching the page
+starting --depth rows in with LimitOffsetPagination (OFFSET scan plus
+COUNT) and with planner.pagination.KeysetPagination (seek on the
+(created_at, id) index) with and without the count. Both must return the
+same rows.
+
+Run from the backend directory:
+python scripts/bench_keyset_pagination.py --plans 200000 --depth 190000
+"""
+import argparse
+import os
+import sys
+import time
+
+# Ensure the backend package root is on sys.path so local imports work when running this
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument('--plans', type=int, default=200_000)
+    ap.add_argument('--depth', type=int, default=190_000)
+    ap.add_argument('--limit', type=int, default=25)
+    ap.add_argument('--repeat', type=int, default=20)
+    ap.add_argument('--settings', default='config.test_settings')
+    args = ap.parse_args()
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', args.settings)
+    import django
+    django.setup()
+    from django.core.management import call_command
+    from django.db import connection
+    from rest_framework.pagination import LimitOffsetPagination
+    from rest_framework.request import Request
+    from rest_framework.test import APIRequestFactory
+    from planner import models
+    from planner.pagination import KeysetPagination
+    from tenants.models import Tenant
+
+    if connection.settings_dict['NAME'] == ':memory:':
+        call_command('migrate', verbosity=0)
+    tenant = Tenant.objects.create(name='bench-keyset')
+    campaign = models.Campaign.objects.create(tenant=tenant, name='bench-keyset')
+    models.MediaPlan.objects.bulk_create(
+        (models.MediaPlan(campaign=campaign, name=f'Line {i}', spots=1) for i in range(args.plans)), batch_size=5000)
+    plans = models.MediaPlan.objects.filter(campaign__tenant=tenant).order_by('created_at', 'id')
+    factory = APIRequestFactory()
+
+    # cursor pointing just before row --depth, as a client following next links would hold
+    anchor = plans[args.depth - 1]
+    keyset = KeysetPagination()
+    cursor = keyset.encode_cursor(keyset.position(anchor))
+
+    def offset_page():
+        request = Request(factory.get('/', {'limit': args.limit, 'offset': args.depth}))
+        return LimitOffsetPagination().paginate_queryset(plans, request)
+
+    def keyset_page(count):
+        request = Request(factory.get('/', {'limit': args.limit, 'cursor': cursor, 'count': count}))
+        return KeysetPagination().paginate_queryset(plans, request)
+
+    assert [p.id for p in offset_page()] == [p.id for p in keyset_page('false')]
+    print(f"{'impl':>14} {'depth':>8} {'ms/page':>9}")
+    for name, fetch in (('offset+count', offset_page), ('keyset+count', lambda: keyset_page('true')),
+                        ('keyset', lambda: keyset_page('false'))):
+        started = time.perf_counter()
+        for _ in range(args.repeat):
+            fetch()
+        print(f'{name:>14} {args.depth:>8} {(time.perf_counter() - started) / args.repeat * 1e3:>9.2f}')
+    tenant.delete()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""Benchmark the per-request cost of LicenseEnforceMiddleware.
+
+Runs process_request for an authenticated user of a licensed tenant N times
+with the license status cache disabled (LICENSE_STATUS_CACHE_TTL=0, i.e. a
+database lookup per request), enabled, and with the request carrying the
+signed license claim the middleware hands out, reporting time and queries
+per request. The uncached and cached modes include issuing a fresh claim.
+The default in-memory SQLite database makes each query far cheaper than a
+networked Postgres round trip, so the uncached numbers are a lower bound.
+
+Run from the backend directory:
+python scripts/bench_license_middleware.py --requests 20000
+"""
+import argparse
+import os
+import sys
+import time
+
+# Ensure the backend package root is on sys.path so local imports work when running this
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument('--requests', type=int, default=20_000)
+    ap.add_argument('--settings', default='config.test_settings')
+    args = ap.parse_args()
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', args.settings)
+    import django
+    django.setup()
+    from django.contrib.auth import get_user_model
+    from django.core.cache import cache
+    from django.core.management import call_command
+    from django.db import connection
+    from django.test import RequestFactory, override_settings
+    from licenses import claims
+    from licenses.middleware import LicenseEnforceMiddleware
+    from licenses.models import License
+    from tenants.models import Tenant
+
+    if connection.settings_dict['NAME'] == ':memory:':
+        call_command('migrate', verbosity=0)
+    tenant = Tenant.objects.create(name='bench-license')
+    user = get_user_model().objects.create_user(username='bench-license', password='x', tenant=tenant)
+    License.objects.create(tenant=tenant, status='active')
+    middleware = LicenseEnforceMiddleware(get_response=lambda req: None)
+
+    print(f"{'mode':>9} {'requests':>9} {'us/request':>11} {'queries/request':>16}")
+    for mode, ttl in (('uncached', 0), ('cached', 60), ('claim', 60)):
+        cache.clear()
+        request = RequestFactory().get('/api/campaigns/')
+        request.user = user
+        if mode == 'claim':
+            request.COOKIES[claims.cookie_name()] = claims.issue_claim(tenant.id)
+        with override_settings(LICENSE_STATUS_CACHE_TTL=ttl):
+            middleware.process_request(request)  # warm up
+            queries = []
+
+            def count(execute, sql, params, many, context):
+                queries.append(sql)
+                return execute(sql, params, many, context)
+
+            with connection.execute_wrapper(count):
+                started = time.perf_counter()
+                for _ in range(args.requests):
+                    assert middleware.process_request(request) is None
+                seconds = time.perf_counter() - started
+        print(f'{mode:>9} {args.requests:>9} {seconds / args.requests * 1e6:>11.1f} '
+              f'{len(queries) / args.requests:>16.2f}')
+    License.objects.filter(tenant=tenant).delete()
+    user.delete()
+    tenant.delete()
+
+
+if __name__ == '__main__':
+    main()
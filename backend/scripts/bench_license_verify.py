@@ -0,0 +1,68 @@
+"""Benchmark activation token verification with and without the key caches.
+
+Generates an RSA key pair, writes the public key to a file referenced by
+LICENSE_PUBLIC_KEY (as in production) and verifies an RS256 token N times:
+``cold`` clears licenses.lib's caches before every call (re-reading and
+re-parsing the PEM, as before), ``warm`` reuses the cached key and prepared
+verifier. get_machine_hash is timed the same way.
+
+Run from the backend directory:
+python scripts/bench_license_verify.py --calls 2000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+# Ensure the backend package root is on sys.path so local imports work when running this
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+
+def timed(fn, calls, before=None):
+    started = time.perf_counter()
+    for _ in range(calls):
+        if before:
+            before()
+        fn()
+    return (time.perf_counter() - started) / calls * 1e6
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument('--calls', type=int, default=2000)
+    args = ap.parse_args()
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.test_settings')
+    import django
+    django.setup()
+    import jwt
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import rsa
+    from django.test import override_settings
+    from licenses import lib
+
+    private = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    public_pem = private.public_key().public_bytes(
+        serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo)
+    with tempfile.TemporaryDirectory() as tmp:
+        key_path = os.path.join(tmp, 'license_public.pem')
+        with open(key_path, 'wb') as f:
+            f.write(public_pem)
+        token = jwt.encode({'tenant_id': 't1', 'machine_hash': 'm'}, private, algorithm='RS256')
+        with override_settings(LICENSE_TOKEN_ALGORITHM='RS256', LICENSE_PUBLIC_KEY=key_path, DATA_DIR=tmp):
+            print(f"{'call':>24} {'cold us':>9} {'warm us':>9}")
+            for name, fn in (('verify_activation_token', lambda: lib.verify_activation_token(token)),
+                             ('get_machine_hash', lib.get_machine_hash)):
+                lib.clear_caches()
+                cold = timed(fn, args.calls, before=lib.clear_caches)
+                fn()
+                warm = timed(fn, args.calls)
+                print(f'{name:>24} {cold:>9.1f} {warm:>9.1f}')
+        lib.clear_caches()
+
+
+if __name__ == '__main__':
+    main()
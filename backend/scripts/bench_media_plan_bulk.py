@@ -0,0 +1,85 @@
+"""Benchmark bulk creation of media plan lines.
+
+Creates --lines plan lines for one campaign the way the bulk endpoint
+used to (a MediaPlanSerializer validation and save per item) and through
+MediaPlanListSerializer (preloaded references, one bulk_create), reporting
+time and queries for each.
+
+Run from the backend directory:
+python scripts/bench_media_plan_bulk.py --lines 2000
+"""
+import argparse
+import datetime
+import os
+import sys
+import time
+
+# Ensure the backend package root is on sys.path so local imports work when running this
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument('--lines', type=int, default=2000)
+    ap.add_argument('--settings', default='config.test_settings')
+    args = ap.parse_args()
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', args.settings)
+    import django
+    django.setup()
+    from django.contrib.auth import get_user_model
+    from django.core.management import call_command
+    from django.db import connection
+    from planner import models, serializers
+    from stations.models import Daypart, RateCard, Show, Station
+    from tenants.models import Tenant
+
+    if connection.settings_dict['NAME'] == ':memory:':
+        call_command('migrate', verbosity=0)
+    tenant = Tenant.objects.create(name='bench-bulk')
+    user = get_user_model().objects.create_user(username='bench-bulk', password='x', tenant=tenant)
+    campaign = models.Campaign.objects.create(tenant=tenant, name='bench-bulk')
+    daypart = Daypart.objects.create(tenant=tenant, name='Prime', start_time=datetime.time(19),
+                                     end_time=datetime.time(23))
+    stations = [Station.objects.create(tenant=tenant, name=f'Station {i}', type='TV') for i in range(20)]
+    shows = [Show.objects.create(station=s, name=f'Show {s.name}') for s in stations]
+    for station in stations:
+        RateCard.objects.create(station=station, daypart=daypart, price=100)
+    items = [{'campaign': str(campaign.id), 'name': f'Line {i}', 'station': str(stations[i % 20].id),
+              'show': str(shows[i % 20].id), 'daypart': str(daypart.id), 'date': '2025-09-01', 'spots': 2}
+             for i in range(args.lines)]
+    context = {'request': type('Request', (), {'user': user})()}
+
+    def per_item():
+        for item in items:
+            serializer = serializers.MediaPlanSerializer(data=item, context=context)
+            serializer.is_valid(raise_exception=True)
+            serializer.save()
+
+    def batched():
+        serializer = serializers.MediaPlanSerializer(data=items, many=True, context=context)
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+
+    print(f"{'impl':>9} {'lines':>7} {'ms':>9} {'queries':>8}")
+    for name, run in (('per-item', per_item), ('batched', batched)):
+        queries = []
+
+        def count(execute, sql, params, many, context):
+            queries.append(sql)
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(count):
+            started = time.perf_counter()
+            run()
+            seconds = time.perf_counter() - started
+        print(f'{name:>9} {args.lines:>7} {seconds * 1e3:>9.1f} {len(queries):>8}')
+    assert models.MediaPlan.objects.filter(campaign=campaign, price_per_spot=100).count() == 2 * args.lines
+    tenant.delete()
+    user.delete()
+
+
+if __name__ == '__main__':
+    main()
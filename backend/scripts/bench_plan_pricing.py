@@ -0,0 +1,81 @@
+"""Benchmark pricing plan lines from rate cards.
+
+Prices --lines plan lines for one tenant with a rate card query per line
+(show-specific card, then station-wide) and with the cached RateIndex,
+reporting time and queries for each.
+
+Run from the backend directory:
+python scripts/bench_plan_pricing.py --lines 5000
+"""
+import argparse
+import datetime
+import os
+import random
+import sys
+import time
+
+# Ensure the backend package root is on sys.path so local imports work when running this
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument('--lines', type=int, default=5000)
+    ap.add_argument('--stations', type=int, default=50)
+    ap.add_argument('--settings', default='config.test_settings')
+    args = ap.parse_args()
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', args.settings)
+    import django
+    django.setup()
+    from django.core.management import call_command
+    from django.db import connection
+    from stations import pricing
+    from stations.models import Daypart, RateCard, Show, Station
+    from tenants.models import Tenant
+
+    if connection.settings_dict['NAME'] == ':memory:':
+        call_command('migrate', verbosity=0)
+    tenant = Tenant.objects.create(name='bench-pricing')
+    dayparts = [Daypart.objects.create(tenant=tenant, name=f'DP{h}', start_time=datetime.time(h),
+                                       end_time=datetime.time((h + 4) % 24)) for h in range(0, 24, 4)]
+    stations = Station.objects.bulk_create(
+        [Station(tenant=tenant, name=f'Station {i}', type='TV') for i in range(args.stations)])
+    shows = Show.objects.bulk_create([Show(station=s, name=f'Show {j}') for s in stations for j in range(4)])
+    RateCard.objects.bulk_create(
+        [RateCard(station=s, daypart=d, price=100) for s in stations for d in dayparts]
+        + [RateCard(station=sh.station, show=sh, daypart=d, price=150) for sh in shows[::2] for d in dayparts])
+    rng = random.Random(1)
+    lines = [(sh.station_id, sh.id, rng.choice(dayparts).id) for sh in (rng.choice(shows) for _ in range(args.lines))]
+
+    def per_query(station_id, show_id, daypart_id):
+        card = (RateCard.objects.filter(station_id=station_id, show_id=show_id, daypart_id=daypart_id).first()
+                or RateCard.objects.filter(station_id=station_id, show__isnull=True, daypart_id=daypart_id).first())
+        return card.price if card else None
+
+    def indexed(station_id, show_id, daypart_id):
+        rate = pricing.get_rate_index(tenant.id).resolve(station_id, show_id, daypart_id)
+        return rate.price if rate else None
+
+    print(f"{'impl':>9} {'lines':>7} {'ms':>9} {'queries':>8}")
+    results = {}
+    for name, price in (('per-query', per_query), ('index', indexed)):
+        queries = []
+
+        def count(execute, sql, params, many, context):
+            queries.append(sql)
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(count):
+            started = time.perf_counter()
+            results[name] = [price(*line) for line in lines]
+            seconds = time.perf_counter() - started
+        print(f'{name:>9} {args.lines:>7} {seconds * 1e3:>9.1f} {len(queries):>8}')
+    assert results['per-query'] == results['index']
+    tenant.delete()
+
+
+if __name__ == '__main__':
+    main()
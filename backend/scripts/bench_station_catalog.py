@@ -0,0 +1,84 @@
+"""Benchmark the station list as the catalog grows across tenants.
+
+Adds tenants with --stations stations (and one show each) in steps up to
+--tenants, and after each step times GET /api/stations/ for one tenant,
+tenant-scoped (index on (tenant, name)) and unscoped as the endpoint was
+before (every tenant's rows, counted and sorted). The scoped latency
+should stay flat while the unscoped one grows with the total catalog.
+
+Run from the backend directory:
+python scripts/bench_station_catalog.py --tenants 5000 --stations 20
+"""
+import argparse
+import os
+import sys
+import time
+
+# Ensure the backend package root is on sys.path so local imports work when running this
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument('--tenants', type=int, default=5000)
+    ap.add_argument('--stations', type=int, default=20, help='stations per tenant')
+    ap.add_argument('--steps', type=int, default=4)
+    ap.add_argument('--repeat', type=int, default=50)
+    ap.add_argument('--settings', default='config.test_settings')
+    args = ap.parse_args()
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', args.settings)
+    import django
+    django.setup()
+    from django.contrib.auth import get_user_model
+    from django.core.management import call_command
+    from django.db import connection
+    from rest_framework.test import APIRequestFactory, force_authenticate
+    from stations.models import Show, Station
+    from stations.views import StationViewSet
+    from tenants.models import Tenant
+
+    if connection.settings_dict['NAME'] == ':memory:':
+        call_command('migrate', verbosity=0)
+    user = get_user_model().objects.create_user(username='bench-catalog', password='x')
+    view = StationViewSet.as_view({'get': 'list'})
+    factory = APIRequestFactory()
+
+    class UnscopedStationViewSet(StationViewSet):
+        def get_tenant_id(self):
+            return None
+
+    unscoped = UnscopedStationViewSet.as_view({'get': 'list'})
+
+    def timed(view_fn, tenant):
+        user.tenant = tenant
+        started = time.perf_counter()
+        for _ in range(args.repeat):
+            request = factory.get('/api/stations/', {'limit': 25})
+            force_authenticate(request, user=user)
+            assert view_fn(request).status_code == 200
+        return (time.perf_counter() - started) / args.repeat * 1e3
+
+    print(f"{'tenants':>8} {'stations':>9} {'scoped ms':>10} {'unscoped ms':>12}")
+    created = 0
+    probe = None
+    for step in range(1, args.steps + 1):
+        target = args.tenants * step // args.steps
+        tenants = Tenant.objects.bulk_create(
+            [Tenant(name=f'bench-catalog-{i}') for i in range(created, target)])
+        stations = Station.objects.bulk_create(
+            [Station(tenant=t, name=f'Station {j:03d}', type='TV') for t in tenants for j in range(args.stations)],
+            batch_size=2000)
+        Show.objects.bulk_create([Show(station=s, name='Drive') for s in stations], batch_size=2000)
+        created = target
+        probe = probe or tenants[0]
+        print(f'{created:>8} {created * args.stations:>9} {timed(view, probe):>10.2f} '
+              f'{timed(unscoped, probe):>12.2f}')
+    Tenant.objects.filter(name__startswith='bench-catalog-').delete()
+    user.delete()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+
+class StationsConfig(AppConfig):
+    name = 'stations'
+    verbose_name = 'Stations'
+
+    def ready(self):
+        from . import signals  # noqa: F401 -- registers the rate index invalidation receivers
@@ -0,0 +1,96 @@
+"""Per-tenant in-process cache of rate and daypart indexes.
+
+Building a ``pricing.RateIndex`` or ``dayparts.DaypartIndex`` loads every
+rate card or daypart a tenant can use, so each process keeps the built
+indexes in memory, per kind and tenant, up to ``STATIONS_INDEX_CACHE_SIZE``
+of them (least recently used go first). They are tagged with a generation
+token kept in the Django cache: saving or deleting a ``RateCard`` gives the
+tenant a new token, and saving or deleting a shared ``Daypart`` (no tenant)
+renews the global one (see ``signals``). A process rebuilds an index once
+it sees a different token. A token evicted from the cache is replaced by a
+fresh one, so an eviction can only cause a rebuild, never a stale hit.
+
+Only a cache shared by all processes (redis, see ``CACHES``) carries the
+tokens to every worker. With a process-local backend (LocMem, dummy) the
+indexes are rebuilt on every lookup, unless ``STATIONS_ALLOW_LOCAL_CACHE``
+declares the deployment single-process.
+"""
+import threading
+import uuid
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+
+
+KEY_PREFIX = 'stations:rates-generation:'
+GLOBAL = 'all'
+# (kind, tenant) indexes kept per process
+MAX_INDEXES = 256
+
+_indexes = OrderedDict()
+_lock = threading.Lock()
+
+
+def shared_cache():
+    """The default cache if every process sees the same one, else ``None``."""
+    cache = caches['default']
+    if isinstance(cache, (LocMemCache, DummyCache)) and not getattr(settings, 'STATIONS_ALLOW_LOCAL_CACHE', False):
+        return None
+    return cache
+
+
+def max_indexes():
+    return getattr(settings, 'STATIONS_INDEX_CACHE_SIZE', MAX_INDEXES)
+
+
+def _generation_key(tenant_id):
+    return f'{KEY_PREFIX}{tenant_id}'
+
+
+def generation(tenant_id, cache):
+    keys = [_generation_key(GLOBAL), _generation_key(tenant_id)]
+    found = cache.get_many(keys)
+    for key in keys:
+        if key not in found:
+            # never set or evicted: start a new generation every process agrees on
+            cache.add(key, uuid.uuid4().hex, None)
+            found[key] = cache.get(key)
+    return tuple(found[key] for key in keys)
+
+
+def get_index(kind, tenant_id, build):
+    """Return the cached ``kind`` index for ``tenant_id``, calling ``build(tenant_id)`` when stale."""
+    cache = shared_cache()
+    if cache is None:
+        return build(tenant_id)
+    current = generation(tenant_id, cache)
+    key = (kind, tenant_id)
+    with _lock:
+        cached = _indexes.get(key)
+        if cached is not None and cached[0] == current:
+            _indexes.move_to_end(key)
+            return cached[1]
+        # superseded; dropped even if the rebuild below fails
+        _indexes.pop(key, None)
+    index = build(tenant_id)
+    with _lock:
+        _indexes[key] = (current, index)
+        _indexes.move_to_end(key)
+        while len(_indexes) > max_indexes():
+            _indexes.popitem(last=False)
+    return index
+
+
+def invalidate(tenant_id=None):
+    """Mark the tenant's index (or with no tenant, every index) as stale."""
+    cache = shared_cache()
+    if cache is not None:
+        cache.set(_generation_key(GLOBAL if tenant_id is None else tenant_id), uuid.uuid4().hex, None)
+
+
+def clear():
+    with _lock:
+        _indexes.clear()
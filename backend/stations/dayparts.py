@@ -0,0 +1,78 @@
+"""Airtime to daypart resolution.
+
+``DaypartIndex`` compiles dayparts (half-open ``[start_time, end_time)``
+intervals, wrapping midnight when ``start_time > end_time``, the whole day
+when they are equal) into the sorted boundaries of the day's elementary
+segments, each with the ids of the dayparts covering it in priority order.
+A lookup is then one ``bisect`` over the boundaries, however many dayparts
+there are and however they overlap.
+
+``get_daypart_index`` serves a tenant's index (its own dayparts before the
+shared ones) from the per-process cache in ``stations.cache``.
+"""
+import datetime
+from bisect import bisect_right
+
+from django.db.models import F, Q
+from django.utils import timezone
+
+from . import cache
+from .models import Daypart
+
+
+MIDNIGHT = datetime.time(0)
+
+
+def local_time(airtime):
+    """The wall-clock time of a datetime (in the current time zone when aware), or a time as is."""
+    if type(airtime) is datetime.time:
+        return airtime
+    if airtime.tzinfo is not None:
+        airtime = timezone.localtime(airtime)
+    return airtime.time()
+
+
+class DaypartIndex:
+    """Dayparts compiled into sorted segments for bisect lookup."""
+
+    def __init__(self, dayparts):
+        """``dayparts`` is an iterable of ``(start_time, end_time, id)`` in priority order."""
+        # (start, end, id) with end None for "until midnight"
+        intervals = []
+        for start, end, pk in dayparts:
+            if start < end:
+                intervals.append((start, end, pk))
+            else:
+                # wraps midnight (or covers the whole day when start == end)
+                intervals.append((start, None, pk))
+                if end != MIDNIGHT:
+                    intervals.append((MIDNIGHT, end, pk))
+        # times compare in C, so the lookup bisects on them directly
+        self.bounds = sorted({MIDNIGHT, *(s for s, _, _ in intervals), *(e for _, e, _ in intervals if e)})
+        self.segments = []
+        for lo in self.bounds:
+            covering = []
+            for start, end, pk in intervals:
+                if start <= lo and (end is None or lo < end) and pk not in covering:
+                    covering.append(pk)
+            self.segments.append(tuple(covering))
+        self.first = [covering[0] if covering else None for covering in self.segments]
+
+    @classmethod
+    def load(cls, tenant_id):
+        return cls(
+            Daypart.objects.filter(Q(tenant_id=tenant_id) | Q(tenant__isnull=True))
+            .order_by(F('tenant_id').asc(nulls_last=True), 'start_time', 'name')
+            .values_list('start_time', 'end_time', 'id'))
+
+    def all_at(self, airtime):
+        """Ids of the dayparts covering ``airtime`` (a datetime or time), in priority order."""
+        return self.segments[bisect_right(self.bounds, local_time(airtime)) - 1]
+
+    def at(self, airtime):
+        """Id of the first daypart covering ``airtime``, or ``None``."""
+        return self.first[bisect_right(self.bounds, local_time(airtime)) - 1]
+
+
+def get_daypart_index(tenant_id):
+    return cache.get_index('dayparts', tenant_id, DaypartIndex.load)
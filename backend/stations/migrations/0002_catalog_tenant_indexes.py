@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:54
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stations', '0001_initial'),
+        ('tenants', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='daypart',
+            name='tenant',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='tenants.tenant'),
+        ),
+        migrations.AddIndex(
+            model_name='daypart',
+            index=models.Index(fields=['tenant', 'name'], name='stations_da_tenant__4bd493_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='show',
+            index=models.Index(fields=['station', 'name'], name='stations_sh_station_dd8b94_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='station',
+            index=models.Index(fields=['tenant', 'name'], name='stations_st_tenant__2ca683_idx'),
+        ),
+    ]
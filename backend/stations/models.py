@@ -1,38 +1,55 @@
 import uuid
 from django.db import models
 
+from .names import NameKeyMixin, name_key_field
 
-class Station(models.Model):
+
+class Station(NameKeyMixin, models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     tenant = models.ForeignKey('tenants.Tenant', on_delete=models.CASCADE)
     name = models.CharField(max_length=255)
+    # normalize_key(name), matched against monitoring entries' station_key
+    name_key = name_key_field()
     type = models.CharField(max_length=10, choices=(('TV','TV'),('Radio','Radio')))
     region = models.CharField(max_length=255, blank=True, null=True)
     contact_info = models.JSONField(default=dict, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [models.Index(fields=['tenant', 'name'])]
+
     def __str__(self):
         return f"{self.name} ({self.type})"
 
 
 class Daypart(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    # dayparts without a tenant are shared by all tenants
+    tenant = models.ForeignKey('tenants.Tenant', null=True, blank=True, on_delete=models.CASCADE)
     name = models.CharField(max_length=100)
     start_time = models.TimeField()
     end_time = models.TimeField()
 
+    class Meta:
+        indexes = [models.Index(fields=['tenant', 'name'])]
+
     def __str__(self):
         return self.name
 
 
-class Show(models.Model):
+class Show(NameKeyMixin, models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     station = models.ForeignKey(Station, related_name='shows', on_delete=models.CASCADE)
     name = models.CharField(max_length=255)
+    # normalize_key(name), matched against monitoring entries' show_key
+    name_key = name_key_field()
     genre = models.CharField(max_length=100, blank=True, null=True)
     default_dayparts = models.ManyToManyField(Daypart, blank=True)
 
+    class Meta:
+        indexes = [models.Index(fields=['station', 'name'])]
+
     def __str__(self):
         return f"{self.name} @ {self.station.name}"
 
@@ -0,0 +1,38 @@
+"""Normalized names for case-insensitive matching of monitoring rows.
+
+``Campaign``, ``Station`` and ``Show`` store ``normalize_key(name)`` in a
+``name_key`` column, and monitoring entries store the same key of the names
+a log row carries (``planner.matching.entry_keys``). Both the in-memory
+``EntryMatcher`` and the SQL reconcile then compare keys computed by this
+one Python function, never SQL ``LOWER(TRIM())``, whose notion of case and
+whitespace differs from Python's outside ASCII (and between databases).
+"""
+from django.db import models
+
+
+# longer than any referenced name column, so a truncated key never matches
+KEY_MAX_LENGTH = 512
+
+
+def normalize_key(value):
+    """Normalize a name for case-insensitive matching."""
+    return str(value).strip().lower()[:KEY_MAX_LENGTH]
+
+
+def name_key_field():
+    return models.CharField(max_length=KEY_MAX_LENGTH, blank=True, default='', editable=False)
+
+
+class NameKeyMixin:
+    """Keep ``name_key`` in step with ``name`` whenever the model is saved.
+
+    ``bulk_create``/``bulk_update``/``QuerySet.update`` skip ``save()``;
+    code writing names that way must set ``name_key`` as well.
+    """
+
+    def save(self, *args, **kwargs):
+        self.name_key = normalize_key(self.name)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'name' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'name_key'}
+        super().save(*args, **kwargs)
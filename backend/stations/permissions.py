@@ -0,0 +1,12 @@
+from rest_framework import permissions
+
+from planner.permissions import IsTenantMember, object_tenant_id
+
+
+class IsTenantMemberOrShared(IsTenantMember):
+    """IsTenantMember, except that rows shared by all tenants (no tenant) are read-only."""
+
+    def has_object_permission(self, request, view, obj):
+        if object_tenant_id(obj, getattr(view, 'tenant_field', 'tenant')) is None:
+            return request.method in permissions.SAFE_METHODS
+        return super().has_object_permission(request, view, obj)
@@ -0,0 +1,121 @@
+"""Rate card pricing for media plan lines.
+
+``RateIndex`` holds every rate card and daypart a tenant can use as plain
+dicts and tuples, so pricing a plan line is a dict lookup: the
+show-specific card for (station, show, daypart) wins over the
+station-wide card (no show). When a line has no daypart, the dayparts
+covering its airtime (see ``stations.dayparts``) are tried in order, the
+tenant's own before the shared ones.
+
+``get_rate_index`` serves the index from the per-process cache in
+``stations.cache``, so pricing thousands of lines costs the two queries
+that build it, once per rate card change.
+"""
+from collections import namedtuple
+from decimal import Decimal
+
+from . import cache
+from .dayparts import get_daypart_index
+from .models import RateCard
+
+
+# currency assumed for manually priced lines with no matching rate card
+DEFAULT_CURRENCY = 'USD'
+
+Rate = namedtuple('Rate', ['price', 'currency', 'rate_card_id'])
+
+
+class RateIndex:
+    """A tenant's rate cards and dayparts, loaded once for query-free pricing."""
+
+    def __init__(self, rates, dayparts):
+        # {(station_id, show_id or None, daypart_id): Rate}
+        self.rates = rates
+        # dayparts.DaypartIndex
+        self.dayparts = dayparts
+
+    @classmethod
+    def load(cls, tenant_id):
+        rates = {
+            (station_id, show_id, daypart_id): Rate(price, currency, pk)
+            for pk, station_id, show_id, daypart_id, price, currency in RateCard.objects.filter(
+                station__tenant_id=tenant_id).values_list(
+                'id', 'station_id', 'show_id', 'daypart_id', 'price', 'currency')
+        }
+        return cls(rates, get_daypart_index(tenant_id))
+
+    def rate(self, station_id, daypart_id, show_id=None):
+        if show_id is not None:
+            rate = self.rates.get((station_id, show_id, daypart_id))
+            if rate is not None:
+                return rate
+        return self.rates.get((station_id, None, daypart_id))
+
+    def resolve(self, station_id, show_id=None, daypart_id=None, airtime=None):
+        """Return the ``Rate`` for a plan line, or ``None`` if no rate card applies."""
+        if station_id is None:
+            return None
+        if daypart_id is not None:
+            candidates = [daypart_id]
+        elif airtime is not None:
+            candidates = self.dayparts.all_at(airtime)
+        else:
+            return None
+        for candidate in candidates:
+            rate = self.rate(station_id, candidate, show_id)
+            if rate is not None:
+                return rate
+        return None
+
+    def resolve_plan(self, plan):
+        return self.resolve(plan.station_id, plan.show_id, plan.daypart_id, plan.scheduled_at)
+
+
+def get_rate_index(tenant_id):
+    return cache.get_index('rates', tenant_id, RateIndex.load)
+
+
+def fill_prices(plans, tenant_id):
+    """Set ``price_per_spot`` from the rate cards on plans that have none; returns how many were priced."""
+    index = get_rate_index(tenant_id)
+    priced = 0
+    for plan in plans:
+        if plan.price_per_spot is not None:
+            continue
+        rate = index.resolve_plan(plan)
+        if rate is not None:
+            plan.price_per_spot = rate.price
+            priced += 1
+    return priced
+
+
+def plan_totals(rows):
+    """Total cost of plan lines given as dicts of MediaPlan values.
+
+    Each row needs ``tenant_id``, ``station_id``, ``show_id``,
+    ``daypart_id``, ``scheduled_at``, ``spots`` and ``price_per_spot``.
+    Lines without a manual price are priced from the rate cards; lines
+    with neither are counted as unpriced.
+    """
+    indexes = {}
+    totals = {}
+    result = {'lines': 0, 'spots': 0, 'priced': 0, 'unpriced': 0}
+    for row in rows:
+        result['lines'] += 1
+        spots = row['spots'] or 0
+        result['spots'] += spots
+        tenant_id = row['tenant_id']
+        if tenant_id not in indexes:
+            indexes[tenant_id] = get_rate_index(tenant_id)
+        rate = indexes[tenant_id].resolve(row['station_id'], row['show_id'], row['daypart_id'], row['scheduled_at'])
+        price = row['price_per_spot']
+        if price is None and rate is not None:
+            price = rate.price
+        if price is None:
+            result['unpriced'] += 1
+            continue
+        currency = rate.currency if rate is not None else DEFAULT_CURRENCY
+        totals[currency] = totals.get(currency, Decimal('0')) + price * spots
+        result['priced'] += 1
+    result['totals'] = {currency: str(total) for currency, total in sorted(totals.items())}
+    return result
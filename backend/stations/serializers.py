@@ -13,7 +13,8 @@ class ShowSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Show
-        fields = '__all__'
+        # name_key is internal to monitoring reconciliation
+        exclude = ['name_key']
 
 
 class StationSerializer(serializers.ModelSerializer):
@@ -21,7 +22,15 @@ class StationSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Station
-        fields = '__all__'
+        exclude = ['name_key']
+
+
+class StationListSerializer(serializers.ModelSerializer):
+    """Flat station representation used by the list endpoint unless ?expand=shows is given."""
+
+    class Meta:
+        model = Station
+        exclude = ['name_key']
 
 
 class RateCardSerializer(serializers.ModelSerializer):
@@ -0,0 +1,23 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import cache
+from .models import Daypart, RateCard, Station
+
+
+@receiver(post_save, sender=RateCard)
+@receiver(post_delete, sender=RateCard)
+def invalidate_rate_index(sender, instance, **kwargs):
+    """Rebuild the station tenant's rate index on its next lookup."""
+    try:
+        cache.invalidate(instance.station.tenant_id)
+    except Station.DoesNotExist:
+        # station already gone: fall back to invalidating every tenant
+        cache.invalidate()
+
+
+@receiver(post_save, sender=Daypart)
+@receiver(post_delete, sender=Daypart)
+def invalidate_daypart_rates(sender, instance, **kwargs):
+    """Daypart hours decide which rate applies; shared dayparts affect every tenant."""
+    cache.invalidate(instance.tenant_id)
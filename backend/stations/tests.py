@@ -0,0 +1,251 @@
+import datetime
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.core.cache import cache as django_cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from tenants.models import Tenant
+from . import cache, pricing
+from .dayparts import DaypartIndex
+from .models import Daypart, RateCard, Show, Station
+
+
+User = get_user_model()
+
+
+class StationQueryCountTests(TestCase):
+    """Query counts for the station endpoints must not grow with the page size."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.tenant = Tenant.objects.create(name='Stations')
+        cls.user = User.objects.create_user(username='stations', password='pass', tenant=cls.tenant)
+        dayparts = [Daypart.objects.create(name=f'DP{i}', start_time=datetime.time(6 * i),
+                                           end_time=datetime.time(6 * i + 5)) for i in range(3)]
+        for i in range(30):
+            station = Station.objects.create(tenant=cls.tenant, name=f'Station {i:02d}', type='TV')
+            for j in range(3):
+                show = Show.objects.create(station=station, name=f'Show {i}-{j}')
+                show.default_dayparts.set(dayparts[:j + 1])
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.client.get(url)
+        self.assertEqual(resp.status_code, 200)
+        return len(ctx.captured_queries), resp.json()
+
+    def assert_constant(self, url):
+        small, _ = self.count_queries(f'{url}limit=2')
+        large, data = self.count_queries(f'{url}limit=25')
+        self.assertEqual(len(data['results']), 25)
+        self.assertEqual(small, large)
+        return large, data
+
+    def test_list_is_flat(self):
+        queries, data = self.assert_constant('/api/stations/?')
+        # count + page
+        self.assertEqual(queries, 2)
+        self.assertNotIn('shows', data['results'][0])
+
+    def test_expand_shows(self):
+        queries, data = self.assert_constant('/api/stations/?expand=shows&')
+        # count + page + shows + dayparts
+        self.assertEqual(queries, 4)
+        shows = data['results'][0]['shows']
+        self.assertEqual(len(shows), 3)
+        self.assertEqual(sorted(len(s['default_dayparts']) for s in shows), [1, 2, 3])
+
+    def test_retrieve_nests_shows(self):
+        station = Station.objects.get(name='Station 00')
+        with self.assertNumQueries(3):
+            resp = self.client.get(f'/api/stations/{station.id}/')
+        self.assertEqual(len(resp.json()['shows']), 3)
+
+    def test_show_list(self):
+        queries, data = self.assert_constant('/api/shows/?')
+        # count + page + dayparts
+        self.assertEqual(queries, 3)
+        self.assertIn('default_dayparts', data['results'][0])
+
+
+class StationTenantScopeTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.tenant = Tenant.objects.create(name='Mine')
+        cls.other = Tenant.objects.create(name='Theirs')
+        cls.user = User.objects.create_user(username='mine', password='pass', tenant=cls.tenant)
+        cls.shared = Daypart.objects.create(name='Morning', start_time=datetime.time(6), end_time=datetime.time(10))
+        cls.own_daypart = Daypart.objects.create(tenant=cls.tenant, name='Late', start_time=datetime.time(22),
+                                                 end_time=datetime.time(23))
+        Daypart.objects.create(tenant=cls.other, name='Night', start_time=datetime.time(0), end_time=datetime.time(5))
+        cls.stations = {}
+        for tenant in (cls.tenant, cls.other):
+            station = Station.objects.create(tenant=tenant, name=f'{tenant.name} FM', type='Radio')
+            show = Show.objects.create(station=station, name=f'{tenant.name} Drive')
+            RateCard.objects.create(station=station, show=show, daypart=cls.shared, price=100)
+            cls.stations[tenant.name] = station
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def names(self, url, key='name'):
+        resp = self.client.get(url)
+        self.assertEqual(resp.status_code, 200)
+        return sorted(row[key] for row in resp.json()['results'])
+
+    def test_lists_scoped_to_tenant(self):
+        self.assertEqual(self.names('/api/stations/'), ['Mine FM'])
+        self.assertEqual(self.names('/api/shows/'), ['Mine Drive'])
+        self.assertEqual(self.names('/api/ratecards/', key='station'), [str(self.stations['Mine'].id)])
+        # own plus shared dayparts
+        self.assertEqual(self.names('/api/dayparts/'), ['Late', 'Morning'])
+
+    def test_other_tenant_objects_not_found(self):
+        other = self.stations['Theirs']
+        self.assertEqual(self.client.get(f'/api/stations/{other.id}/').status_code, 404)
+        self.assertEqual(self.client.get(f'/api/shows/{other.shows.get().id}/').status_code, 404)
+
+    def test_shared_dayparts_read_only(self):
+        url = f'/api/dayparts/{self.shared.id}/'
+        self.assertEqual(self.client.get(url).status_code, 200)
+        self.assertEqual(self.client.patch(url, {'name': 'Breakfast'}, format='json').status_code, 403)
+        resp = self.client.patch(f'/api/dayparts/{self.own_daypart.id}/', {'name': 'Late night'}, format='json')
+        self.assertEqual(resp.status_code, 200)
+
+    def test_filters_and_search(self):
+        Station.objects.create(tenant=self.tenant, name='Mine TV', type='TV')
+        self.assertEqual(self.names('/api/stations/?type=TV'), ['Mine TV'])
+        self.assertEqual(self.names('/api/stations/?search=fm'), ['Mine FM'])
+        self.assertEqual(self.names(f'/api/shows/?station={self.stations["Mine"].id}'), ['Mine Drive'])
+
+
+class RatePricingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.tenant = Tenant.objects.create(name='Pricing')
+        cls.station = Station.objects.create(tenant=cls.tenant, name='Pricing TV', type='TV')
+        cls.show = Show.objects.create(station=cls.station, name='News')
+        cls.prime = Daypart.objects.create(name='Prime', start_time=datetime.time(19), end_time=datetime.time(23))
+        cls.night = Daypart.objects.create(tenant=cls.tenant, name='Night', start_time=datetime.time(23),
+                                           end_time=datetime.time(5))
+        RateCard.objects.create(station=cls.station, daypart=cls.prime, price=100)
+        RateCard.objects.create(station=cls.station, show=cls.show, daypart=cls.prime, price=150)
+        RateCard.objects.create(station=cls.station, daypart=cls.night, price=20, currency='EUR')
+
+    def setUp(self):
+        cache.clear()
+
+    def test_show_rate_over_station_rate(self):
+        index = pricing.get_rate_index(self.tenant.id)
+        self.assertEqual(index.resolve(self.station.id, self.show.id, self.prime.id).price, Decimal('150'))
+        self.assertEqual(index.resolve(self.station.id, None, self.prime.id).price, Decimal('100'))
+        other_show = Show.objects.create(station=self.station, name='Sports')
+        self.assertEqual(index.resolve(self.station.id, other_show.id, self.prime.id).price, Decimal('100'))
+        self.assertIsNone(index.resolve(self.station.id, self.show.id))
+
+    def test_daypart_from_airtime(self):
+        index = pricing.get_rate_index(self.tenant.id)
+        self.assertEqual(index.resolve(self.station.id, airtime=datetime.time(20, 30)).price, Decimal('100'))
+        # the night daypart wraps midnight
+        for hour in (23, 0, 4):
+            self.assertEqual(index.resolve(self.station.id, airtime=datetime.time(hour, 15)).currency, 'EUR')
+        self.assertIsNone(index.resolve(self.station.id, airtime=datetime.time(12)))
+        airtime = timezone.make_aware(datetime.datetime(2025, 9, 1, 21, 0))
+        self.assertEqual(index.resolve(self.station.id, self.show.id, airtime=airtime).price, Decimal('150'))
+
+    def test_index_cached_until_rate_card_changes(self):
+        pricing.get_rate_index(self.tenant.id)
+        with self.assertNumQueries(0):
+            index = pricing.get_rate_index(self.tenant.id)
+        card = RateCard.objects.get(show=self.show)
+        card.price = 175
+        card.save()
+        self.assertEqual(pricing.get_rate_index(self.tenant.id).resolve(
+            self.station.id, self.show.id, self.prime.id).price, Decimal('175'))
+        card.delete()
+        self.assertEqual(pricing.get_rate_index(self.tenant.id).resolve(
+            self.station.id, self.show.id, self.prime.id).price, Decimal('100'))
+        self.assertIsNot(pricing.get_rate_index(self.tenant.id), index)
+
+    def test_evicted_generation_rebuilds(self):
+        index = pricing.get_rate_index(self.tenant.id)
+        django_cache.delete(cache._generation_key(self.tenant.id))
+        self.assertIsNot(pricing.get_rate_index(self.tenant.id), index)
+
+    @override_settings(STATIONS_INDEX_CACHE_SIZE=2)
+    def test_least_recently_used_indexes_evicted(self):
+        def build(tenant_id):
+            return object()
+        first = cache.get_index('test', 1, build)
+        cache.get_index('test', 2, build)
+        self.assertIs(cache.get_index('test', 1, build), first)
+        cache.get_index('test', 3, build)
+        self.assertEqual(list(cache._indexes), [('test', 1), ('test', 3)])
+        self.assertIs(cache.get_index('test', 1, build), first)
+
+    @override_settings(STATIONS_ALLOW_LOCAL_CACHE=False)
+    def test_local_cache_not_trusted(self):
+        # another worker's invalidation would never reach this process's LocMemCache
+        index = pricing.get_rate_index(self.tenant.id)
+        self.assertIsNot(pricing.get_rate_index(self.tenant.id), index)
+        self.assertFalse(cache._indexes)
+
+    def test_shared_daypart_change_invalidates(self):
+        index = pricing.get_rate_index(self.tenant.id)
+        self.prime.start_time = datetime.time(18)
+        self.prime.save()
+        self.assertEqual(pricing.get_rate_index(self.tenant.id).resolve(
+            self.station.id, airtime=datetime.time(18, 30)).price, Decimal('100'))
+        self.assertIsNone(index.resolve(self.station.id, airtime=datetime.time(18, 30)))
+
+    def test_other_tenant_rates_not_loaded(self):
+        other = Tenant.objects.create(name='Other pricing')
+        self.assertEqual(pricing.get_rate_index(other.id).rates, {})
+
+
+class DaypartIndexTests(SimpleTestCase):
+    DAYPARTS = [
+        (datetime.time(6), datetime.time(10), 'breakfast'),
+        (datetime.time(9, 30), datetime.time(13), 'late-morning'),
+        (datetime.time(22), datetime.time(2), 'overnight'),
+        (datetime.time(20), datetime.time(0), 'evening'),
+        (datetime.time(18), datetime.time(18), 'all-day'),
+    ]
+
+    def brute_force(self, time):
+        covering = []
+        for start, end, pk in self.DAYPARTS:
+            if start < end:
+                hit = start <= time < end
+            elif start > end:
+                hit = time >= start or time < end
+            else:
+                hit = True
+            if hit:
+                covering.append(pk)
+        return tuple(covering)
+
+    def test_matches_linear_scan(self):
+        index = DaypartIndex(self.DAYPARTS)
+        for minute in range(24 * 60):
+            time = datetime.time(minute // 60, minute % 60)
+            self.assertEqual(index.all_at(time), self.brute_force(time), time)
+
+    def test_boundaries_and_wraparound(self):
+        index = DaypartIndex(self.DAYPARTS[:3])
+        self.assertEqual(index.at(datetime.time(10)), 'late-morning')
+        self.assertEqual(index.at(datetime.time(9, 59, 59, 999999)), 'breakfast')
+        self.assertEqual(index.at(datetime.time(1, 59)), 'overnight')
+        self.assertIsNone(index.at(datetime.time(2)))
+        self.assertEqual(index.at(datetime.datetime(2025, 9, 1, 23, 15)), 'overnight')
+        self.assertIsNone(DaypartIndex([]).at(datetime.time(12)))
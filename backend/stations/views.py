@@ -1,23 +1,87 @@
-from rest_framework import viewsets
+from django.db.models import Q
+from django_filters.rest_framework import DjangoFilterBackend
+from rest_framework import permissions, viewsets
+from rest_framework.filters import OrderingFilter, SearchFilter
+
+from planner.permissions import IsTenantMember
+from planner.views import TenantScopedMixin
 from .models import Station, Show, Daypart, RateCard
-from .serializers import StationSerializer, ShowSerializer, DaypartSerializer, RateCardSerializer
+from .permissions import IsTenantMemberOrShared
+from .serializers import (
+    StationSerializer, StationListSerializer, ShowSerializer, DaypartSerializer, RateCardSerializer,
+)
 
 
-class StationViewSet(viewsets.ModelViewSet):
+class StationViewSet(TenantScopedMixin, viewsets.ModelViewSet):
+    """Stations; the list is flat unless ``?expand=shows`` asks for nested shows and dayparts."""
     queryset = Station.objects.all()
     serializer_class = StationSerializer
+    permission_classes = [permissions.IsAuthenticated, IsTenantMember]
+    filter_backends = [DjangoFilterBackend, OrderingFilter, SearchFilter]
+    filterset_fields = ['type', 'region']
+    ordering_fields = ['name', 'created_at']
+    # served by the (tenant, name) index
+    ordering = ['name', 'id']
+    search_fields = ['name', 'region']
+
+    def expand_shows(self):
+        expand = self.request.query_params.get('expand', '')
+        return 'shows' in (part.strip() for part in expand.split(','))
+
+    def nests_shows(self):
+        return self.action != 'list' or self.expand_shows()
 
+    def get_queryset(self):
+        qs = super().get_queryset()
+        if self.nests_shows():
+            # one query per level instead of one per station and per show
+            qs = qs.prefetch_related('shows__default_dayparts')
+        return qs
 
-class ShowViewSet(viewsets.ModelViewSet):
-    queryset = Show.objects.all()
+    def get_serializer_class(self):
+        if not self.nests_shows():
+            return StationListSerializer
+        return self.serializer_class
+
+
+class ShowViewSet(TenantScopedMixin, viewsets.ModelViewSet):
+    # station is joined for the tenant filter and the object permission check
+    queryset = Show.objects.select_related('station').prefetch_related('default_dayparts')
     serializer_class = ShowSerializer
+    permission_classes = [permissions.IsAuthenticated, IsTenantMember]
+    tenant_field = 'station__tenant'
+    filter_backends = [DjangoFilterBackend, OrderingFilter, SearchFilter]
+    filterset_fields = ['station', 'genre']
+    ordering_fields = ['name']
+    # served by the (station, name) index when filtered by station
+    ordering = ['name', 'id']
+    search_fields = ['name', 'genre']
 
 
-class DaypartViewSet(viewsets.ModelViewSet):
+class DaypartViewSet(TenantScopedMixin, viewsets.ModelViewSet):
+    """The tenant's own dayparts plus the shared ones (no tenant), which are read-only."""
     queryset = Daypart.objects.all()
     serializer_class = DaypartSerializer
+    permission_classes = [permissions.IsAuthenticated, IsTenantMemberOrShared]
+    filter_backends = [DjangoFilterBackend, OrderingFilter, SearchFilter]
+    filterset_fields = ['tenant']
+    ordering_fields = ['name', 'start_time']
+    ordering = ['start_time', 'name']
+    search_fields = ['name']
+
+    def get_queryset(self):
+        qs = self.queryset.all()
+        tid = self.get_tenant_id()
+        if tid:
+            return qs.filter(Q(tenant_id=tid) | Q(tenant__isnull=True))
+        return qs
 
 
-class RateCardViewSet(viewsets.ModelViewSet):
-    queryset = RateCard.objects.all()
+class RateCardViewSet(TenantScopedMixin, viewsets.ModelViewSet):
+    queryset = RateCard.objects.select_related('station')
     serializer_class = RateCardSerializer
+    permission_classes = [permissions.IsAuthenticated, IsTenantMember]
+    tenant_field = 'station__tenant'
+    filter_backends = [DjangoFilterBackend, OrderingFilter]
+    filterset_fields = ['station', 'show', 'daypart', 'currency']
+    ordering_fields = ['price']